@@ -1 +1,69 @@
-# Lakehouse Explorer Web Application
+"""
+Lakehouse Explorer Web Application
+A web-based tool to explore Apache Iceberg tables in your lakehouse setup.
+"""
+
+from flask import Flask, render_template, jsonify
+from flask_cors import CORS
+import os
+from typing import Optional
+from app.core.config import LakehouseConfig, get_config
+from app.core.explorer import LakehouseExplorer
+from app.api.routes import api_bp
+
+def create_app(config: Optional[LakehouseConfig] = None, explorer: Optional[LakehouseExplorer] = None):
+    """Application factory pattern
+
+    A config and/or an already built explorer (e.g. one backed by a local
+    SQL catalog, as the benchmarks use) may be passed in; otherwise the
+    config is loaded from config files or the environment.
+    """
+    app = Flask(__name__)
+    
+    # Enable CORS for all routes
+    CORS(app)
+    
+    # Load configuration
+    try:
+        if explorer is not None:
+            config = config or explorer.config
+        config = config or get_config()
+        app.config['LAKEHOUSE_CONFIG'] = config
+        
+        # Initialize explorer
+        explorer = explorer or LakehouseExplorer(config)
+        app.config['EXPLORER'] = explorer
+        
+        # Profile new snapshots in the background so statistics are served precomputed
+        if config.background_profiling and explorer.profiling_worker:
+            explorer.profiling_worker.start()
+        
+    except Exception as e:
+        print(f"❌ Configuration error: {e}")
+        print("Please check your configuration and ensure your lakehouse is accessible.")
+        return None
+    
+    # Register blueprints
+    app.register_blueprint(api_bp, url_prefix='/api')
+    
+    # Main routes
+    @app.route('/')
+    def index():
+        """Main application page"""
+        return render_template('index.html')
+    
+    @app.route('/health')
+    def health():
+        """Health check endpoint"""
+        return jsonify({'status': 'healthy', 'service': 'lakehouse-explorer'})
+    
+    # Error handlers
+    @app.errorhandler(404)
+    def not_found_error(error):
+        return render_template('404.html'), 404
+    
+    @app.errorhandler(500)
+    def internal_error(error):
+        return render_template('500.html'), 500
+    
+    return app
@@ -0,0 +1,186 @@
+"""
+HTTP caching and compression for API responses
+
+Responses about one table version are identified by the table's metadata
+location and snapshot id: the same URL at the same (location, snapshot)
+always produces the same body, so it gets a strong ETag and a matching
+If-None-Match is answered with 304 after loading only the table metadata.
+Large responses are compressed with zstd, brotli or gzip according to
+Accept-Encoding.
+"""
+
+from typing import Callable, Optional, Union
+from contextlib import nullcontext
+from functools import wraps
+import gzip
+import hashlib
+
+from flask import request, current_app, Response
+
+from app.core.catalog_pool import TableVersion
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses may include table data, so only the browser may cache them
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+PINNED_CACHE_CONTROL = "private, max-age=86400, immutable"
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/vnd.apache.arrow.stream",
+                      "text/csv", "text/plain")
+
+
+def _compress_zstd(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+def _compress_brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=4)
+
+
+def _compress_gzip(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=6)
+
+
+def available_encodings():
+    """Supported content codings in order of preference (zstd and brotli are optional packages)"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append(("zstd", _compress_zstd))
+    if brotli is not None:
+        encodings.append(("br", _compress_brotli))
+    encodings.append(("gzip", _compress_gzip))
+    return encodings
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick our preferred coding among those the client accepts (q > 0), or None for identity"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get('*', 0.0)
+    candidates = [(accepted.get(name, wildcard), -rank, name)
+                  for rank, (name, _) in enumerate(available_encodings())]
+    quality, _, name = max(candidates)
+    return name if quality > 0 else None
+
+
+def snapshot_etag(metadata_location: str, snapshot_id: Optional[int], key: str) -> str:
+    """Strong ETag for the representation of ``key`` (the request URL) at one table version"""
+    digest = hashlib.sha256(f"{metadata_location}\0{snapshot_id}\0{key}".encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def _etag_base(etag: str) -> str:
+    """The ETag without the content-coding suffix added when compressing"""
+    value = etag.strip('"')
+    for name, _ in available_encodings():
+        if value.endswith(f"-{name}"):
+            return value[:-len(name) - 1]
+    return value
+
+
+def _matching_etag(etag: str) -> Optional[str]:
+    """The If-None-Match entry (in any coding) that matches ``etag``, if any"""
+    if request.if_none_match.star_tag:
+        return etag
+    base = _etag_base(etag)
+    for candidate in request.if_none_match.as_set(include_weak=True):
+        if _etag_base(candidate) == base:
+            return f'"{candidate}"'
+    return None
+
+
+def snapshot_cached(immutable: Union[bool, Callable[[], bool]] = False,
+                    cacheable: Optional[Callable[[], bool]] = None):
+    """Decorate a GET /table/<namespace>/<table_name>/... route with ETag validation
+
+    The table version is resolved first; when the client already holds the
+    response for the same metadata location and snapshot, 304 is returned
+    without calling the route. ``immutable`` marks responses that depend on
+    the snapshot alone (not on later commits), which may be cached without
+    revalidation when the request pins a snapshot_id. ``cacheable`` can
+    exclude requests whose response changes for the same snapshot. The
+    table loaded to check the ETag is reused by the route.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(namespace, table_name, *args, **kwargs):
+            explorer = current_app.config.get('EXPLORER')
+            if cacheable is not None and not cacheable():
+                return view(namespace, table_name, *args, **kwargs)
+            with explorer.catalogs.request_scope() if explorer else nullcontext():
+                try:
+                    namespace_tuple = () if namespace == "default" else tuple(namespace.split('.'))
+                    version = TableVersion.parse(request.args.get('ref'), request.args.get('snapshot_id'),
+                                                 request.args.get('as_of'))
+                    identity = explorer.get_table_identity(namespace_tuple, table_name, version)
+                except Exception:
+                    # Let the route report bad versions and missing tables itself
+                    identity = None
+                if identity is None:
+                    return view(namespace, table_name, *args, **kwargs)
+
+                etag = snapshot_etag(identity["metadata_location"], identity["snapshot_id"], request.full_path)
+                pinned = version.snapshot_id is not None and (immutable() if callable(immutable) else immutable)
+                cache_control = PINNED_CACHE_CONTROL if pinned else REVALIDATE_CACHE_CONTROL
+
+                matched = _matching_etag(etag)
+                if matched is not None:
+                    response = Response(status=304)
+                    response.headers['ETag'] = matched
+                else:
+                    response = current_app.make_response(view(namespace, table_name, *args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    response.headers['ETag'] = etag
+            response.headers['Cache-Control'] = cache_control
+            response.vary.add('Accept-Encoding')
+            return response
+        return wrapper
+    return decorator
+
+
+def compress_response(response: Response) -> Response:
+    """Compress a large, complete response body according to the request's Accept-Encoding"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_BYTES:
+        return response
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+
+    compress = dict(available_encodings())[encoding]
+    response.set_data(compress(data))
+    response.headers['Content-Encoding'] = encoding
+    # A strong ETag names one exact body, so each coding gets its own
+    etag = response.headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        response.headers['ETag'] = f'"{etag.strip(chr(34))}-{encoding}"'
+    return response
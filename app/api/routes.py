@@ -2,15 +2,38 @@
 API routes for Lakehouse Explorer Web Application
 """
 
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, jsonify, request, current_app, Response, stream_with_context
 import traceback
+import json
+import math
+
+from app.api.http_cache import snapshot_cached, compress_response
+from app.core.catalog_pool import TableVersion
+from app.core.explorer import DETAIL_PARTS
+from app.core.rest_transport import CatalogUnavailable
+from app.core.sessions import SessionNotFound
 
 api_bp = Blueprint('api', __name__)
+api_bp.after_request(compress_response)
 
 def get_explorer():
     """Get the explorer instance from app config"""
     return current_app.config.get('EXPLORER')
 
+def get_table_version(params=None):
+    """Get the requested table version from ref/snapshot_id/as_of parameters"""
+    params = params if params is not None else request.args
+    return TableVersion.parse(params.get('ref'), params.get('snapshot_id'), params.get('as_of'))
+
+def error_response(e):
+    """500 for an unexpected error; 503 with Retry-After while the catalog transport refuses calls"""
+    response = jsonify({'error': str(e)})
+    if isinstance(e, CatalogUnavailable):
+        if e.retry_after is not None:
+            response.headers['Retry-After'] = str(max(1, math.ceil(e.retry_after)))
+        return response, 503
+    return response, 500
+
 @api_bp.route('/namespaces')
 def get_namespaces():
     """Get all namespaces"""
@@ -19,7 +42,7 @@ def get_namespaces():
         if not explorer:
             return jsonify({'error': 'Explorer not initialized'}), 500
         
-        namespaces = explorer.list_namespaces()
+        namespaces = explorer.list_namespaces(request.args.get('ref'))
         # Convert tuples to strings for JSON serialization
         namespace_list = [".".join(ns) if ns else "default" for ns in namespaces]
         
@@ -28,7 +51,7 @@ def get_namespaces():
             'count': len(namespace_list)
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
 
 @api_bp.route('/tables')
 def get_all_tables():
@@ -38,7 +61,7 @@ def get_all_tables():
         if not explorer:
             return jsonify({'error': 'Explorer not initialized'}), 500
         
-        all_tables = explorer.get_all_tables()
+        all_tables = explorer.get_all_tables(request.args.get('ref'))
         
         # Convert to JSON-serializable format
         result = {}
@@ -58,7 +81,7 @@ def get_all_tables():
             'total_tables': total_tables
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
 
 @api_bp.route('/tables/<namespace>')
 def get_tables_in_namespace(namespace):
@@ -74,7 +97,7 @@ def get_tables_in_namespace(namespace):
         else:
             namespace_tuple = tuple(namespace.split('.'))
         
-        tables = explorer.list_tables_in_namespace(namespace_tuple)
+        tables = explorer.list_tables_in_namespace(namespace_tuple, request.args.get('ref'))
         
         return jsonify({
             'namespace': namespace,
@@ -82,9 +105,10 @@ def get_tables_in_namespace(namespace):
             'count': len(tables)
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
 
 @api_bp.route('/table/<namespace>/<table_name>/schema')
+@snapshot_cached(immutable=True)
 def get_table_schema(namespace, table_name):
     """Get table schema"""
     try:
@@ -98,7 +122,8 @@ def get_table_schema(namespace, table_name):
         else:
             namespace_tuple = tuple(namespace.split('.'))
         
-        schema = explorer.get_table_schema(namespace_tuple, table_name)
+        version = get_table_version()
+        schema = explorer.get_table_schema(namespace_tuple, table_name, version)
         
         if schema is None:
             return jsonify({'error': 'Table not found or error occurred'}), 404
@@ -106,12 +131,16 @@ def get_table_schema(namespace, table_name):
         return jsonify({
             'namespace': namespace,
             'table_name': table_name,
-            'schema': schema
+            'schema': schema,
+            'version': version.to_dict()
         })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
 
 @api_bp.route('/table/<namespace>/<table_name>/metadata')
+@snapshot_cached()
 def get_table_metadata(namespace, table_name):
     """Get table metadata"""
     try:
@@ -125,7 +154,8 @@ def get_table_metadata(namespace, table_name):
         else:
             namespace_tuple = tuple(namespace.split('.'))
         
-        metadata = explorer.get_table_metadata(namespace_tuple, table_name)
+        version = get_table_version()
+        metadata = explorer.get_table_metadata(namespace_tuple, table_name, version)
         
         if metadata is None:
             return jsonify({'error': 'Table not found or error occurred'}), 404
@@ -133,12 +163,16 @@ def get_table_metadata(namespace, table_name):
         return jsonify({
             'namespace': namespace,
             'table_name': table_name,
-            'metadata': metadata
+            'metadata': metadata,
+            'version': version.to_dict()
         })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
 
 @api_bp.route('/table/<namespace>/<table_name>/preview')
+@snapshot_cached(immutable=True)
 def preview_table(namespace, table_name):
     """Preview table data"""
     try:
@@ -157,7 +191,9 @@ def preview_table(namespace, table_name):
         else:
             namespace_tuple = tuple(namespace.split('.'))
         
-        preview_data = explorer.preview_table_data(namespace_tuple, table_name, limit)
+        version = get_table_version()
+        strategy = request.args.get('strategy') or None
+        preview_data = explorer.preview_table_data(namespace_tuple, table_name, limit, version, strategy)
         
         if preview_data is None:
             return jsonify({'error': 'Table not found or error occurred'}), 404
@@ -165,10 +201,60 @@ def preview_table(namespace, table_name):
         return jsonify({
             'namespace': namespace,
             'table_name': table_name,
-            'preview': preview_data
+            'preview': preview_data,
+            'version': version.to_dict()
         })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
+
+# Upper bound for one page of rows
+MAX_PAGE_ROWS = 1000
+
+@api_bp.route('/table/<namespace>/<table_name>/rows')
+@snapshot_cached(immutable=True)
+def get_table_rows(namespace, table_name):
+    """Get a page of table rows in columnar JSON or as an Arrow IPC stream (format=arrow)"""
+    try:
+        explorer = get_explorer()
+        if not explorer:
+            return jsonify({'error': 'Explorer not initialized'}), 500
+        
+        offset = request.args.get('offset', 0, type=int)
+        limit = min(request.args.get('limit', 100, type=int), MAX_PAGE_ROWS)
+        columns = get_detail_parts(request.args.get('columns'))
+        output_format = request.args.get('format', 'json')
+        if output_format not in ('json', 'arrow'):
+            return jsonify({'error': f'Invalid format: {output_format} (expected json or arrow)'}), 400
+        
+        # Convert namespace string back to tuple
+        if namespace == "default":
+            namespace_tuple = ()
+        else:
+            namespace_tuple = tuple(namespace.split('.'))
+        
+        version = get_table_version()
+        if output_format == 'arrow':
+            payload = explorer.get_table_page_arrow(namespace_tuple, table_name, offset, limit, columns, version)
+            if payload is None:
+                return jsonify({'error': 'Table not found or error occurred'}), 404
+            return Response(payload, mimetype='application/vnd.apache.arrow.stream')
+        
+        page = explorer.get_table_page(namespace_tuple, table_name, offset, limit, columns, version)
+        if page is None:
+            return jsonify({'error': 'Table not found or error occurred'}), 404
+        
+        return jsonify({
+            'namespace': namespace,
+            'table_name': table_name,
+            'page': page,
+            'version': version.to_dict()
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return error_response(e)
 
 @api_bp.route('/search')
 def search_tables():
@@ -190,10 +276,10 @@ def search_tables():
             'count': len(results)
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
 
 @api_bp.route('/table/<namespace>/<table_name>/query', methods=['POST'])
-def query_table():
+def query_table(namespace, table_name):
     """Execute SQL query on table using DuckDB"""
     try:
         explorer = get_explorer()
@@ -204,8 +290,6 @@ def query_table():
         if not data or 'query' not in data:
             return jsonify({'error': 'SQL query is required in request body'}), 400
         
-        namespace = request.view_args['namespace']
-        table_name = request.view_args['table_name']
         sql_query = data['query']
         limit = data.get('limit', 100)
         
@@ -215,15 +299,165 @@ def query_table():
         else:
             namespace_tuple = tuple(namespace.split('.'))
         
-        result = explorer.execute_sql_query(namespace_tuple, table_name, sql_query, limit)
+        # Version may be given in the body or as query parameters
+        version = get_table_version({**request.args.to_dict(), **data})
+        approximate = bool(data.get('approximate', False))
+        sample_fraction = float(data.get('sample_fraction', 0.05))
+        confidence = float(data.get('confidence', 0.95))
+        result = explorer.execute_sql_query(namespace_tuple, table_name, sql_query, limit, version,
+                                            approximate=approximate, sample_fraction=sample_fraction,
+                                            confidence=confidence, strategy=data.get('strategy') or None,
+                                            session_id=data.get('session_id') or None,
+                                            save_as=data.get('save_as') or None)
         
         return jsonify({
             'namespace': namespace,
             'table_name': table_name,
+            'query_result': result,
+            'version': version.to_dict()
+        })
+    except SessionNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return error_response(e)
+
+@api_bp.route('/sessions', methods=['GET', 'POST'])
+def sessions():
+    """List analyst sessions, or start one (POST)"""
+    try:
+        explorer = get_explorer()
+        if not explorer:
+            return jsonify({'error': 'Explorer not initialized'}), 500
+        
+        if request.method == 'POST':
+            return jsonify({'session': explorer.create_session()}), 201
+        
+        session_list = explorer.list_sessions()
+        return jsonify({
+            'sessions': session_list,
+            'count': len(session_list)
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return error_response(e)
+
+@api_bp.route('/sessions/<session_id>', methods=['GET', 'DELETE'])
+def session_detail(session_id):
+    """Get a session's saved tables, storage use and expiry, or delete the session"""
+    try:
+        explorer = get_explorer()
+        if not explorer:
+            return jsonify({'error': 'Explorer not initialized'}), 500
+        
+        if request.method == 'DELETE':
+            explorer.delete_session(session_id)
+            return jsonify({'deleted': session_id})
+        
+        return jsonify({'session': explorer.get_session(session_id)})
+    except SessionNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return error_response(e)
+
+@api_bp.route('/sessions/<session_id>/query', methods=['POST'])
+def query_session(session_id):
+    """Execute SQL over a session's saved tables (optionally saving the result with save_as)"""
+    try:
+        explorer = get_explorer()
+        if not explorer:
+            return jsonify({'error': 'Explorer not initialized'}), 500
+        
+        data = request.get_json()
+        if not data or 'query' not in data:
+            return jsonify({'error': 'SQL query is required in request body'}), 400
+        
+        limit = int(data.get('limit', 100))
+        result = explorer.execute_session_query(session_id, data['query'], limit,
+                                                save_as=data.get('save_as') or None)
+        return jsonify({
+            'session_id': session_id,
             'query_result': result
         })
+    except SessionNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
+
+@api_bp.route('/sessions/<session_id>/tables/<name>', methods=['DELETE'])
+def drop_session_table(session_id, name):
+    """Drop one of a session's saved tables"""
+    try:
+        explorer = get_explorer()
+        if not explorer:
+            return jsonify({'error': 'Explorer not initialized'}), 500
+        
+        return jsonify({'session': explorer.drop_session_table(session_id, name)})
+    except SessionNotFound as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return error_response(e)
+
+# Upper bounds for one streaming query
+MAX_STREAM_ROWS = 100000
+MAX_STREAM_BATCH_SIZE = 10000
+
+def sse_event(message):
+    """Format an explorer message as a Server-Sent Event named by its "event" key"""
+    message = dict(message)
+    event = message.pop('event')
+    return f"event: {event}\ndata: {json.dumps(message, default=str)}\n\n"
+
+@api_bp.route('/table/<namespace>/<table_name>/query/stream', methods=['GET', 'POST'])
+def stream_query_table(namespace, table_name):
+    """Execute SQL query on table using DuckDB, streaming progress and rows as Server-Sent Events"""
+    try:
+        explorer = get_explorer()
+        if not explorer:
+            return jsonify({'error': 'Explorer not initialized'}), 500
+        
+        # POST takes a JSON body; GET (for EventSource) takes query parameters
+        data = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args.to_dict()
+        if not data.get('query'):
+            return jsonify({'error': 'SQL query is required'}), 400
+        
+        sql_query = data['query']
+        limit = min(int(data.get('limit', 10000)), MAX_STREAM_ROWS)
+        batch_size = min(int(data.get('batch_size', 500)), MAX_STREAM_BATCH_SIZE)
+        
+        # Convert namespace string back to tuple
+        if namespace == "default":
+            namespace_tuple = ()
+        else:
+            namespace_tuple = tuple(namespace.split('.'))
+        
+        version = get_table_version({**request.args.to_dict(), **data})
+        messages = explorer.stream_sql_query(namespace_tuple, table_name, sql_query, limit, version, batch_size)
+        # Resolve the table before streaming so bad versions and missing tables still get an error status
+        first = next(messages)
+        
+        def generate():
+            yield sse_event(first)
+            for message in messages:
+                yield sse_event(message)
+        
+        response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        # Keep reverse proxies from buffering the stream
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return error_response(e)
 
 @api_bp.route('/table/<namespace>/<table_name>/statistics')
 def get_table_statistics(namespace, table_name):
@@ -239,7 +473,10 @@ def get_table_statistics(namespace, table_name):
         else:
             namespace_tuple = tuple(namespace.split('.'))
         
-        statistics = explorer.get_table_statistics(namespace_tuple, table_name)
+        version = get_table_version()
+        refresh = request.args.get('refresh', 'false').lower() in ('true', '1', 'yes')
+        strategy = request.args.get('strategy') or None
+        statistics = explorer.get_table_statistics(namespace_tuple, table_name, version, refresh, strategy)
         
         if statistics is None:
             return jsonify({'error': 'Table not found or error occurred'}), 404
@@ -247,10 +484,169 @@ def get_table_statistics(namespace, table_name):
         return jsonify({
             'namespace': namespace,
             'table_name': table_name,
-            'statistics': statistics
+            'statistics': statistics,
+            'version': version.to_dict()
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return error_response(e)
+
+# Upper bounds for one details request
+MAX_DETAIL_TABLES = 50
+MAX_PREVIEW_LIMIT = 1000
+
+# Detail parts that depend on the snapshot alone; metadata also reflects later commits
+# and statistics change as profiling completes
+SNAPSHOT_DETAIL_PARTS = {"schema", "preview", "partitions"}
+
+def get_detail_parts(value):
+    """Parts (or columns) may be given as a list or a comma-separated string"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return [part.strip() for part in value if part and part.strip()]
+
+def requested_detail_parts():
+    return set(get_detail_parts(request.args.get('parts')) or DETAIL_PARTS)
+
+@api_bp.route('/table/<namespace>/<table_name>/details')
+@snapshot_cached(immutable=lambda: requested_detail_parts() <= SNAPSHOT_DETAIL_PARTS,
+                 cacheable=lambda: 'statistics' not in requested_detail_parts())
+def get_table_details(namespace, table_name):
+    """Get any subset of schema, metadata, preview, partitions and statistics in one request"""
+    try:
+        explorer = get_explorer()
+        if not explorer:
+            return jsonify({'error': 'Explorer not initialized'}), 500
+        
+        parts = get_detail_parts(request.args.get('parts'))
+        preview_limit = min(request.args.get('preview_limit', 10, type=int), MAX_PREVIEW_LIMIT)
+        
+        # Convert namespace string back to tuple
+        if namespace == "default":
+            namespace_tuple = ()
+        else:
+            namespace_tuple = tuple(namespace.split('.'))
+        
+        version = get_table_version()
+        details = explorer.get_table_details(namespace_tuple, table_name, parts, version, preview_limit)
+        
+        return jsonify({
+            'namespace': namespace,
+            'table_name': table_name,
+            'details': details,
+            'version': version.to_dict()
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return error_response(e)
+
+@api_bp.route('/tables/details', methods=['POST'])
+def get_tables_details():
+    """Get details of many tables in one round trip
+
+    Body: {"tables": ["namespace.table", ...], "parts": [...], "preview_limit": N}
+    plus optional ref/snapshot_id/as_of applied to every table.
+    """
+    try:
+        explorer = get_explorer()
+        if not explorer:
+            return jsonify({'error': 'Explorer not initialized'}), 500
+        
+        data = request.get_json(silent=True) or {}
+        names = data.get('tables')
+        if not names or not isinstance(names, list):
+            return jsonify({'error': 'A list of tables is required in request body'}), 400
+        if len(names) > MAX_DETAIL_TABLES:
+            return jsonify({'error': f'At most {MAX_DETAIL_TABLES} tables per request'}), 400
+        
+        # "namespace.table" (the last dot separates the table) or {"namespace": ..., "table": ...}
+        tables = []
+        keys = []
+        for name in names:
+            if isinstance(name, dict):
+                namespace, table_name = name.get('namespace') or 'default', name.get('table')
+            else:
+                namespace, _, table_name = str(name).rpartition('.')
+                namespace = namespace or 'default'
+            if not table_name:
+                return jsonify({'error': f'Invalid table: {name}'}), 400
+            namespace_tuple = () if namespace == 'default' else tuple(namespace.split('.'))
+            tables.append((namespace_tuple, table_name))
+            keys.append(f"{namespace}.{table_name}")
+        
+        parts = get_detail_parts(data.get('parts'))
+        preview_limit = min(int(data.get('preview_limit', 10)), MAX_PREVIEW_LIMIT)
+        version = get_table_version({**request.args.to_dict(), **data})
+        results = explorer.get_tables_details(tables, parts, version, preview_limit)
+        
+        return jsonify({
+            'tables': dict(zip(keys, results)),
+            'count': len(results),
+            'version': version.to_dict()
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return error_response(e)
+
+@api_bp.route('/table/<namespace>/<table_name>/diff')
+def diff_table_snapshots(namespace, table_name):
+    """Get the rows inserted/deleted between two snapshots"""
+    try:
+        explorer = get_explorer()
+        if not explorer:
+            return jsonify({'error': 'Explorer not initialized'}), 500
+        
+        if not request.args.get('from'):
+            return jsonify({'error': 'Parameter "from" (snapshot id or ref) is required'}), 400
+        # "from"/"to" are snapshot ids (on "ref") or Nessie/table ref names
+        ref = request.args.get('ref')
+        from_version = TableVersion.from_ref_or_snapshot(request.args.get('from'), ref)
+        to_version = TableVersion.from_ref_or_snapshot(request.args.get('to'), ref)
+        change_type = request.args.get('change') or None
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = request.args.get('limit', 100, type=int)
+        if limit > 1000:  # Prevent excessive data loading
+            limit = 1000
+        
+        # Convert namespace string back to tuple
+        if namespace == "default":
+            namespace_tuple = ()
+        else:
+            namespace_tuple = tuple(namespace.split('.'))
+        
+        if request.args.get('stream', 'false').lower() in ('true', '1', 'yes'):
+            messages = explorer.stream_snapshot_diff(namespace_tuple, table_name, from_version, to_version,
+                                                     change_type, offset, batch_size=limit)
+            # Resolve the snapshots before streaming so bad refs still get a 400
+            first = next(messages)
+            
+            def generate():
+                yield json.dumps(first, default=str) + "\n"
+                for message in messages:
+                    yield json.dumps(message, default=str) + "\n"
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        diff = explorer.diff_snapshots(namespace_tuple, table_name, from_version, to_version,
+                                       change_type, offset, limit)
+        
+        if diff is None:
+            return jsonify({'error': 'Table not found or error occurred'}), 404
+        
+        return jsonify({
+            'namespace': namespace,
+            'table_name': table_name,
+            'diff': diff
         })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
 
 @api_bp.route('/connection')
 def get_connection_info():
@@ -267,7 +663,7 @@ def get_connection_info():
             'status': 'connected'
         })
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return error_response(e)
 
 @api_bp.errorhandler(404)
 def api_not_found(error):
@@ -0,0 +1,333 @@
+"""
+Approximate query answers from a stratified sample of row groups
+
+Sampling units are Parquet row groups (from the manifests' split offsets),
+stratified by partition so the sample is spread across partitions: every
+partition gets at least one unit unless there are more partitions than
+max_units. COUNT and SUM select items are scaled up with the stratified
+estimator and get a confidence interval (None when the sample cannot bound
+the estimate); other columns are computed on the pooled sample. Queries
+whose COUNT/SUM values cannot be scaled that way (COUNT/SUM inside larger
+expressions or windows, HAVING) are rejected.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass
+import json
+import math
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyiceberg.manifest import DataFileContent
+from pyiceberg.table import Table
+from pyiceberg.table.snapshots import Snapshot
+from pyiceberg.transforms import IdentityTransform
+
+from app.core.manifests import arrow_schema, iter_data_file, read_position_deletes, snapshot_schema
+
+SCALABLE_FUNCTIONS = {"count", "count_star", "sum"}
+AGGREGATE_FUNCTIONS = SCALABLE_FUNCTIONS | {
+    "avg", "mean", "min", "max", "median", "mode", "quantile", "quantile_cont", "quantile_disc",
+    "stddev", "stddev_samp", "stddev_pop", "variance", "var_samp", "var_pop", "approx_count_distinct",
+    "approx_quantile", "first", "last", "any_value", "arg_min", "arg_max", "list", "string_agg", "bool_and", "bool_or"
+}
+Z_SCORES = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.9600, 0.99: 2.5758}
+# Unsampled partitions listed in the query info
+MAX_LISTED_PARTITIONS = 100
+
+
+@dataclass
+class SampleUnit:
+    """One row group of one data file"""
+    file_path: str
+    row_group: Optional[int]  # None when the file's row groups are unknown
+    stratum: int
+    est_rows: float
+    est_bytes: float
+    delete_files: Tuple[Any, ...] = ()
+
+
+def _aggregate_calls(node: Any) -> Tuple[bool, bool]:
+    """Whether a serialized expression calls a scalable aggregate, and whether it calls any aggregate"""
+    scalable, aggregate = False, False
+    if isinstance(node, dict):
+        name = (node.get("function_name") or "").lower()
+        if node.get("class") in ("FUNCTION", "AGGREGATE", "WINDOW") and name in AGGREGATE_FUNCTIONS:
+            aggregate = True
+            scalable = name in SCALABLE_FUNCTIONS and not node.get("distinct")
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return False, False
+    for child in children:
+        child_scalable, child_aggregate = _aggregate_calls(child)
+        scalable, aggregate = scalable or child_scalable, aggregate or child_aggregate
+    return scalable, aggregate
+
+
+def analyze_select_list(conn, sql: str) -> Optional[Tuple[List[str], bool]]:
+    """Classify each top-level select item as "scale", "aggregate" or "key"
+
+    Returns the kinds and whether the query has its own LIMIT, or None when
+    the query cannot be analyzed (set operations, SELECT *, or a DuckDB
+    without json_serialize_sql), in which case nothing is scaled. Raises
+    ValueError for queries that are not approximable: a COUNT/SUM inside a
+    larger expression or a window cannot be scaled per group, and HAVING
+    would filter each sampled unit's groups instead of the scaled totals.
+    """
+    try:
+        serialized = json.loads(conn.execute("SELECT json_serialize_sql(?)", [sql]).fetchone()[0])
+        node = serialized["statements"][0]["node"]
+    except Exception:
+        return None
+    if serialized.get("error") or node.get("type") != "SELECT_NODE":
+        return None
+
+    kinds = []
+    for position, item in enumerate(node["select_list"], 1):
+        if item.get("class") == "STAR":
+            return None
+        name = (item.get("function_name") or "").lower() if item.get("class") in ("FUNCTION", "AGGREGATE") else ""
+        if name in SCALABLE_FUNCTIONS and not item.get("distinct"):
+            kinds.append("scale")
+        elif name in AGGREGATE_FUNCTIONS:
+            kinds.append("aggregate")
+        else:
+            scalable, aggregate = _aggregate_calls(item)
+            if scalable:
+                label = f" ({item['alias']})" if item.get("alias") else ""
+                raise ValueError(f"Select item {position}{label} is not approximable: COUNT/SUM can only be scaled "
+                                 f"as a whole select item, not inside an expression or window; select it on its "
+                                 f"own and compute the expression from the result")
+            kinds.append("aggregate" if aggregate else "key")
+    if node.get("having") and ("scale" in kinds or _aggregate_calls(node["having"])[0]):
+        raise ValueError("HAVING is not approximable: it would filter each sampled unit's groups, not the "
+                         "scaled estimates; filter the approximate result instead")
+    has_limit = any(m.get("type") == "LIMIT_MODIFIER" for m in node.get("modifiers", []))
+    return kinds, has_limit
+
+
+class ApproximateQuery:
+    """Run a query on a stratified row-group sample and scale COUNT/SUM results"""
+
+    def __init__(self, table: Table, snapshot: Optional[Snapshot], sample_fraction: float = 0.05,
+                 max_units: int = 64, confidence: float = 0.95, seed: Optional[int] = None):
+        if not 0 < sample_fraction <= 1:
+            raise ValueError("sample_fraction must be in (0, 1]")
+        if confidence not in Z_SCORES:
+            raise ValueError(f"confidence must be one of {', '.join(str(c) for c in sorted(Z_SCORES))}")
+        self.table = table
+        self.snapshot = snapshot
+        self.schema = snapshot_schema(table, snapshot)
+        self.sample_fraction = sample_fraction
+        self.max_units = max_units
+        self.confidence = confidence
+        self.rng = np.random.default_rng(seed)
+
+    def _all_units(self) -> Tuple[List[SampleUnit], List[Dict[str, Any]]]:
+        """Enumerate row groups of the live data files, grouped into partition strata
+
+        Also returns each stratum's identity partition values, so unsampled
+        partitions can be reported.
+        """
+        if self.snapshot is None:
+            return [], []
+        units = []
+        strata: Dict[str, int] = {}
+        partitions: List[Dict[str, Any]] = []
+        for task in self.table.scan(snapshot_id=self.snapshot.snapshot_id).plan_files():
+            data_file = task.file
+            stratum = strata.setdefault(f"{data_file.spec_id}:{data_file.partition}", len(strata))
+            if stratum == len(partitions):
+                partitions.append(self._partition_values(data_file))
+            offsets = data_file.split_offsets or []
+            row_groups = len(offsets) if offsets else 1
+            for rg in range(row_groups):
+                units.append(SampleUnit(
+                    data_file.file_path, rg if offsets else None, stratum,
+                    data_file.record_count / row_groups, data_file.file_size_in_bytes / row_groups,
+                    tuple(task.delete_files)
+                ))
+        return units, partitions
+
+    def _partition_values(self, data_file) -> Dict[str, Any]:
+        """Identity partition values of a data file, by source column name"""
+        spec = self.table.specs().get(data_file.spec_id)
+        if spec is None:
+            return {}
+        values = {}
+        for i, field in enumerate(spec.fields):
+            if isinstance(field.transform, IdentityTransform):
+                name = self.schema.find_column_name(field.source_id) or field.name
+                value = data_file.partition[i]
+                values[name] = value if value is None or isinstance(value, (str, int, float, bool)) else str(value)
+        return values
+
+    def _sample(self, units: List[SampleUnit], n_strata: int) -> Tuple[Dict[int, List[SampleUnit]], Dict[int, int]]:
+        """Stratified sample of units; returns sampled units and population size per stratum"""
+        target = max(1, min(self.max_units, math.ceil(self.sample_fraction * len(units))))
+        # Cover every partition when the unit budget allows it, whatever the fraction
+        target = min(len(units), max(target, min(n_strata, self.max_units)))
+
+        # Only with more partitions than units to sample are neighbouring partitions merged
+        by_stratum: Dict[int, List[SampleUnit]] = {}
+        for unit in units:
+            stratum = unit.stratum if n_strata <= target else unit.stratum * target // n_strata
+            by_stratum.setdefault(stratum, []).append(unit)
+
+        # Two units per stratum give it its own variance estimate, when the budget allows
+        minimum = 2 if target >= 2 * len(by_stratum) else 1
+        sampled, population = {}, {}
+        for stratum, members in by_stratum.items():
+            share = round(target * len(members) / len(units))
+            n = min(len(members), max(share, minimum))
+            picks = self.rng.choice(len(members), size=n, replace=False)
+            sampled[stratum] = [members[i] for i in sorted(picks)]
+            population[stratum] = len(members)
+        return sampled, population
+
+    def _read_unit(self, unit: SampleUnit) -> pa.Table:
+        position_deletes = [f for f in unit.delete_files if f.content == DataFileContent.POSITION_DELETES]
+        drop = read_position_deletes(self.table.io, position_deletes).get(unit.file_path) if position_deletes else None
+        batches = list(iter_data_file(self.table.io, unit.file_path, self.schema, drop=drop,
+                                      row_groups=[unit.row_group] if unit.row_group is not None else None))
+        return pa.Table.from_batches(batches, schema=arrow_schema(self.schema))
+
+    def run(self, conn, sql: str, temp_table_name: str, limit: int) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Execute ``sql`` (which reads ``temp_table_name``) on the sample and scale the result"""
+        started = time.time()
+        # Reject shapes that cannot be approximated before reading any data
+        analysis = analyze_select_list(conn, sql)
+        units, partitions = self._all_units()
+        n_strata = len(partitions)
+        sampled, population = self._sample(units, n_strata) if units else ({}, {})
+
+        unit_tables = {}
+        for members in sampled.values():
+            for unit in members:
+                unit_tables[id(unit)] = self._read_unit(unit)
+
+        # Pooled sample answers the query shape and the non-scalable columns
+        pooled = pa.concat_tables(unit_tables.values()) if unit_tables else arrow_schema(self.schema).empty_table()
+        conn.register(temp_table_name, pooled)
+        try:
+            result = conn.execute(sql).fetchdf()
+        finally:
+            conn.unregister(temp_table_name)
+
+        kinds, has_limit = analysis if analysis is not None else (None, False)
+        scaled_columns = []
+        intervals: Dict[str, List[Optional[List[float]]]] = {}
+        if kinds is not None and len(kinds) == len(result.columns) and "scale" in kinds:
+            result, scaled_columns, intervals = self._scale(conn, sql, temp_table_name, result, kinds,
+                                                            sampled, population, unit_tables)
+
+        total_rows = sum(u.est_rows for u in units)
+        total_bytes = sum(u.est_bytes for u in units)
+        sampled_units = [u for members in sampled.values() for u in members]
+        rows_read = sum(t.num_rows for t in unit_tables.values())
+        covered = {u.stratum for u in sampled_units}
+        unsampled = [partitions[i] for i in range(n_strata) if i not in covered]
+        info = {
+            "sample_fraction_requested": self.sample_fraction,
+            "confidence": self.confidence,
+            "units_total": len(units),
+            "units_sampled": len(sampled_units),
+            "strata": len(population),
+            "partitions": n_strata,
+            "partitions_sampled": len(covered),
+            "rows_read": rows_read,
+            "rows_total": int(total_rows),
+            "fraction_rows_read": round(rows_read / total_rows, 6) if total_rows else 0,
+            "fraction_bytes_read": round(sum(u.est_bytes for u in sampled_units) / total_bytes, 6) if total_bytes else 0,
+            "scaled_columns": scaled_columns,
+            "confidence_intervals": intervals,
+            "elapsed_seconds": round(time.time() - started, 3)
+        }
+        if kinds is None:
+            info["note"] = "Query shape could not be analyzed; values are computed on the sample without scaling"
+        elif not scaled_columns:
+            info["note"] = "No COUNT/SUM columns to scale; values are computed on the sample"
+        elif has_limit:
+            info["note"] = "The query's own LIMIT is applied per sampled unit; use the limit parameter instead"
+        if unsampled:
+            # Groups that only occur in these partitions are missing from the result
+            info["unsampled_partitions"] = unsampled[:MAX_LISTED_PARTITIONS]
+            note = (f"{len(unsampled)} of {n_strata} partitions were not sampled (more partitions than max_units); "
+                    f"groups found only there are missing from the result")
+            info["note"] = f"{info['note']}. {note}" if "note" in info else note
+
+        return result.head(limit), info
+
+    def _scale(self, conn, sql: str, temp_table_name: str, result: pd.DataFrame, kinds: List[str],
+               sampled: Dict[int, List[SampleUnit]], population: Dict[int, int],
+               unit_tables: Dict[int, pa.Table]) -> Tuple[pd.DataFrame, List[str], Dict[str, Any]]:
+        """Replace COUNT/SUM columns with stratified estimates of the population totals"""
+        columns = list(result.columns)
+        key_columns = [c for c, k in zip(columns, kinds) if k == "key"]
+        scale_columns = [c for c, k in zip(columns, kinds) if k == "scale"]
+
+        def row_key(row) -> Tuple:
+            return tuple(None if pd.isna(row[c]) else row[c] for c in key_columns)
+
+        # Per-unit totals for every result group
+        per_unit: Dict[int, Dict[Tuple, Dict[str, float]]] = {}
+        for members in sampled.values():
+            for unit in members:
+                conn.register(temp_table_name, unit_tables[id(unit)])
+                try:
+                    unit_result = conn.execute(sql).fetchdf()
+                finally:
+                    conn.unregister(temp_table_name)
+                per_unit[id(unit)] = {
+                    row_key(row): {c: float(row[c]) if not pd.isna(row[c]) else 0.0 for c in scale_columns}
+                    for _, row in unit_result.iterrows()
+                }
+
+        z = Z_SCORES[self.confidence]
+        result = result.copy()
+        intervals = {c: [] for c in scale_columns}
+        for c in scale_columns:
+            result[c] = result[c].astype('float64')
+
+        for index, row in result.iterrows():
+            key = row_key(row)
+            for c in scale_columns:
+                values_by_stratum = {
+                    stratum: np.array([per_unit[id(u)].get(key, {}).get(c, 0.0) for u in members])
+                    for stratum, members in sampled.items()
+                }
+                # Pooled within-stratum variance, or the overall one when no stratum has two units
+                within = [(len(v) - 1, float(np.var(v, ddof=1))) for v in values_by_stratum.values() if len(v) > 1]
+                if within:
+                    pooled_var = sum(d * v for d, v in within) / sum(d for d, _ in within)
+                else:
+                    all_values = np.concatenate(list(values_by_stratum.values()))
+                    pooled_var = float(np.var(all_values, ddof=1)) if len(all_values) > 1 else 0.0
+
+                estimate, variance, bounded = 0.0, 0.0, True
+                for stratum, values in values_by_stratum.items():
+                    N, n = population[stratum], len(values)
+                    estimate += N * values.mean()
+                    if n >= N:
+                        continue  # every unit of the stratum was read: no sampling error
+                    s2 = float(np.var(values, ddof=1)) if n > 1 else 0.0
+                    # Two or fewer units (or identical ones) say little about the spread
+                    if n <= 2 or s2 == 0:
+                        s2 = max(s2, pooled_var)
+                    if s2 == 0:
+                        bounded = False
+                    variance += N * N * (1 - n / N) * s2 / n
+
+                result.at[index, c] = round(estimate, 2)
+                if not bounded:
+                    # A zero-width interval would claim certainty the sample does not have
+                    intervals[c].append(None)
+                    continue
+                half_width = z * math.sqrt(max(variance, 0.0))
+                intervals[c].append([round(estimate - half_width, 2), round(estimate + half_width, 2)])
+
+        return result, scale_columns, intervals
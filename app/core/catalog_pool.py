@@ -0,0 +1,271 @@
+"""
+Ref-aware pool of catalog clients with a shared table metadata cache
+"""
+
+from typing import Iterator, List, Dict, Any, Optional, Tuple, Union
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+import re
+import threading
+
+from pyiceberg.catalog import Catalog
+from pyiceberg.exceptions import NoSuchNamespaceError, NoSuchTableError, RESTError
+from pyiceberg.table import Table
+from pyiceberg.table.snapshots import Snapshot, ancestors_of
+
+from app.core.config import LakehouseConfig
+from app.core.rest_transport import CatalogTransport, CatalogUnavailable, TransportRestCatalog, TransportSettings
+from app.core.snapshot_diff import resolve_snapshot
+
+# Valid Nessie reference names (branches and tags)
+NESSIE_REF_PATTERN = re.compile(r"^[A-Za-z](((?![.][.])[A-Za-z0-9./_-])*[A-Za-z0-9_-])?$")
+
+
+class UnknownRef(ValueError):
+    """The catalog cannot serve this ref (no such Nessie reference, or refs cannot be selected)"""
+
+
+@dataclass(frozen=True)
+class TableVersion:
+    """Which version of a table to read: a Nessie/table ref, a snapshot id or a point in time"""
+    ref: Optional[str] = None
+    snapshot_id: Optional[int] = None
+    as_of: Optional[int] = None  # epoch milliseconds
+
+    @classmethod
+    def parse(cls, ref: Optional[str] = None, snapshot_id: Optional[Union[str, int]] = None,
+              as_of: Optional[Union[str, int]] = None) -> 'TableVersion':
+        """Build a version from request parameters (as_of may be epoch millis or ISO 8601)"""
+        parsed_snapshot_id = None
+        if snapshot_id is not None and str(snapshot_id).strip():
+            try:
+                parsed_snapshot_id = int(snapshot_id)
+            except ValueError:
+                raise ValueError(f"Invalid snapshot_id: {snapshot_id}")
+
+        parsed_as_of = None
+        if as_of is not None and str(as_of).strip():
+            as_of = str(as_of).strip()
+            if as_of.lstrip('-').isdigit():
+                parsed_as_of = int(as_of)
+            else:
+                try:
+                    parsed_as_of = int(datetime.fromisoformat(as_of.replace('Z', '+00:00')).timestamp() * 1000)
+                except ValueError:
+                    raise ValueError(f"Invalid as_of timestamp: {as_of}")
+
+        if parsed_snapshot_id is not None and parsed_as_of is not None:
+            raise ValueError("Specify either snapshot_id or as_of, not both")
+
+        return cls(ref=ref.strip() if ref and ref.strip() else None,
+                   snapshot_id=parsed_snapshot_id, as_of=parsed_as_of)
+
+    @classmethod
+    def from_ref_or_snapshot(cls, value: Optional[str], ref: Optional[str] = None) -> 'TableVersion':
+        """Interpret a value that is either a snapshot id (on ``ref``) or a ref name"""
+        if value is None or not str(value).strip():
+            return cls.parse(ref)
+        value = str(value).strip()
+        if value.lstrip('-').isdigit():
+            return cls.parse(ref, snapshot_id=value)
+        return cls.parse(value)
+
+    @property
+    def is_default(self) -> bool:
+        return self.ref is None and self.snapshot_id is None and self.as_of is None
+
+    def resolve_snapshot(self, table: Table, table_ref: Optional[str] = None) -> Optional[Snapshot]:
+        """Pick the snapshot of an already loaded table that this version refers to
+
+        ``table_ref`` names one of the table's own branches or tags to start
+        from instead of its current snapshot; ``as_of`` walks back from there.
+        """
+        if self.snapshot_id is not None:
+            snapshot = table.snapshot_by_id(self.snapshot_id)
+            if snapshot is None:
+                raise ValueError(f"Snapshot {self.snapshot_id} not found")
+            return snapshot
+
+        head = resolve_snapshot(table, table_ref) if table_ref else table.current_snapshot()
+        if self.as_of is not None:
+            # The ref's own lineage: the snapshot log only records the main branch
+            for snapshot in ancestors_of(head, table.metadata):
+                if snapshot.timestamp_ms <= self.as_of:
+                    return snapshot
+            raise ValueError(f"No snapshot exists as of {self.as_of}" + (f" on {table_ref}" if table_ref else ""))
+
+        return head
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"ref": self.ref, "snapshot_id": self.snapshot_id, "as_of": self.as_of}
+
+
+DEFAULT_VERSION = TableVersion()
+
+
+class CatalogPool:
+    """One catalog client per Nessie ref, sharing one HTTP transport and loaded tables
+
+    All REST clients send through the same CatalogTransport (keep-alive
+    pool, timeouts, retries, circuit breaker and concurrency limit). Besides
+    the default ref's client, the clients of the ``max_refs`` most recently
+    used refs are kept. Tables are cached by metadata location, so refs that
+    point at the same table metadata reuse the same ``Table`` object (and
+    everything cached on it) instead of downloading it again. Inside
+    ``request_scope()`` each table version is loaded at most once.
+    """
+
+    def __init__(self, config: LakehouseConfig, catalog: Optional[Catalog] = None, max_tables: int = 256,
+                 max_refs: int = 16):
+        self.config = config
+        self.default_ref = config.nessie_ref if config else None
+        self.max_tables = max_tables
+        self.max_refs = max_refs
+        self._catalogs: "OrderedDict[str, Catalog]" = OrderedDict()
+        self._tables: "OrderedDict[str, Table]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._scope = threading.local()
+        self._stats = {"table_loads": 0, "table_cache_hits": 0}
+
+        # An injected catalog (e.g. a local SQL catalog) has no Nessie refs
+        self.supports_refs = catalog is None
+        self.transport = CatalogTransport(TransportSettings.from_config(config)) if catalog is None else None
+        if catalog is not None:
+            self._catalogs[self.default_ref] = catalog
+
+    def get_catalog(self, ref: Optional[str] = None) -> Catalog:
+        """Get (creating on first use) the catalog client for a ref"""
+        ref = ref or self.default_ref
+        if not self.supports_refs:
+            ref = self.default_ref
+
+        with self._lock:
+            catalog = self._catalogs.get(ref)
+            if catalog is not None:
+                self._catalogs.move_to_end(ref)
+                return catalog
+
+        if ref != self.default_ref and not NESSIE_REF_PATTERN.match(ref):
+            raise UnknownRef(f"Unknown ref: {ref}")
+        try:
+            properties = self.config.to_pyiceberg_catalog_config(ref=ref)
+        except ValueError as e:
+            raise UnknownRef(str(e))
+
+        # Connecting fetches the catalog's config over the network: outside the lock, so
+        # loads at refs that are already connected do not wait for it
+        try:
+            catalog = TransportRestCatalog(f"lakehouse-{ref}", self.transport, **properties)
+        except CatalogUnavailable:
+            raise
+        except RESTError as e:
+            if type(e) is RESTError:
+                # 404 and other answers PyIceberg has no error type for: the server does not serve the ref
+                raise UnknownRef(f"Unknown ref {ref}: {str(e)}")
+            raise ConnectionError(f"Failed to connect to catalog at ref {ref}: {str(e)}")
+        except Exception as e:
+            raise ConnectionError(f"Failed to connect to catalog at ref {ref}: {str(e)}")
+
+        with self._lock:
+            existing = self._catalogs.get(ref)
+            if existing is not None:
+                # Another thread connected to the ref meanwhile: keep one client per ref
+                self._catalogs.move_to_end(ref)
+                return existing
+            self._catalogs[ref] = catalog
+            others = [r for r in self._catalogs if r != self.default_ref]
+            for evicted in others[:max(len(others) - self.max_refs, 0)]:
+                del self._catalogs[evicted]
+            return catalog
+
+    def load_table(self, identifier: Tuple[str, ...], ref: Optional[str] = None) -> Table:
+        """Load a table at a ref, reusing a cached table with the same metadata location"""
+        # Failures left after the transport's retries arrive as CatalogUnavailable
+        table = self.get_catalog(ref).load_table(identifier)
+        location = table.metadata_location
+
+        with self._lock:
+            self._stats["table_loads"] += 1
+            cached = self._tables.get(location)
+            if cached is not None:
+                self._tables.move_to_end(location)
+                self._stats["table_cache_hits"] += 1
+                return cached
+
+            self._tables[location] = table
+            while len(self._tables) > self.max_tables:
+                self._tables.popitem(last=False)
+            return table
+
+    @contextmanager
+    def request_scope(self) -> Iterator[None]:
+        """Reuse table versions loaded by this thread until the block exits
+
+        A request that checks a table's identity and then builds its response
+        loads the table from the catalog once instead of once per step.
+        """
+        if getattr(self._scope, "versions", None) is not None:
+            yield  # nested: the outer scope owns the memo
+            return
+        self._scope.versions = {}
+        try:
+            yield
+        finally:
+            self._scope.versions = None
+
+    def load_table_version(self, identifier: Tuple[str, ...],
+                           version: Optional[TableVersion] = None) -> Tuple[Table, Optional[Snapshot]]:
+        """Load a table and resolve the snapshot a version refers to
+
+        A ref is first looked up as a Nessie ref; names that are not Nessie
+        refs fall back to the table's own branches and tags.
+        """
+        version = version or DEFAULT_VERSION
+        loaded = getattr(self._scope, "versions", None)
+        if loaded is None:
+            return self._load_table_version(identifier, version)
+        key = (tuple(identifier), version)
+        if key not in loaded:
+            loaded[key] = self._load_table_version(identifier, version)
+        return loaded[key]
+
+    def _load_table_version(self, identifier: Tuple[str, ...],
+                            version: TableVersion) -> Tuple[Table, Optional[Snapshot]]:
+        ref = version.ref
+
+        if ref and ref != self.default_ref:
+            error = UnknownRef(f"Unknown ref: {ref}")
+            if self.supports_refs:
+                try:
+                    table = self.load_table(identifier, ref)
+                    return table, version.resolve_snapshot(table)
+                except UnknownRef as e:
+                    error = e
+                except (NoSuchTableError, NoSuchNamespaceError):
+                    error = UnknownRef(f"Unknown ref {ref}, or no table {'.'.join(identifier)} on it")
+
+            # Not a Nessie ref: try the table's own branches and tags
+            table = self.load_table(identifier)
+            if ref not in table.metadata.refs:
+                raise error
+            return table, version.resolve_snapshot(table, ref)
+
+        table = self.load_table(identifier, ref)
+        return table, version.resolve_snapshot(table)
+
+    def refs(self) -> List[str]:
+        with self._lock:
+            return list(self._catalogs.keys())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "catalogs": len(self._catalogs),
+                "max_refs": self.max_refs,
+                "refs": list(self._catalogs.keys()),
+                "cached_tables": len(self._tables),
+                **self._stats,
+                "transport": self.transport.metrics() if self.transport else None
+            }
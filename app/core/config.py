@@ -31,6 +31,30 @@ class LakehouseConfig:
     # Additional settings
     ssl_verify: bool = False
     
+    # Statistics store and background profiling
+    stats_store_path: Optional[str] = None
+    background_profiling: bool = False
+    profiling_workers: int = 2
+    profiling_poll_seconds: int = 300
+    sketch_cache_mb: int = 256  # in-memory per-file sketch cache
+    
+    # REST catalog transport: concurrent calls (and pooled keep-alive connections),
+    # per-attempt timeouts, retries with jittered backoff and the circuit breaker
+    catalog_max_concurrency: int = 16
+    catalog_connect_timeout: float = 5.0
+    catalog_read_timeout: float = 30.0
+    catalog_retries: int = 3
+    catalog_backoff_seconds: float = 0.2
+    catalog_breaker_failures: int = 5
+    catalog_breaker_reset_seconds: float = 30.0
+    
+    # Analyst sessions (saved query results in a DuckDB database per session)
+    sessions_path: Optional[str] = None  # default: a directory under the system temp directory
+    session_idle_seconds: int = 3600
+    session_quota_mb: int = 1024
+    session_memory_mb: int = 512
+    max_sessions: int = 64
+    
     @classmethod
     def from_file(cls, config_path: str) -> 'LakehouseConfig':
         """Load configuration from JSON file"""
@@ -74,25 +98,53 @@ class LakehouseConfig:
             'NESSIE_USERNAME': 'nessie_username',
             'NESSIE_PASSWORD': 'nessie_password',
             'S3_REGION': 's3_region',
-            'SSL_VERIFY': 'ssl_verify'
+            'SSL_VERIFY': 'ssl_verify',
+            'STATS_STORE_PATH': 'stats_store_path',
+            'BACKGROUND_PROFILING': 'background_profiling',
+            'PROFILING_WORKERS': 'profiling_workers',
+            'PROFILING_POLL_SECONDS': 'profiling_poll_seconds',
+            'SKETCH_CACHE_MB': 'sketch_cache_mb',
+            'CATALOG_MAX_CONCURRENCY': 'catalog_max_concurrency',
+            'CATALOG_CONNECT_TIMEOUT': 'catalog_connect_timeout',
+            'CATALOG_READ_TIMEOUT': 'catalog_read_timeout',
+            'CATALOG_RETRIES': 'catalog_retries',
+            'CATALOG_BACKOFF_SECONDS': 'catalog_backoff_seconds',
+            'CATALOG_BREAKER_FAILURES': 'catalog_breaker_failures',
+            'CATALOG_BREAKER_RESET_SECONDS': 'catalog_breaker_reset_seconds',
+            'SESSIONS_PATH': 'sessions_path',
+            'SESSION_IDLE_SECONDS': 'session_idle_seconds',
+            'SESSION_QUOTA_MB': 'session_quota_mb',
+            'SESSION_MEMORY_MB': 'session_memory_mb',
+            'MAX_SESSIONS': 'max_sessions'
         }
+        bool_keys = {'ssl_verify', 'background_profiling'}
+        int_keys = {'profiling_workers', 'profiling_poll_seconds', 'sketch_cache_mb', 'catalog_max_concurrency',
+                    'catalog_retries', 'catalog_breaker_failures', 'session_idle_seconds',
+                    'session_quota_mb', 'session_memory_mb', 'max_sessions'}
+        float_keys = {'catalog_connect_timeout', 'catalog_read_timeout', 'catalog_backoff_seconds',
+                      'catalog_breaker_reset_seconds'}
         
         for env_var, config_key in optional_vars.items():
             value = os.getenv(env_var)
             if value is not None:
-                if config_key == 'ssl_verify':
+                if config_key in bool_keys:
                     config_data[config_key] = value.lower() in ('true', '1', 'yes')
+                elif config_key in int_keys:
+                    config_data[config_key] = int(value)
+                elif config_key in float_keys:
+                    config_data[config_key] = float(value)
                 else:
                     config_data[config_key] = value
         
         return cls(**config_data)
     
-    def to_pyiceberg_catalog_config(self):
-        """Convert to PyIceberg catalog configuration"""
+    def to_pyiceberg_catalog_config(self, ref: Optional[str] = None):
+        """Convert to PyIceberg catalog configuration, optionally for another Nessie ref"""
+        ref = ref or self.nessie_ref
         config = {
             "type": "rest",
-            "uri": self.nessie_uri,
-            "ref": self.nessie_ref,
+            "uri": self._catalog_uri_for_ref(ref),
+            "ref": ref,
             "s3.endpoint": self.s3_endpoint,
             "s3.access-key-id": self.s3_access_key,
             "s3.secret-access-key": self.s3_secret_key,
@@ -113,6 +165,18 @@ class LakehouseConfig:
         
         return config
 
+    def _catalog_uri_for_ref(self, ref: str) -> str:
+        """Nessie's Iceberg REST endpoint selects the ref by path (.../iceberg/<ref>)"""
+        uri = self.nessie_uri.rstrip('/')
+        if ref == self.nessie_ref:
+            return self.nessie_uri
+        if '/iceberg' not in uri:
+            raise ValueError(
+                f"Cannot read ref {ref}: the catalog URI {self.nessie_uri} is not a Nessie Iceberg REST "
+                f"endpoint (http://<host>:19120/iceberg[/<ref>]), so it cannot select another ref")
+        base = uri[:uri.rindex('/iceberg') + len('/iceberg')]
+        return f"{base}/{ref}"
+
 def get_config() -> LakehouseConfig:
     """Get configuration from environment or config file"""
     # Try config file first
@@ -2,38 +2,116 @@
 Core lakehouse exploration functionality for web interface with DuckDB integration
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Callable, List, Dict, Any, Optional, Tuple, Iterator
 import pandas as pd
+import pyarrow as pa
 import duckdb
 from pyiceberg.catalog import load_catalog
+from pyiceberg.catalog import Catalog
+from pyiceberg.expressions import AlwaysTrue
 from pyiceberg.table import Table
+from pyiceberg.table.snapshots import Snapshot, ancestors_of
 from pyiceberg.schema import Schema
 import json
 import traceback
 from datetime import datetime
 import tempfile
+import threading
 import os
+import re
+from collections import OrderedDict
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 
 from app.core.config import LakehouseConfig
+from app.core.catalog_pool import CatalogPool, TableVersion
+from app.core.rest_transport import CatalogUnavailable
+from app.core.snapshot_diff import SnapshotDiff, CHANGE_TYPES
+from app.core.manifests import arrow_schema, manifest_column_statistics, partition_summary, snapshot_schema
+from app.core.profiling import DEFAULT_SKETCH_CACHE_BYTES, SketchStore, TableProfiler
+from app.core.approximate import ApproximateQuery
+from app.core.streaming import StreamingQuery
+from app.core.paging import TablePager
+from app.core.planner import CostPlanner, Plan, ENGINES, analyze_query
+from app.core.profiling_worker import ProfilingWorker, table_key
+from app.core.stats_store import StatsStore, PersistentSketchStore
+from app.core.sessions import SessionManager
+
+# Parts of a table's details that can be requested together
+DETAIL_PARTS = ("schema", "metadata", "preview", "partitions", "statistics")
+# Table snapshots whose file layout is kept for paging
+MAX_PAGERS = 32
 
 class LakehouseExplorer:
     """Main class for exploring lakehouse tables via web interface with DuckDB integration"""
     
-    def __init__(self, config: LakehouseConfig):
+    def __init__(self, config: LakehouseConfig, catalog: Optional[Catalog] = None):
         self.config = config
+        self.catalogs = CatalogPool(config, catalog)
+        self.stats_store = None
+        self.profiling_worker = None
+        self.profiler = TableProfiler(SketchStore(self._sketch_cache_bytes()))
+        self._setup_stats_store()
         self.catalog = None
         self.duckdb_conn = None
+        self.native_iceberg_scan = False
+        self._duckdb_lock = threading.Lock()
+        self._pagers: "OrderedDict[Tuple[str, Optional[int]], TablePager]" = OrderedDict()
+        self._pagers_lock = threading.Lock()
+        self.sessions = None
         self._connect_to_catalog()
         self._setup_duckdb()
+        self._setup_sessions()
+        self.planner = CostPlanner(duckdb_available=self.duckdb_conn is not None,
+                                   native_scan=self.native_iceberg_scan)
     
     def _connect_to_catalog(self):
-        """Initialize connection to Nessie catalog"""
+        """Initialize connection to Nessie catalog (at the configured default ref)"""
         try:
-            catalog_config = self.config.to_pyiceberg_catalog_config()
-            self.catalog = load_catalog("lakehouse", **catalog_config)
+            self.catalog = self.catalogs.get_catalog()
         except Exception as e:
             raise ConnectionError(f"Failed to connect to catalog: {str(e)}")
     
+    def _load_table(self, namespace: Tuple[str, ...], table_name: str,
+                    version: Optional[TableVersion] = None) -> Tuple[Table, Optional[Snapshot]]:
+        """Load a table and the snapshot selected by ref/snapshot_id/as_of"""
+        return self.catalogs.load_table_version((*namespace, table_name), version)
+    
+    def _sketch_cache_bytes(self) -> int:
+        return self.config.sketch_cache_mb * 1024 * 1024 if self.config else DEFAULT_SKETCH_CACHE_BYTES
+
+    def _setup_stats_store(self):
+        """Persist profiles and file sketches, and prepare the background profiler, if configured"""
+        if not self.config or not self.config.stats_store_path:
+            return
+        try:
+            self.stats_store = StatsStore(self.config.stats_store_path)
+            self.profiler = TableProfiler(PersistentSketchStore(self.stats_store, self._sketch_cache_bytes()))
+            self.profiling_worker = ProfilingWorker(self, self.stats_store,
+                                                    max_concurrency=self.config.profiling_workers,
+                                                    poll_interval=self.config.profiling_poll_seconds)
+        except Exception as e:
+            print(f"Warning: Failed to open statistics store: {e}")
+            self.stats_store = None
+            self.profiling_worker = None
+    
+    def _setup_sessions(self):
+        """Analyst sessions, each with its own on-disk DuckDB database for saved results"""
+        if self.duckdb_conn is None:
+            return
+        config = self.config
+        path = (config.sessions_path if config and config.sessions_path
+                else os.path.join(tempfile.gettempdir(), "lakehouse-explorer-sessions"))
+        try:
+            if config:
+                self.sessions = SessionManager(path, config.session_idle_seconds, config.session_quota_mb,
+                                               config.session_memory_mb, config.max_sessions)
+            else:
+                self.sessions = SessionManager(path)
+        except Exception as e:
+            print(f"Warning: Failed to set up analyst sessions: {e}")
+            self.sessions = None
+    
     def _setup_duckdb(self):
         """Initialize DuckDB connection with Iceberg extension"""
         try:
@@ -43,6 +121,8 @@ class LakehouseExplorer:
             try:
                 self.duckdb_conn.execute("INSTALL iceberg")
                 self.duckdb_conn.execute("LOAD iceberg")
+                self._setup_duckdb_storage()
+                self.native_iceberg_scan = True
                 print("✅ DuckDB Iceberg extension loaded")
             except Exception as e:
                 print(f"⚠️  DuckDB Iceberg extension not available: {e}")
@@ -56,143 +136,320 @@ class LakehouseExplorer:
             print(f"Warning: Failed to initialize DuckDB: {e}")
             self.duckdb_conn = None
     
-    def list_namespaces(self) -> List[Tuple[str, ...]]:
+    def _setup_duckdb_storage(self):
+        """Give DuckDB the S3 credentials, so iceberg_scan can read the warehouse directly"""
+        if not self.config or not self.config.s3_endpoint:
+            return
+        endpoint = self.config.s3_endpoint
+        use_ssl = endpoint.startswith("https://")
+        endpoint = endpoint.split("://", 1)[-1].rstrip("/")
+        literal = lambda value: "'" + str(value).replace("'", "''") + "'"
+        self.duckdb_conn.execute(f"""
+            CREATE OR REPLACE SECRET lakehouse_s3 (
+                TYPE S3, KEY_ID {literal(self.config.s3_access_key)}, SECRET {literal(self.config.s3_secret_key)},
+                REGION {literal(self.config.s3_region)}, ENDPOINT {literal(endpoint)},
+                URL_STYLE 'path', USE_SSL {str(use_ssl).lower()}
+            )
+        """)
+    
+    def _native_scan(self, table: Table, snapshot: Optional[Snapshot]) -> str:
+        """DuckDB's iceberg_scan of a table snapshot, for use in a FROM clause"""
+        location = table.metadata_location
+        if location.startswith("file://"):
+            location = location[len("file://"):]
+        location = location.replace("'", "''")
+        if snapshot is None:
+            return f"iceberg_scan('{location}')"
+        return f"iceberg_scan('{location}', snapshot_from_id = {snapshot.snapshot_id})"
+    
+    def _run_plan(self, plan: Plan, runners: Dict[str, Callable[[], Any]], description: str) -> Any:
+        """Run the plan's strategy, falling back to the next cheapest one if it fails
+
+        Errors in the SQL itself are raised at once: no other strategy would
+        do better. Unknown tables or functions are such errors too, except
+        with iceberg_scan, which fails that way when the extension is missing.
+        """
+        error = None
+        for strategy in plan.order():
+            try:
+                result = runners[strategy]()
+                plan.strategy = strategy
+                return result
+            except (duckdb.ParserException, duckdb.BinderException):
+                raise
+            except Exception as e:
+                if isinstance(e, duckdb.CatalogException) and strategy != "iceberg_scan":
+                    raise
+                print(f"{description} with {strategy} failed, trying the next strategy: {e}")
+                plan.failures.append({"strategy": strategy, "error": str(e)})
+                error = e
+        raise error
+    
+    def _duckdb_cursor(self) -> duckdb.DuckDBPyConnection:
+        """A cursor of its own for one request; the shared connection is not thread-safe"""
+        with self._duckdb_lock:
+            return self.duckdb_conn.cursor()
+    
+    def list_namespaces(self, ref: Optional[str] = None) -> List[Tuple[str, ...]]:
         """List all available namespaces"""
         try:
-            namespaces = list(self.catalog.list_namespaces())
+            namespaces = list(self.catalogs.get_catalog(ref).list_namespaces())
             return namespaces
+        except CatalogUnavailable:
+            raise
         except Exception as e:
             raise RuntimeError(f"Error listing namespaces: {str(e)}")
     
-    def list_tables_in_namespace(self, namespace: Tuple[str, ...]) -> List[str]:
+    def list_tables_in_namespace(self, namespace: Tuple[str, ...], ref: Optional[str] = None) -> List[str]:
         """List all tables in a given namespace"""
         try:
-            tables = list(self.catalog.list_tables(namespace))
+            tables = list(self.catalogs.get_catalog(ref).list_tables(namespace))
             # Extract just the table names
             return [table[-1] for table in tables]
+        except CatalogUnavailable:
+            raise
         except Exception as e:
             raise RuntimeError(f"Error listing tables in namespace {namespace}: {str(e)}")
     
-    def get_all_tables(self) -> Dict[Tuple[str, ...], List[str]]:
+    def get_all_tables(self, ref: Optional[str] = None) -> Dict[Tuple[str, ...], List[str]]:
         """Get all tables organized by namespace"""
         try:
-            namespaces = self.list_namespaces()
+            namespaces = self.list_namespaces(ref)
             all_tables = {}
             
             for namespace in namespaces:
                 try:
-                    tables = self.list_tables_in_namespace(namespace)
+                    tables = self.list_tables_in_namespace(namespace, ref)
                     all_tables[namespace] = tables
+                except CatalogUnavailable:
+                    raise
                 except Exception as e:
                     print(f"Warning: Could not list tables in namespace {namespace}: {str(e)}")
                     all_tables[namespace] = []
             
             return all_tables
+        except CatalogUnavailable:
+            raise
         except Exception as e:
             raise RuntimeError(f"Error getting all tables: {str(e)}")
     
-    def get_table_schema(self, namespace: Tuple[str, ...], table_name: str) -> Optional[Dict[str, Any]]:
+    def get_table_identity(self, namespace: Tuple[str, ...], table_name: str,
+                           version: Optional[TableVersion] = None) -> Dict[str, Any]:
+        """Metadata location and snapshot id of a table version, read from table metadata only"""
+        table, snapshot = self._load_table(namespace, table_name, version)
+        return {
+            "metadata_location": table.metadata_location,
+            "snapshot_id": snapshot.snapshot_id if snapshot else None
+        }
+    
+    def get_table_schema(self, namespace: Tuple[str, ...], table_name: str,
+                         version: Optional[TableVersion] = None) -> Optional[Dict[str, Any]]:
         """Get table schema information"""
         try:
-            table = self.catalog.load_table((*namespace, table_name))
-            schema = table.schema()
+            table, snapshot = self._load_table(namespace, table_name, version)
+            return self._schema_info(snapshot_schema(table, snapshot))
             
-            # Convert schema to JSON-serializable format
-            schema_info = {
-                "schema_id": schema.schema_id,
-                "fields": []
+        except (ValueError, CatalogUnavailable):
+            raise
+        except Exception as e:
+            print(f"Error getting schema for table {namespace}.{table_name}: {str(e)}")
+            return None
+    
+    def _schema_info(self, schema: Schema) -> Dict[str, Any]:
+        """Convert schema to JSON-serializable format"""
+        schema_info = {
+            "schema_id": schema.schema_id,
+            "fields": []
+        }
+        
+        for field in schema.fields:
+            field_info = {
+                "id": field.field_id,
+                "name": field.name,
+                "type": str(field.field_type),
+                "required": field.required,
+                "doc": field.doc
             }
+            schema_info["fields"].append(field_info)
+        
+        return schema_info
+    
+    def get_table_metadata(self, namespace: Tuple[str, ...], table_name: str,
+                           version: Optional[TableVersion] = None) -> Optional[Dict[str, Any]]:
+        """Get table metadata and properties"""
+        try:
+            table, snapshot = self._load_table(namespace, table_name, version)
+            return self._table_metadata(table, snapshot)
             
-            for field in schema.fields:
-                field_info = {
-                    "id": field.field_id,
+        except (ValueError, CatalogUnavailable):
+            raise
+        except Exception as e:
+            print(f"Error getting metadata for table {namespace}.{table_name}: {str(e)}")
+            return None
+    
+    def _table_metadata(self, table: Table, snapshot: Optional[Snapshot]) -> Dict[str, Any]:
+        """Metadata and properties of an already loaded table"""
+        metadata = {
+            "location": table.location(),
+            "metadata_location": table.metadata_location,
+            "schema": self._schema_info(snapshot_schema(table, snapshot)),
+            "properties": dict(table.properties),
+            "current_snapshot_id": snapshot.snapshot_id if snapshot else None,
+            "snapshot_count": len(table.metadata.snapshots),
+            "last_updated_ms": table.metadata.last_updated_ms,
+            "format_version": table.format_version,
+            "table_uuid": str(table.metadata.table_uuid),
+            "refs": {name: ref.snapshot_id for name, ref in table.metadata.refs.items()}
+        }
+        
+        # Add partition information if available
+        if table.spec().fields:
+            metadata["partitions"] = [
+                {
+                    "field_id": field.source_id,
                     "name": field.name,
-                    "type": str(field.field_type),
-                    "required": field.required,
-                    "doc": field.doc
+                    "transform": str(field.transform)
                 }
-                schema_info["fields"].append(field_info)
-            
-            return schema_info
+                for field in table.spec().fields
+            ]
+        else:
+            metadata["partitions"] = []
+        
+        return metadata
+    
+    def preview_table_data(self, namespace: Tuple[str, ...], table_name: str, limit: int = 10,
+                           version: Optional[TableVersion] = None,
+                           strategy: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Preview table data with the cheapest strategy for the table's size (or the given one)"""
+        try:
+            table, snapshot = self._load_table(namespace, table_name, version)
+            return self._preview(table, snapshot, limit, strategy)
             
+        except (ValueError, CatalogUnavailable):
+            raise
         except Exception as e:
-            print(f"Error getting schema for table {namespace}.{table_name}: {str(e)}")
+            print(f"Error previewing table {namespace}.{table_name}: {str(e)}")
             return None
     
-    def get_table_metadata(self, namespace: Tuple[str, ...], table_name: str) -> Optional[Dict[str, Any]]:
-        """Get table metadata and properties"""
+    def _pager(self, table: Table, snapshot: Optional[Snapshot]) -> TablePager:
+        """Get the (cached) pager of a table snapshot"""
+        key = (str(table.metadata.table_uuid), snapshot.snapshot_id if snapshot else None)
+        with self._pagers_lock:
+            pager = self._pagers.get(key)
+            if pager is not None:
+                self._pagers.move_to_end(key)
+                return pager
+        
+        pager = TablePager(table, snapshot)
+        with self._pagers_lock:
+            self._pagers[key] = pager
+            while len(self._pagers) > MAX_PAGERS:
+                self._pagers.popitem(last=False)
+        return pager
+    
+    def _table_page(self, namespace: Tuple[str, ...], table_name: str, offset: int, limit: int,
+                    columns: Optional[List[str]], version: Optional[TableVersion]):
+        table, snapshot = self._load_table(namespace, table_name, version)
+        pager = self._pager(table, snapshot)
+        return pager.page(offset, limit, columns), pager.total_rows, snapshot
+    
+    def get_table_page(self, namespace: Tuple[str, ...], table_name: str, offset: int = 0, limit: int = 100,
+                       columns: Optional[List[str]] = None,
+                       version: Optional[TableVersion] = None) -> Optional[Dict[str, Any]]:
+        """Get rows [offset, offset + limit) in columnar form: one list of values per column"""
         try:
-            table = self.catalog.load_table((*namespace, table_name))
-            
-            metadata = {
-                "location": table.location(),
-                "schema": self.get_table_schema(namespace, table_name),
-                "properties": dict(table.properties()),
-                "current_snapshot_id": table.current_snapshot().snapshot_id if table.current_snapshot() else None,
-                "format_version": table.format_version,
-                "table_uuid": str(table.metadata.table_uuid)
+            page, total_rows, snapshot = self._table_page(namespace, table_name, offset, limit, columns, version)
+            result = self._format_dataframe_result(page.to_pandas(), limit)
+            return {
+                "columns": result["columns"],
+                "dtypes": result["dtypes"],
+                "data": [list(values) for values in zip(*result["data"])] or [[] for _ in result["columns"]],
+                "offset": offset,
+                "row_count": page.num_rows,
+                "total_rows": total_rows,
+                "snapshot_id": snapshot.snapshot_id if snapshot else None
             }
             
-            # Add partition information if available
-            if table.spec().fields:
-                metadata["partitions"] = [
-                    {
-                        "field_id": field.source_id,
-                        "name": field.name,
-                        "transform": str(field.transform)
-                    }
-                    for field in table.spec().fields
-                ]
-            else:
-                metadata["partitions"] = []
-            
-            return metadata
-            
+        except (ValueError, CatalogUnavailable):
+            raise
         except Exception as e:
-            print(f"Error getting metadata for table {namespace}.{table_name}: {str(e)}")
+            print(f"Error paging table {namespace}.{table_name}: {str(e)}")
             return None
     
-    def preview_table_data(self, namespace: Tuple[str, ...], table_name: str, limit: int = 10) -> Optional[Dict[str, Any]]:
-        """Preview table data using DuckDB for better performance"""
+    def get_table_page_arrow(self, namespace: Tuple[str, ...], table_name: str, offset: int = 0, limit: int = 100,
+                             columns: Optional[List[str]] = None,
+                             version: Optional[TableVersion] = None) -> Optional[bytes]:
+        """Get rows [offset, offset + limit) as an Arrow IPC stream, with the total row count in its schema metadata"""
         try:
-            table = self.catalog.load_table((*namespace, table_name))
-            
-            # Try DuckDB first for better performance
-            if self.duckdb_conn:
-                try:
-                    return self._preview_with_duckdb(table, limit)
-                except Exception as e:
-                    print(f"DuckDB preview failed, falling back to PyIceberg: {e}")
-            
-            # Fallback to PyIceberg method
-            return self._preview_with_pyiceberg(table, limit)
+            page, total_rows, snapshot = self._table_page(namespace, table_name, offset, limit, columns, version)
+            page = page.replace_schema_metadata({
+                "offset": str(offset),
+                "total_rows": str(total_rows),
+                "snapshot_id": str(snapshot.snapshot_id if snapshot else "")
+            })
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, page.schema) as writer:
+                writer.write_table(page)
+            return sink.getvalue().to_pybytes()
             
+        except (ValueError, CatalogUnavailable):
+            raise
         except Exception as e:
-            print(f"Error previewing table {namespace}.{table_name}: {str(e)}")
+            print(f"Error paging table {namespace}.{table_name}: {str(e)}")
             return None
     
-    def _preview_with_duckdb(self, table: Table, limit: int) -> Dict[str, Any]:
+    def _preview(self, table: Table, snapshot: Optional[Snapshot], limit: int,
+                 strategy: Optional[str] = None) -> Dict[str, Any]:
+        """Preview an already loaded table with the strategy the planner finds cheapest"""
+        snapshot_id = snapshot.snapshot_id if snapshot else None
+        plan = self.planner.plan_preview(table, snapshot, limit, strategy)
+        runners = {
+            "metadata": lambda: self._format_dataframe_result(
+                arrow_schema(snapshot_schema(table, snapshot)).empty_table().to_pandas(), limit),
+            "pyiceberg_limit": lambda: self._preview_with_pyiceberg(table, limit, snapshot_id),
+            "duckdb_stream": lambda: self._preview_streaming(table, snapshot, limit),
+            "iceberg_scan": lambda: self._preview_native(table, snapshot, limit),
+            "duckdb_arrow": lambda: self._preview_with_duckdb(table, limit, snapshot_id)
+        }
+        result = self._run_plan(plan, runners, f"Preview of {'.'.join(table.name())}")
+        result["engine"] = ENGINES[plan.strategy]
+        result["plan"] = plan.to_dict()
+        return result
+    
+    def _preview_with_duckdb(self, table: Table, limit: int, snapshot_id: Optional[int] = None) -> Dict[str, Any]:
         """Preview table data using DuckDB"""
         # Get table files from Iceberg
-        scan = table.scan()
+        scan = table.scan(snapshot_id=snapshot_id)
         arrow_table = scan.to_arrow()
         
-        # Register Arrow table with DuckDB
+        # Register Arrow table with DuckDB (registrations are local to the cursor)
         table_name = "temp_iceberg_table"
-        self.duckdb_conn.register(table_name, arrow_table)
-        
-        # Query with DuckDB for better performance
-        query = f"SELECT * FROM {table_name} LIMIT {limit}"
-        result = self.duckdb_conn.execute(query).fetchdf()
-        
-        # Clean up
-        self.duckdb_conn.unregister(table_name)
+        with self._duckdb_cursor() as cursor:
+            cursor.register(table_name, arrow_table)
+            
+            # Query with DuckDB for better performance
+            query = f"SELECT * FROM {table_name} LIMIT {limit}"
+            result = cursor.execute(query).fetchdf()
         
         return self._format_dataframe_result(result, limit)
     
-    def _preview_with_pyiceberg(self, table: Table, limit: int) -> Dict[str, Any]:
+    def _preview_streaming(self, table: Table, snapshot: Optional[Snapshot], limit: int) -> Dict[str, Any]:
+        """Preview table data by streaming data files into DuckDB until the limit is reached"""
+        temp_table_name = "temp_iceberg_table"
+        with self._duckdb_cursor() as cursor:
+            result = StreamingQuery(table, snapshot).collect(cursor, f"SELECT * FROM {temp_table_name} LIMIT {limit}",
+                                                             temp_table_name)
+        return self._format_dataframe_result(result.to_pandas(), limit)
+    
+    def _preview_native(self, table: Table, snapshot: Optional[Snapshot], limit: int) -> Dict[str, Any]:
+        """Preview table data with DuckDB's own Iceberg reader"""
+        with self._duckdb_cursor() as cursor:
+            result = cursor.execute(f"SELECT * FROM {self._native_scan(table, snapshot)} LIMIT {limit}").fetchdf()
+        return self._format_dataframe_result(result, limit)
+    
+    def _preview_with_pyiceberg(self, table: Table, limit: int, snapshot_id: Optional[int] = None) -> Dict[str, Any]:
         """Preview table data using PyIceberg (fallback method)"""
-        scan = table.scan(limit=limit)
+        scan = table.scan(snapshot_id=snapshot_id, limit=limit)
         df = scan.to_pandas()
         return self._format_dataframe_result(df, limit)
     
@@ -219,43 +476,94 @@ class LakehouseExplorer:
         
         return result
     
-    def execute_sql_query(self, namespace: Tuple[str, ...], table_name: str, sql_query: str, limit: int = 100) -> Optional[Dict[str, Any]]:
-        """Execute SQL query on table using DuckDB"""
+    def _prepare_query(self, namespace: Tuple[str, ...], table_name: str, sql_query: str,
+                       temp_table_name: str) -> str:
+        """Point table references in the SQL at the registered temp table
+
+        Only whole names are replaced, so other tables (e.g. a session's saved
+        tables) whose names contain the table name are left alone.
+        """
+        qualified = re.escape(f"{'.'.join(namespace)}.{table_name}")
+        # SQL identifiers are case-insensitive
+        processed_query = re.sub(rf"(?<![\w.]){qualified}\b", temp_table_name, sql_query, flags=re.IGNORECASE)
+        return re.sub(rf"(?<![\w.]){re.escape(table_name)}\b", temp_table_name, processed_query,
+                      flags=re.IGNORECASE)
+    
+    def execute_sql_query(self, namespace: Tuple[str, ...], table_name: str, sql_query: str, limit: int = 100,
+                          version: Optional[TableVersion] = None, approximate: bool = False,
+                          sample_fraction: float = 0.05, confidence: float = 0.95,
+                          strategy: Optional[str] = None, session_id: Optional[str] = None,
+                          save_as: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Execute SQL query on table using DuckDB
+
+        The planner picks how the table is read (see app.core.planner) unless
+        ``strategy`` names one. In approximate mode the query runs on a
+        stratified sample of row groups and COUNT/SUM results are scaled with
+        confidence intervals.
+
+        With ``session_id`` the query runs in that analyst session, so it can
+        also read the session's saved tables; ``save_as`` saves the whole
+        result there as a table (the response shows its first ``limit`` rows).
+        """
+        if save_as and not session_id:
+            raise ValueError("save_as needs a session_id")
+        if approximate and session_id:
+            raise ValueError("Approximate queries cannot run in a session")
         try:
             if not self.duckdb_conn:
                 return {"error": "DuckDB not available for SQL queries"}
             
-            table = self.catalog.load_table((*namespace, table_name))
-            
-            # Get table data as Arrow
-            scan = table.scan()
-            arrow_table = scan.to_arrow()
-            
-            # Register with DuckDB
-            temp_table_name = f"table_{table_name}"
-            self.duckdb_conn.register(temp_table_name, arrow_table)
-            
-            # Replace table references in SQL
-            processed_query = sql_query.replace(f"{'.'.join(namespace)}.{table_name}", temp_table_name)
-            processed_query = processed_query.replace(table_name, temp_table_name)
+            table, snapshot = self._load_table(namespace, table_name, version)
             
-            # Add limit if not present
-            if "LIMIT" not in processed_query.upper():
-                processed_query += f" LIMIT {limit}"
+            if approximate:
+                return self._execute_approximate_query(namespace, table_name, table, snapshot, sql_query, limit,
+                                                       sample_fraction, confidence)
             
-            # Execute query
-            result_df = self.duckdb_conn.execute(processed_query).fetchdf()
+            with (self._use_session(session_id) if session_id else nullcontext()) as session:
+                # Replace table references in SQL
+                temp_table_name = f"table_{table_name}"
+                processed_query = self._prepare_query(namespace, table_name, sql_query, temp_table_name)
+                
+                # Add limit if not present (a saved result is kept whole)
+                if "LIMIT" not in processed_query.upper() and not save_as:
+                    processed_query += f" LIMIT {limit}"
+                
+                columns = [field.name for field in snapshot_schema(table, snapshot).fields]
+                with self._duckdb_cursor() as cursor:
+                    shape = analyze_query(cursor, processed_query, temp_table_name, columns)
+                run_query = processed_query
+                if save_as:
+                    # The count from metadata cannot be saved as a table
+                    shape.count_star = None
+                    run_query = session.create_table_sql(save_as, processed_query)
+                plan = self.planner.plan_query(table, snapshot, shape, strategy)
+                runners = self._query_runners(table, snapshot, plan, run_query, temp_table_name,
+                                              session.cursor if session else self._duckdb_cursor)
+                result_df = self._run_plan(plan, runners, f"Query on {table_name}")
+                
+                saved = None
+                if save_as:
+                    saved = session.record_table(save_as, sql_query, f"{'.'.join((*namespace, table_name))}",
+                                                 snapshot.snapshot_id if snapshot else None)
+                    result_df = session.head(save_as, limit)
             
-            # Clean up
-            self.duckdb_conn.unregister(temp_table_name)
-            
-            return {
+            result = self._format_dataframe_result(result_df, limit)
+            result["engine"] = ENGINES[plan.strategy]
+            response = {
                 "query": sql_query,
                 "processed_query": processed_query,
-                "result": self._format_dataframe_result(result_df, limit),
+                "result": result,
+                "snapshot_id": snapshot.snapshot_id if snapshot else None,
+                "plan": plan.to_dict(),
                 "success": True
             }
+            if session_id:
+                response["session_id"] = session_id
+                response["saved_table"] = saved
+            return response
             
+        except (ValueError, CatalogUnavailable):
+            raise
         except Exception as e:
             return {
                 "query": sql_query,
@@ -263,91 +571,359 @@ class LakehouseExplorer:
                 "success": False
             }
     
-    def get_table_statistics(self, namespace: Tuple[str, ...], table_name: str) -> Optional[Dict[str, Any]]:
-        """Get table statistics using DuckDB for better performance"""
+    def _query_runners(self, table: Table, snapshot: Optional[Snapshot], plan: Plan, sql: str,
+                       temp_table_name: str, duckdb_cursor: Optional[Callable] = None
+                       ) -> Dict[str, Callable[[], pd.DataFrame]]:
+        """How each strategy runs ``sql``, which reads the table as ``temp_table_name``
+
+        ``duckdb_cursor`` opens the cursor the SQL runs on (by default one of
+        the shared in-memory connection; a session's for session queries).
+        """
+        duckdb_cursor = duckdb_cursor or self._duckdb_cursor
+        snapshot_id = snapshot.snapshot_id if snapshot else None
+        row_filter = plan.row_filter if plan.row_filter is not None else AlwaysTrue()
+        shape = plan.shape
+        
+        def over_arrow(arrow_table: pa.Table) -> pd.DataFrame:
+            with duckdb_cursor() as cursor:
+                cursor.register(temp_table_name, arrow_table)
+                return cursor.execute(sql).fetchdf()
+        
+        def limited() -> pd.DataFrame:
+            # The filter is the whole WHERE clause here, so the first rows PyIceberg finds are rows of the result
+            scan = table.scan(snapshot_id=snapshot_id, row_filter=row_filter, case_sensitive=False,
+                              selected_fields=tuple(shape.columns) if shape.columns else ("*",), limit=shape.limit)
+            return over_arrow(scan.to_arrow())
+        
+        def streamed() -> pd.DataFrame:
+            with duckdb_cursor() as cursor:
+                streaming = StreamingQuery(table, snapshot, row_filter=plan.row_filter)
+                return streaming.collect(cursor, sql, temp_table_name).to_pandas()
+        
+        def native() -> pd.DataFrame:
+            with duckdb_cursor() as cursor:
+                cursor.execute(f"CREATE OR REPLACE TEMP VIEW {temp_table_name} AS "
+                               f"SELECT * FROM {self._native_scan(table, snapshot)}")
+                return cursor.execute(sql).fetchdf()
+        
+        def materialized() -> pd.DataFrame:
+            # With a filter, only the files (and rows) it can match are loaded
+            scan = table.scan(snapshot_id=snapshot_id, row_filter=row_filter, case_sensitive=False)
+            return over_arrow(scan.to_arrow())
+        
+        return {
+            "metadata": lambda: pd.DataFrame({shape.count_star: [plan.estimate.records]}),
+            "pyiceberg_limit": limited,
+            "duckdb_stream": streamed,
+            "iceberg_scan": native,
+            "duckdb_arrow": materialized
+        }
+    
+    def stream_sql_query(self, namespace: Tuple[str, ...], table_name: str, sql_query: str, limit: int = 10000,
+                         version: Optional[TableVersion] = None, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Execute SQL query on table using DuckDB, streaming progress and rows as the scan proceeds
+
+        The first message describes the query and the scan, followed by
+        progress messages and row batches, and a final summary (or an error).
+        """
+        if not self.duckdb_conn:
+            yield {"event": "error", "query": sql_query, "error": "DuckDB not available for SQL queries"}
+            return
+        
+        table, snapshot = self._load_table(namespace, table_name, version)
+        streaming = StreamingQuery(table, snapshot, batch_size)
+        
+        temp_table_name = f"table_{table_name}"
+        processed_query = self._prepare_query(namespace, table_name, sql_query, temp_table_name)
+        if "LIMIT" not in processed_query.upper():
+            processed_query += f" LIMIT {limit}"
+        
+        yield {
+            "event": "start",
+            "query": sql_query,
+            "processed_query": processed_query,
+            "snapshot_id": snapshot.snapshot_id if snapshot else None,
+            **streaming.progress()
+        }
+        
+        try:
+            with self._duckdb_cursor() as cursor:
+                convert = lambda batch: self._format_dataframe_result(batch.to_pandas(), batch.num_rows)
+                for message in streaming.run(cursor, processed_query, temp_table_name, convert):
+                    if message["event"] == "batch":
+                        result = message["batch"]
+                        message = {"event": "rows", "columns": result["columns"], "dtypes": result["dtypes"],
+                                   "data": result["data"]}
+                    yield message
+        except Exception as e:
+            yield {"event": "error", "query": sql_query, "error": str(e), **streaming.progress()}
+    
+    def _execute_approximate_query(self, namespace: Tuple[str, ...], table_name: str, table: Table,
+                                   snapshot: Optional[Snapshot], sql_query: str, limit: int,
+                                   sample_fraction: float, confidence: float) -> Dict[str, Any]:
+        """Answer a query from a row-group sample, scaling COUNT/SUM with confidence intervals"""
+        temp_table_name = f"sample_{table_name}"
+        processed_query = self._prepare_query(namespace, table_name, sql_query, temp_table_name)
+        
+        approximation = ApproximateQuery(table, snapshot, sample_fraction, confidence=confidence)
+        with self._duckdb_cursor() as cursor:
+            result_df, info = approximation.run(cursor, processed_query, temp_table_name, limit)
+        
+        return {
+            "query": sql_query,
+            "processed_query": processed_query,
+            "result": self._format_dataframe_result(result_df, limit),
+            "snapshot_id": snapshot.snapshot_id if snapshot else None,
+            "approximate": info,
+            "success": True
+        }
+    
+    def _snapshot_diff(self, namespace: Tuple[str, ...], table_name: str, from_version: TableVersion,
+                       to_version: Optional[TableVersion], change_type: Optional[str]) -> SnapshotDiff:
+        """Build the file-level diff between two snapshots (possibly on different refs) of a table"""
+        if change_type is not None and change_type not in CHANGE_TYPES:
+            raise ValueError(f"Invalid change type: {change_type} (expected one of {', '.join(CHANGE_TYPES)})")
+
+        _, from_snapshot = self._load_table(namespace, table_name, from_version)
+        to_table, to_snapshot = self._load_table(namespace, table_name, to_version)
+        return SnapshotDiff(to_table.io, from_snapshot, to_snapshot, snapshot_schema(to_table, to_snapshot))
+
+    def diff_snapshots(self, namespace: Tuple[str, ...], table_name: str, from_version: TableVersion,
+                       to_version: Optional[TableVersion] = None, change_type: Optional[str] = None,
+                       offset: int = 0, limit: int = 100) -> Optional[Dict[str, Any]]:
+        """Get a page of the rows inserted/deleted between two snapshots, reading only changed files"""
         try:
-            if not self.duckdb_conn:
-                return self._get_basic_statistics(namespace, table_name)
-            
-            table = self.catalog.load_table((*namespace, table_name))
-            scan = table.scan()
-            arrow_table = scan.to_arrow()
-            
-            # Register with DuckDB
-            temp_table_name = f"stats_table_{table_name}"
-            self.duckdb_conn.register(temp_table_name, arrow_table)
-            
-            # Get basic statistics
-            stats_query = f"""
-            SELECT 
-                COUNT(*) as row_count,
-                COUNT(DISTINCT *) as distinct_rows
-            FROM {temp_table_name}
-            """
-            
-            basic_stats = self.duckdb_conn.execute(stats_query).fetchdf().iloc[0]
-            
-            # Get column statistics
-            columns = arrow_table.column_names
-            column_stats = {}
-            
-            for col in columns:
-                try:
-                    col_query = f"""
-                    SELECT 
-                        COUNT(*) as count,
-                        COUNT(DISTINCT "{col}") as distinct_count,
-                        COUNT(*) - COUNT("{col}") as null_count
-                    FROM {temp_table_name}
-                    """
-                    col_result = self.duckdb_conn.execute(col_query).fetchdf().iloc[0]
-                    column_stats[col] = {
-                        "count": int(col_result['count']),
-                        "distinct_count": int(col_result['distinct_count']),
-                        "null_count": int(col_result['null_count']),
-                        "null_percentage": round((col_result['null_count'] / col_result['count']) * 100, 2) if col_result['count'] > 0 else 0
-                    }
-                except Exception as e:
-                    column_stats[col] = {"error": str(e)}
-            
-            # Clean up
-            self.duckdb_conn.unregister(temp_table_name)
-            
+            diff = self._snapshot_diff(namespace, table_name, from_version, to_version, change_type)
+
+            frames = []
+            remaining = limit
+            for change, batch in diff.iter_rows(change_type, offset):
+                batch = batch.slice(0, remaining)
+                df = batch.to_pandas()
+                df.insert(0, "_change", change)
+                frames.append(df)
+                remaining -= batch.num_rows
+                if remaining <= 0:
+                    break
+
+            if frames:
+                page = pd.concat(frames, ignore_index=True)
+            else:
+                page = pd.DataFrame(columns=["_change"] + [f.name for f in diff.schema.fields])
+
+            summary = diff.summary()
+            total = sum(summary[f"{change}_rows"] for change in CHANGE_TYPES
+                        if change_type is None or change == change_type)
+            next_offset = offset + len(page)
+
             return {
-                "total_rows": int(basic_stats['row_count']),
-                "distinct_rows": int(basic_stats['distinct_rows']),
-                "column_statistics": column_stats,
-                "engine": "duckdb"
+                "summary": summary,
+                "changes": self._format_dataframe_result(page, limit),
+                "change_type": change_type,
+                "offset": offset,
+                "total_changes": total,
+                "next_offset": next_offset if next_offset < total else None
             }
+
+        except (ValueError, CatalogUnavailable):
+            raise
+        except Exception as e:
+            print(f"Error diffing snapshots of table {namespace}.{table_name}: {str(e)}")
+            return None
+
+    def stream_snapshot_diff(self, namespace: Tuple[str, ...], table_name: str, from_version: TableVersion,
+                             to_version: Optional[TableVersion] = None, change_type: Optional[str] = None,
+                             offset: int = 0, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Stream the changed rows between two snapshots batch by batch
+
+        The first message holds the diff summary, each following message one
+        batch of rows of a single change type, and the last one the row total.
+        """
+        diff = self._snapshot_diff(namespace, table_name, from_version, to_version, change_type)
+        yield {"summary": diff.summary()}
+
+        rows = 0
+        for change, batch in diff.iter_rows(change_type, offset, batch_size=batch_size):
+            result = self._format_dataframe_result(batch.to_pandas(), batch.num_rows)
+            rows += result["row_count"]
+            yield {"change": change, "columns": result["columns"], "data": result["data"]}
+
+        yield {"done": True, "rows": rows}
+
+    def get_table_details(self, namespace: Tuple[str, ...], table_name: str, parts: Optional[List[str]] = None,
+                          version: Optional[TableVersion] = None, preview_limit: int = 10) -> Dict[str, Any]:
+        """Get several parts of a table's details, loading the table once and computing the parts concurrently
+
+        A part that fails is reported as {"error": ...} without failing the others.
+        """
+        parts = list(dict.fromkeys(parts)) if parts else list(DETAIL_PARTS)
+        unknown = [part for part in parts if part not in DETAIL_PARTS]
+        if unknown:
+            raise ValueError(f"Unknown detail part(s): {', '.join(unknown)}. Valid parts: {', '.join(DETAIL_PARTS)}")
+        
+        table, snapshot = self._load_table(namespace, table_name, version)
+        builders = {
+            "schema": lambda: self._schema_info(snapshot_schema(table, snapshot)),
+            "metadata": lambda: self._table_metadata(table, snapshot),
+            "preview": lambda: self._preview(table, snapshot, preview_limit),
+            "partitions": lambda: partition_summary(table, snapshot),
+            "statistics": lambda: self._table_statistics(namespace, table_name, table, snapshot, version=version)
+        }
+        
+        with ThreadPoolExecutor(max_workers=len(parts)) as executor:
+            futures = {part: executor.submit(builders[part]) for part in parts}
+        
+        details = {"snapshot_id": snapshot.snapshot_id if snapshot else None}
+        for part, future in futures.items():
+            try:
+                details[part] = future.result()
+            except Exception as e:
+                print(f"Error getting {part} for table {namespace}.{table_name}: {str(e)}")
+                details[part] = {"error": str(e)}
+        return details
+    
+    def get_tables_details(self, tables: List[Tuple[Tuple[str, ...], str]], parts: Optional[List[str]] = None,
+                           version: Optional[TableVersion] = None, preview_limit: int = 10,
+                           max_workers: int = 8) -> List[Dict[str, Any]]:
+        """Get details of many tables at once, several tables at a time"""
+        def details(item):
+            namespace, table_name = item
+            try:
+                return self.get_table_details(namespace, table_name, parts, version, preview_limit)
+            except Exception as e:
+                return {"error": str(e)}
+        
+        if not tables:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tables))) as executor:
+            return list(executor.map(details, tables))
+    
+    def get_table_statistics(self, namespace: Tuple[str, ...], table_name: str,
+                             version: Optional[TableVersion] = None, refresh: bool = False,
+                             strategy: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get table statistics by merging per-file sketches, profiling only files not seen before
+
+        With a statistics store, stored profiles are returned immediately; a
+        missing profile is queued for the background worker. For the current
+        snapshot the latest stored profile of one of its ancestors is returned
+        meanwhile (stale); any other version is never answered with another
+        snapshot's profile. Tables too large to profile within the planner's
+        budget get statistics from manifest metrics instead.
+        """
+        try:
+            table, snapshot = self._load_table(namespace, table_name, version)
+            return self._table_statistics(namespace, table_name, table, snapshot, refresh, strategy, version)
             
+        except (ValueError, CatalogUnavailable):
+            raise
         except Exception as e:
             print(f"Error getting statistics for table {namespace}.{table_name}: {str(e)}")
-            return self._get_basic_statistics(namespace, table_name)
+            return self._get_basic_statistics(namespace, table_name, version)
+    
+    def _table_statistics(self, namespace: Tuple[str, ...], table_name: str, table: Table,
+                          snapshot: Optional[Snapshot], refresh: bool = False,
+                          strategy: Optional[str] = None,
+                          version: Optional[TableVersion] = None) -> Dict[str, Any]:
+        """Statistics of an already loaded table: stored profile if there is one, else as planned"""
+        key = table_key(namespace, table_name)
+        current = table.current_snapshot()
+        background = self.profiling_worker is not None and self.profiling_worker.running
+        
+        if self.profiling_worker:
+            self.profiling_worker.record_access(namespace, table_name)
+        
+        if self.stats_store and snapshot and not refresh and not strategy:
+            stored = self.stats_store.get_profile(key, snapshot.snapshot_id)
+            if stored:
+                plan = self.planner.plan_statistics(table, snapshot, None, None)
+                return self._with_freshness(stored["profile"], "fresh", stored, current, plan)
+            
+            if background and current and snapshot.snapshot_id == current.snapshot_id:
+                self.profiling_worker.request(namespace, table_name, self._profiling_version(version, snapshot))
+                ancestors = [s.snapshot_id for s in ancestors_of(snapshot, table.metadata)]
+                latest = self.stats_store.latest_profile(key, ancestors)
+                if latest:
+                    plan = self.planner.plan_statistics(table, snapshot, None, None)
+                    return self._with_freshness(latest["profile"], "stale", latest, current, plan, True)
+        
+        # A refresh asks for a full profile
+        pending_files, pending_bytes = self.profiler.pending(table, snapshot)
+        plan = self.planner.plan_statistics(table, snapshot, pending_files, pending_bytes,
+                                            strategy or ("sketches" if refresh else None))
+        runners = {
+            "sketches": lambda: self.profiler.profile(table, snapshot),
+            "metadata": lambda: manifest_column_statistics(table, snapshot),
+            "pyiceberg_limit": lambda: self._sample_statistics(table, snapshot)
+        }
+        stats = self._run_plan(plan, runners, f"Statistics of {table_name}")
+        if plan.strategy == "sketches":
+            if self.stats_store and snapshot:
+                self.stats_store.put_profile(key, snapshot.snapshot_id, stats)
+            return self._with_freshness(stats, "computed", None, current, plan)
+        if background and snapshot:
+            # Profile this snapshot in the background; the next request gets the full statistics
+            self.profiling_worker.request(namespace, table_name, self._profiling_version(version, snapshot))
+            return self._with_freshness(stats, "computed", None, current, plan, True)
+        return self._with_freshness(stats, "computed", None, current, plan)
+    
+    @staticmethod
+    def _profiling_version(version: Optional[TableVersion], snapshot: Snapshot) -> Optional[TableVersion]:
+        """The version a background profile should read: the requested snapshot, on the requested ref"""
+        if version is None or version.is_default:
+            return None  # the current snapshot, shared with the watcher's job
+        return TableVersion(ref=version.ref, snapshot_id=snapshot.snapshot_id)
+    
+    def _with_freshness(self, stats: Dict[str, Any], status: str, stored: Optional[Dict[str, Any]],
+                        current: Optional[Snapshot], plan: Optional[Plan] = None,
+                        refresh_pending: bool = False) -> Dict[str, Any]:
+        """Attach how fresh a profile is relative to the table's current snapshot (and how it was obtained)"""
+        computed_at = stored["computed_at"] if stored else datetime.now().timestamp()
+        stats = dict(stats)
+        stats["freshness"] = {
+            "status": status,
+            "snapshot_id": stats.get("snapshot_id"),
+            "current_snapshot_id": current.snapshot_id if current else None,
+            "computed_at": datetime.fromtimestamp(computed_at).isoformat(),
+            "age_seconds": round(datetime.now().timestamp() - computed_at, 1),
+            "refresh_pending": refresh_pending
+        }
+        if plan is not None:
+            stats["plan"] = plan.to_dict()
+        return stats
     
-    def _get_basic_statistics(self, namespace: Tuple[str, ...], table_name: str) -> Dict[str, Any]:
+    def _get_basic_statistics(self, namespace: Tuple[str, ...], table_name: str,
+                              version: Optional[TableVersion] = None) -> Dict[str, Any]:
         """Get basic statistics using PyIceberg (fallback)"""
         try:
-            table = self.catalog.load_table((*namespace, table_name))
-            scan = table.scan(limit=10000)  # Sample for stats
-            df = scan.to_pandas()
-            
-            return {
-                "total_rows": len(df),
-                "distinct_rows": len(df.drop_duplicates()),
-                "column_statistics": {
-                    col: {
-                        "count": len(df[col]),
-                        "distinct_count": df[col].nunique(),
-                        "null_count": df[col].isnull().sum(),
-                        "null_percentage": round((df[col].isnull().sum() / len(df)) * 100, 2)
-                    }
-                    for col in df.columns
-                },
-                "engine": "pyiceberg",
-                "note": "Statistics based on sample of 10,000 rows"
-            }
+            table, snapshot = self._load_table(namespace, table_name, version)
+            return self._sample_statistics(table, snapshot)
+        except CatalogUnavailable:
+            raise
         except Exception as e:
             return {"error": str(e)}
+    
+    def _sample_statistics(self, table: Table, snapshot: Optional[Snapshot]) -> Dict[str, Any]:
+        """Statistics of the first 10,000 rows read by PyIceberg"""
+        scan = table.scan(snapshot_id=snapshot.snapshot_id if snapshot else None, limit=10000)  # Sample for stats
+        df = scan.to_pandas()
+        
+        return {
+            "total_rows": len(df),
+            "distinct_rows": len(df.drop_duplicates()),
+            "column_statistics": {
+                col: {
+                    "count": len(df[col]),
+                    "distinct_count": int(df[col].nunique()),
+                    "null_count": int(df[col].isnull().sum()),
+                    "null_percentage": round((df[col].isnull().sum() / len(df)) * 100, 2) if len(df) else 0
+                }
+                for col in df.columns
+            },
+            "engine": "pyiceberg",
+            "note": "Statistics based on sample of 10,000 rows"
+        }
+    
+    def search_tables(self, search_term: str) -> List[Dict[str, Any]]:
         """Search for tables by name across all namespaces"""
         try:
             all_tables = self.get_all_tables()
@@ -366,10 +942,70 @@ class LakehouseExplorer:
             
             return results
             
+        except CatalogUnavailable:
+            raise
         except Exception as e:
             print(f"Error searching tables: {str(e)}")
             return []
     
+    def _use_session(self, session_id: str):
+        if self.sessions is None:
+            raise ValueError("Analyst sessions are not available (DuckDB is required)")
+        return self.sessions.use(session_id)
+    
+    def create_session(self) -> Dict[str, Any]:
+        """Start an analyst session for saving and reusing query results"""
+        if self.sessions is None:
+            raise ValueError("Analyst sessions are not available (DuckDB is required)")
+        return self.sessions.create().to_dict(self.sessions.idle_seconds)
+    
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        return self.sessions.list() if self.sessions else []
+    
+    def get_session(self, session_id: str) -> Dict[str, Any]:
+        """A session's saved tables, storage use and expiry (raises SessionNotFound)"""
+        if self.sessions is None:
+            raise ValueError("Analyst sessions are not available (DuckDB is required)")
+        return self.sessions.get(session_id).to_dict(self.sessions.idle_seconds)
+    
+    def delete_session(self, session_id: str):
+        if self.sessions is None:
+            raise ValueError("Analyst sessions are not available (DuckDB is required)")
+        self.sessions.delete(session_id)
+    
+    def drop_session_table(self, session_id: str, name: str) -> Dict[str, Any]:
+        with self._use_session(session_id) as session:
+            if name not in session.tables:
+                raise ValueError(f"Session {session_id} has no saved table {name}")
+            session.drop_table(name)
+            return session.to_dict(self.sessions.idle_seconds)
+    
+    def execute_session_query(self, session_id: str, sql_query: str, limit: int = 100,
+                              save_as: Optional[str] = None) -> Dict[str, Any]:
+        """Execute SQL over a session's saved tables only, without reading the lakehouse"""
+        try:
+            with self._use_session(session_id) as session:
+                result_df = session.execute(sql_query, limit, save_as)
+                saved = session.tables.get(save_as) if save_as else None
+            
+            result = self._format_dataframe_result(result_df, limit)
+            result["engine"] = "duckdb"
+            return {
+                "query": sql_query,
+                "session_id": session_id,
+                "result": result,
+                "saved_table": saved,
+                "success": True
+            }
+        except ValueError:
+            raise
+        except Exception as e:
+            return {
+                "query": sql_query,
+                "error": str(e),
+                "success": False
+            }
+    
     def get_connection_info(self) -> Dict[str, Any]:
         """Get connection information for display"""
         return {
@@ -379,6 +1015,13 @@ class LakehouseExplorer:
             "warehouse_path": self.config.warehouse_path,
             "s3_region": self.config.s3_region,
             "duckdb_available": self.duckdb_conn is not None,
+            "catalog_pool": self.catalogs.stats(),
+            "stats_store": self.stats_store.summary() if self.stats_store else None,
+            "sketch_cache": {"profiles": len(self.profiler.store), "bytes": self.profiler.store.nbytes,
+                             "max_bytes": self.profiler.store.max_bytes},
+            "profiling_worker": self.profiling_worker.status() if self.profiling_worker else None,
+            "sessions": {"path": self.sessions.root, "idle_seconds": self.sessions.idle_seconds,
+                         "quota_bytes": self.sessions.quota_bytes} if self.sessions else None,
             "engines": {
                 "pyiceberg": "Available",
                 "duckdb": "Available" if self.duckdb_conn else "Not available"
@@ -0,0 +1,463 @@
+"""
+Catalog inventory: summarize, health-check and profile many tables in parallel
+
+Each table is handled by a worker process with its own LakehouseExplorer.
+The parent hands out one table at a time over a pipe, so a table that
+exceeds its timeout can be stopped by killing just that worker. Results
+are written as Hive-partitioned Parquet datasets (tables, columns, issues)
+under run_id=<run>/namespace=<ns>/, with a checkpoint per run so an
+interrupted run resumes where it stopped.
+"""
+
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field
+from datetime import datetime
+from multiprocessing.connection import wait
+import fnmatch
+import json
+import multiprocessing
+import os
+import statistics
+import time
+import traceback
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyiceberg.catalog import load_catalog
+
+from app.core.catalog_pool import TableVersion
+from app.core.config import LakehouseConfig
+from app.core.manifests import partition_summary, snapshot_schema
+
+# Health check thresholds
+SMALL_FILE_BYTES = 16 * 1024 * 1024
+SMALL_FILE_MIN_FILES = 16
+DELETE_FILE_RATIO = 0.1
+MAX_SNAPSHOTS = 500
+STALE_DAYS = 30
+PARTITION_SKEW_RATIO = 10.0
+PARTITION_SKEW_MIN_PARTITIONS = 4
+
+SEVERITIES = ("info", "warning", "critical")
+
+TABLES_SCHEMA = pa.schema([
+    ("table", pa.string()),
+    ("status", pa.string()),
+    ("error", pa.string()),
+    ("elapsed_seconds", pa.float64()),
+    ("inventoried_at", pa.string()),
+    ("snapshot_id", pa.int64()),
+    ("snapshot_timestamp_ms", pa.int64()),
+    ("last_updated_ms", pa.int64()),
+    ("format_version", pa.int32()),
+    ("schema_id", pa.int32()),
+    ("column_count", pa.int32()),
+    ("partition_fields", pa.string()),
+    ("snapshot_count", pa.int32()),
+    ("data_files", pa.int64()),
+    ("position_delete_files", pa.int64()),
+    ("equality_delete_files", pa.int64()),
+    ("records", pa.int64()),
+    ("bytes", pa.int64()),
+    ("partition_count", pa.int64()),
+    ("avg_file_bytes", pa.float64()),
+    ("distinct_rows", pa.int64()),
+    ("files_profiled", pa.int64()),
+    ("profile_bytes_read", pa.int64()),
+    ("health", pa.string()),
+    ("issue_count", pa.int32()),
+])
+
+COLUMNS_SCHEMA = pa.schema([
+    ("table", pa.string()),
+    ("column", pa.string()),
+    ("type", pa.string()),
+    ("count", pa.int64()),
+    ("distinct_count", pa.int64()),
+    ("null_count", pa.int64()),
+    ("null_percentage", pa.float64()),
+    ("min", pa.string()),
+    ("max", pa.string()),
+    ("mean", pa.float64()),
+])
+
+ISSUES_SCHEMA = pa.schema([
+    ("table", pa.string()),
+    ("code", pa.string()),
+    ("severity", pa.string()),
+    ("message", pa.string()),
+])
+
+DATASETS = {"tables": TABLES_SCHEMA, "columns": COLUMNS_SCHEMA, "issues": ISSUES_SCHEMA}
+
+
+@dataclass
+class ExplorerSpec:
+    """How a worker process builds its explorer: the configuration, or a PyIceberg catalog by name/properties"""
+    config: LakehouseConfig
+    catalog_name: Optional[str] = None
+    catalog_properties: Dict[str, str] = field(default_factory=dict)
+
+    def build(self):
+        from app.core.explorer import LakehouseExplorer
+        catalog = None
+        if self.catalog_name or self.catalog_properties:
+            catalog = load_catalog(self.catalog_name or "default", **self.catalog_properties)
+        return LakehouseExplorer(self.config, catalog=catalog)
+
+
+def select_tables(all_tables: Dict[Tuple[str, ...], List[str]], namespaces: Optional[List[str]] = None,
+                  include: Optional[List[str]] = None, exclude: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    """Filter (namespace, table) pairs by namespace and shell-style patterns on "namespace.table" """
+    selected = []
+    for namespace, tables in sorted(all_tables.items()):
+        namespace_str = ".".join(namespace) if namespace else "default"
+        if namespaces and namespace_str not in namespaces:
+            continue
+        for table_name in sorted(tables):
+            name = f"{namespace_str}.{table_name}"
+            if include and not any(fnmatch.fnmatch(name, pattern) for pattern in include):
+                continue
+            if exclude and any(fnmatch.fnmatch(name, pattern) for pattern in exclude):
+                continue
+            selected.append((namespace_str, table_name))
+    return selected
+
+
+def health_issues(summary: Dict[str, Any], columns: List[Dict[str, Any]],
+                  partitions: List[Dict[str, Any]], now_ms: int) -> List[Dict[str, str]]:
+    """Maintenance problems visible from table metadata and the column profile"""
+    issues = []
+
+    def issue(code, severity, message):
+        issues.append({"code": code, "severity": severity, "message": message})
+
+    if summary["snapshot_id"] is None:
+        issue("empty", "info", "Table has no snapshots")
+        return issues
+
+    data_files = summary["data_files"]
+    if data_files >= SMALL_FILE_MIN_FILES and summary["avg_file_bytes"] < SMALL_FILE_BYTES:
+        issue("small_files", "warning",
+              f"{data_files} data files averaging {summary['avg_file_bytes'] / 1048576:.1f} MB; consider compaction")
+    delete_files = summary["position_delete_files"] + summary["equality_delete_files"]
+    if delete_files and delete_files > DELETE_FILE_RATIO * max(data_files, 1):
+        issue("delete_files", "warning",
+              f"{delete_files} delete files for {data_files} data files; consider rewriting data files")
+    if summary["equality_delete_files"]:
+        issue("equality_deletes", "warning",
+              f"{summary['equality_delete_files']} equality delete files are not applied by profiling")
+    if summary["snapshot_count"] > MAX_SNAPSHOTS:
+        issue("snapshots", "warning", f"{summary['snapshot_count']} snapshots retained; consider expiring snapshots")
+    if summary["last_updated_ms"] and now_ms - summary["last_updated_ms"] > STALE_DAYS * 86400 * 1000:
+        days = (now_ms - summary["last_updated_ms"]) // (86400 * 1000)
+        issue("stale", "info", f"No commits for {days} days")
+
+    sizes = [p["bytes"] for p in partitions if p.get("bytes")]
+    if len(sizes) >= PARTITION_SKEW_MIN_PARTITIONS:
+        median = statistics.median(sizes)
+        if median and max(sizes) > PARTITION_SKEW_RATIO * median:
+            issue("partition_skew", "warning",
+                  f"Largest partition is {max(sizes) / median:.0f}x the median partition size")
+
+    empty_columns = [c["column"] for c in columns if c["count"] and c["null_percentage"] == 100]
+    if empty_columns:
+        issue("null_columns", "info", f"Columns with only nulls: {', '.join(empty_columns)}")
+    return issues
+
+
+def _json_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+def inventory_table(explorer, namespace: str, table_name: str, profile: bool = True,
+                    version: Optional[TableVersion] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Summarize, profile and health-check one table; returns rows for each dataset"""
+    started = time.time()
+    namespace_tuple = () if namespace == "default" else tuple(namespace.split('.'))
+    table, snapshot = explorer._load_table(namespace_tuple, table_name, version)
+    schema = snapshot_schema(table, snapshot)
+    metadata = table.metadata
+    partitions = partition_summary(table, snapshot)
+    totals = partitions["totals"]
+
+    summary = {
+        "table": table_name,
+        "status": "ok",
+        "error": None,
+        "snapshot_id": snapshot.snapshot_id if snapshot else None,
+        "snapshot_timestamp_ms": snapshot.timestamp_ms if snapshot else None,
+        "last_updated_ms": metadata.last_updated_ms,
+        "format_version": metadata.format_version,
+        "schema_id": schema.schema_id,
+        "column_count": len(schema.fields),
+        "partition_fields": ", ".join(f"{f['transform']}({f['name']})" for f in partitions["fields"]),
+        "snapshot_count": len(metadata.snapshots),
+        "data_files": totals["data_files"],
+        "position_delete_files": totals["position_delete_files"],
+        "equality_delete_files": totals["equality_delete_files"],
+        "records": totals["records"],
+        "bytes": totals["bytes"],
+        "partition_count": partitions["partition_count"],
+        "avg_file_bytes": totals["bytes"] / totals["data_files"] if totals["data_files"] else 0.0,
+    }
+
+    columns = []
+    if profile and snapshot is not None:
+        stats = explorer._table_statistics(namespace_tuple, table_name, table, snapshot)
+        types = {f.name: str(f.field_type) for f in schema.fields}
+        for name, column in stats.get("column_statistics", {}).items():
+            columns.append({
+                "table": table_name,
+                "column": name,
+                "type": types.get(name),
+                "count": column.get("count"),
+                "distinct_count": column.get("distinct_count"),
+                "null_count": column.get("null_count"),
+                "null_percentage": column.get("null_percentage"),
+                "min": _json_text(column.get("min")),
+                "max": _json_text(column.get("max")),
+                "mean": column.get("mean"),
+            })
+        incremental = stats.get("incremental", {})
+        summary["distinct_rows"] = stats.get("distinct_rows")
+        summary["files_profiled"] = incremental.get("files_profiled")
+        summary["profile_bytes_read"] = incremental.get("bytes_read")
+
+    issues = [{"table": table_name, **issue}
+              for issue in health_issues(summary, columns, partitions["partitions"], int(time.time() * 1000))]
+    summary["issue_count"] = len(issues)
+    summary["health"] = max((issue["severity"] for issue in issues), key=SEVERITIES.index, default="ok")
+    summary["elapsed_seconds"] = round(time.time() - started, 3)
+    return {"tables": [summary], "columns": columns, "issues": issues}
+
+
+def failed_result(table_name: str, status: str, error: str, elapsed: float) -> Dict[str, List[Dict[str, Any]]]:
+    return {
+        "tables": [{"table": table_name, "status": status, "error": error, "elapsed_seconds": round(elapsed, 3)}],
+        "columns": [],
+        "issues": []
+    }
+
+
+def _worker_main(spec: ExplorerSpec, conn, profile: bool, version: Optional[TableVersion]):
+    """Worker process: build an explorer once, report ready, then inventory each table sent over the pipe"""
+    try:
+        explorer = spec.build()
+    except Exception as e:
+        conn.send(f"{type(e).__name__}: {e}")
+        return
+    conn.send("ready")
+    while True:
+        item = conn.recv()
+        if item is None:
+            break
+        namespace, table_name = item
+        started = time.time()
+        try:
+            result = inventory_table(explorer, namespace, table_name, profile, version)
+        except Exception as e:
+            traceback.print_exc()
+            result = failed_result(table_name, "error", str(e), time.time() - started)
+        conn.send(result)
+
+
+class InventoryWriter:
+    """Write per-table results into partitioned Parquet datasets and keep the run's checkpoint"""
+
+    def __init__(self, output_dir: str, run_id: str):
+        self.output_dir = output_dir
+        self.run_id = run_id
+        self.checkpoint_path = os.path.join(output_dir, "_runs", f"{run_id}.jsonl")
+
+    def _partition_dir(self, dataset: str, namespace: str) -> str:
+        return os.path.join(self.output_dir, dataset, f"run_id={self.run_id}", f"namespace={namespace}")
+
+    def completed(self) -> Dict[str, str]:
+        """Latest status of every table already handled in this run"""
+        statuses = {}
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # a line cut short by an interruption
+                    statuses[entry["table"]] = entry["status"]
+        return statuses
+
+    def reset(self):
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def write(self, namespace: str, table_name: str, result: Dict[str, List[Dict[str, Any]]]):
+        """Replace the table's files in each dataset, then record it in the checkpoint
+
+        A table without rows for a dataset that was already compacted gets an
+        empty file, so the next compaction drops its old rows from the part file.
+        """
+        for dataset, schema in DATASETS.items():
+            directory = self._partition_dir(dataset, namespace)
+            path = os.path.join(directory, f"{table_name}.parquet")
+            rows = result.get(dataset, [])
+            compacted = os.path.isdir(directory) and any(f.startswith("part-") for f in os.listdir(directory))
+            if not rows and not compacted:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            os.makedirs(directory, exist_ok=True)
+            rows = [{name: row.get(name) for name in schema.names} for row in rows]
+            tmp_path = path + ".tmp"
+            pq.write_table(pa.Table.from_pylist(rows, schema=schema), tmp_path)
+            os.replace(tmp_path, path)
+
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        status = result["tables"][0]["status"]
+        with open(self.checkpoint_path, "a") as f:
+            f.write(json.dumps({"table": f"{namespace}.{table_name}", "status": status,
+                                "at": datetime.now().isoformat()}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def compact(self):
+        """Merge each partition's per-table files into one part file
+
+        Per-table files written after an earlier compaction (tables retried
+        on resume) replace those tables' rows in the existing part file; an
+        empty one removes them.
+        """
+        for dataset, schema in DATASETS.items():
+            run_dir = os.path.join(self.output_dir, dataset, f"run_id={self.run_id}")
+            if not os.path.isdir(run_dir):
+                continue
+            for partition in sorted(os.listdir(run_dir)):
+                directory = os.path.join(run_dir, partition)
+                files = sorted(f for f in os.listdir(directory) if f.endswith(".parquet"))
+                if len(files) <= 1:
+                    continue
+                parts = [f for f in files if f.startswith("part-")]
+                standalone = [f for f in files if not f.startswith("part-")]
+                replaced = {f[:-len(".parquet")] for f in standalone}
+
+                tables = []
+                for name in parts:
+                    part = pq.read_table(os.path.join(directory, name), schema=schema)
+                    keep = [t not in replaced for t in part.column("table").to_pylist()]
+                    tables.append(part.filter(pa.array(keep, type=pa.bool_())))
+                tables.extend(pq.read_table(os.path.join(directory, name), schema=schema) for name in standalone)
+
+                tmp_path = os.path.join(directory, "part-00000.parquet.tmp")
+                pq.write_table(pa.concat_tables(tables), tmp_path)
+                for name in files:
+                    os.remove(os.path.join(directory, name))
+                os.replace(tmp_path, os.path.join(directory, "part-00000.parquet"))
+
+
+@dataclass
+class _Worker:
+    process: Any
+    conn: Any
+    ready: bool = False
+    item: Optional[Tuple[str, str]] = None
+    started: float = 0.0  # when the current table was sent, or the worker was started
+
+
+def run_inventory(spec: ExplorerSpec, tables: List[Tuple[str, str]], writer: InventoryWriter,
+                  workers: int = 4, timeout: float = 600, profile: bool = True,
+                  version: Optional[TableVersion] = None,
+                  on_result: Optional[Callable[[str, str, Dict[str, Any]], None]] = None,
+                  startup_timeout: float = 120) -> Dict[str, int]:
+    """Inventory ``tables`` across ``workers`` processes, killing any worker that exceeds ``timeout`` on a table
+
+    A worker that is not ready within ``startup_timeout`` (building its
+    explorer hangs) is replaced too, and the next table is recorded as timed
+    out in its place, so a catalog that never answers cannot stall the run.
+    """
+    context = multiprocessing.get_context("spawn")
+    pending = list(reversed(tables))
+    counts = {"ok": 0, "error": 0, "timeout": 0}
+
+    def start_worker() -> _Worker:
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(target=_worker_main, args=(spec, child_conn, profile, version),
+                                  name="inventory-worker", daemon=True)
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn, started=time.time())
+
+    def finish(worker: _Worker, result: Dict[str, Any]):
+        namespace, table_name = worker.item
+        result["tables"][0].setdefault("inventoried_at", datetime.now().isoformat())
+        writer.write(namespace, table_name, result)
+        status = result["tables"][0]["status"]
+        counts[status] = counts.get(status, 0) + 1
+        if on_result:
+            on_result(namespace, table_name, result["tables"][0])
+        worker.item = None
+
+    pool = [start_worker() for _ in range(max(1, min(workers, len(tables))))]
+    try:
+        while pending or any(w.item for w in pool):
+            for worker in pool:
+                if worker.ready and worker.item is None and pending:
+                    worker.item = pending.pop()
+                    worker.started = time.time()
+                    worker.conn.send(worker.item)
+
+            # The table timeout covers the table only; starting the worker and its explorer has its own
+            deadlines = ([w.started + timeout for w in pool if w.item]
+                         + [w.started + startup_timeout for w in pool if not w.ready and pending])
+            ready = wait([w.conn for w in pool if w.item or not w.ready],
+                         timeout=max(0.0, min(deadlines) - time.time()) if deadlines else None)
+
+            for index, worker in enumerate(pool):
+                if not worker.ready:
+                    if worker.conn in ready:
+                        try:
+                            message = worker.conn.recv()
+                        except (EOFError, OSError):
+                            message = f"exit code {worker.process.exitcode}"
+                        if message != "ready":
+                            raise RuntimeError(f"Inventory worker failed to start: {message}")
+                        worker.ready = True
+                    elif time.time() - worker.started >= startup_timeout and pending:
+                        worker.item = pending.pop()
+                        finish(worker, failed_result(worker.item[1], "timeout",
+                                                     f"Worker did not start within {startup_timeout:g}s",
+                                                     time.time() - worker.started))
+                        worker.process.kill()
+                        worker.process.join()
+                        pool[index] = start_worker()
+                    continue
+                if worker.item is None:
+                    continue
+                if worker.conn in ready:
+                    try:
+                        finish(worker, worker.conn.recv())
+                        continue
+                    except (EOFError, OSError):
+                        status, error = "error", f"Worker exited unexpectedly (exit code {worker.process.exitcode})"
+                elif time.time() - worker.started >= timeout:
+                    status, error = "timeout", f"Timed out after {timeout:g}s"
+                else:
+                    continue
+
+                # The worker is dead or stuck: record the table and replace the worker
+                finish(worker, failed_result(worker.item[1], status, error, time.time() - worker.started))
+                worker.process.kill()
+                worker.process.join()
+                pool[index] = start_worker()
+    finally:
+        for worker in pool:
+            try:
+                worker.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in pool:
+            # A worker still starting up is not reading the pipe
+            worker.process.join(timeout=5 if worker.ready else 0)
+            if worker.process.is_alive():
+                worker.process.kill()
+    return counts
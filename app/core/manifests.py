@@ -0,0 +1,383 @@
+"""
+Manifest-level helpers for reading Iceberg snapshots file by file
+"""
+
+from typing import List, Dict, Any, Optional, Iterator, Iterable
+from collections import OrderedDict
+import json
+import threading
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyiceberg.conversions import from_bytes
+from pyiceberg.io import FileIO
+from pyiceberg.io.pyarrow import schema_to_pyarrow
+from pyiceberg.manifest import DataFile, DataFileContent, ManifestFile
+from pyiceberg.schema import Schema
+from pyiceberg.table import Table
+from pyiceberg.table.snapshots import Snapshot
+
+from app.core.sketches import hash_values, json_value
+
+PARQUET_FIELD_ID_KEY = b'PARQUET:field_id'
+# Reserved field id of the data file path column of position delete files
+POSITION_DELETE_FILE_PATH_ID = 2147483546
+DEFAULT_BATCH_SIZE = 8192
+
+# Manifest files are immutable, so their live entries can be cached by path
+# and shared by every snapshot (and every table object) that references them.
+_MANIFEST_CACHE_SIZE = 512
+_manifest_cache: "OrderedDict[str, List[DataFile]]" = OrderedDict()
+_manifest_cache_lock = threading.Lock()
+
+
+def snapshot_schema(table: Table, snapshot: Optional[Snapshot]) -> Schema:
+    """Get the schema that was current when the snapshot was written"""
+    if snapshot is not None and snapshot.schema_id is not None:
+        schema = table.schemas().get(snapshot.schema_id)
+        if schema is not None:
+            return schema
+    return table.schema()
+
+
+def snapshot_manifests(io: FileIO, snapshot: Optional[Snapshot]) -> List[ManifestFile]:
+    """List the manifests referenced by a snapshot's manifest list"""
+    if snapshot is None:
+        return []
+    return list(snapshot.manifests(io))
+
+
+def manifest_files(io: FileIO, manifest: ManifestFile) -> List[DataFile]:
+    """Get the live (added or existing) files tracked by a manifest"""
+    with _manifest_cache_lock:
+        cached = _manifest_cache.get(manifest.manifest_path)
+        if cached is not None:
+            _manifest_cache.move_to_end(manifest.manifest_path)
+            return cached
+
+    files = [entry.data_file for entry in manifest.fetch_manifest_entry(io, discard_deleted=True)]
+
+    with _manifest_cache_lock:
+        _manifest_cache[manifest.manifest_path] = files
+        while len(_manifest_cache) > _MANIFEST_CACHE_SIZE:
+            _manifest_cache.popitem(last=False)
+
+    return files
+
+
+def files_in_manifests(io: FileIO, manifests: Iterable[ManifestFile]) -> Dict[str, DataFile]:
+    """Collect the live files of several manifests keyed by file path"""
+    files = {}
+    for manifest in manifests:
+        for data_file in manifest_files(io, manifest):
+            files[data_file.file_path] = data_file
+    return files
+
+
+def live_files(io: FileIO, snapshot: Optional[Snapshot]) -> Dict[str, DataFile]:
+    """Get every data and delete file that is live in a snapshot"""
+    return files_in_manifests(io, snapshot_manifests(io, snapshot))
+
+
+def is_data_file(data_file: DataFile) -> bool:
+    return data_file.content == DataFileContent.DATA
+
+
+def is_position_delete_file(data_file: DataFile) -> bool:
+    return data_file.content == DataFileContent.POSITION_DELETES
+
+
+def is_equality_delete_file(data_file: DataFile) -> bool:
+    return data_file.content == DataFileContent.EQUALITY_DELETES
+
+
+def read_position_deletes(io: FileIO, delete_files: Iterable[DataFile]) -> Dict[str, np.ndarray]:
+    """Read position delete files into sorted row positions per data file path"""
+    positions: Dict[str, List[np.ndarray]] = {}
+    for delete_file in delete_files:
+        with io.new_input(delete_file.file_path).open() as f:
+            deletes = pq.read_table(f, columns=['file_path', 'pos'])
+        paths = deletes.column('file_path').to_numpy(zero_copy_only=False)
+        pos = deletes.column('pos').to_numpy(zero_copy_only=False)
+        for path in np.unique(paths):
+            positions.setdefault(path, []).append(pos[paths == path])
+
+    return {path: np.unique(np.concatenate(chunks)) for path, chunks in positions.items()}
+
+
+def may_reference(delete_file: DataFile, data_paths: Iterable[str]) -> bool:
+    """Whether a position delete file may hold deletes of any of the data files, from its file_path bounds"""
+    lower = (delete_file.lower_bounds or {}).get(POSITION_DELETE_FILE_PATH_ID)
+    upper = (delete_file.upper_bounds or {}).get(POSITION_DELETE_FILE_PATH_ID)
+    if lower is None or upper is None:
+        return True
+    # Truncated bounds still enclose every path in the file
+    return any(lower <= path.encode() <= upper for path in data_paths)
+
+
+def position_deletes_for(io: FileIO, delete_files: Iterable[DataFile], data_paths: Iterable[str]) -> Dict[str, np.ndarray]:
+    """Deleted row positions of the given data files, reading only the delete files that may reference them"""
+    data_paths = set(data_paths)
+    if not data_paths:
+        return {}
+    candidates = [f for f in delete_files if is_position_delete_file(f) and may_reference(f, data_paths)]
+    deletes = read_position_deletes(io, candidates)
+    return {path: positions for path, positions in deletes.items() if path in data_paths}
+
+
+def equality_delete_positions(io: FileIO, file_path: str, schema: Schema,
+                              delete_files: Iterable[DataFile]) -> Optional[np.ndarray]:
+    """Sorted row positions of a data file whose key columns match a row of any equality delete file
+
+    The delete files must already be the ones that apply to the data file
+    (as in its scan task). Keys are compared by hash, so null keys match as
+    Iceberg requires. Returns None when no equality delete applies.
+    """
+    matched = []
+    for delete_file in delete_files:
+        if not is_equality_delete_file(delete_file) or not delete_file.equality_ids:
+            continue
+        key_schema = Schema(*[schema.find_field(field_id) for field_id in delete_file.equality_ids])
+        deleted = _read_keys(io, delete_file.file_path, key_schema)
+        if deleted.num_rows == 0:
+            continue
+        keys = _read_keys(io, file_path, key_schema)
+        hit = np.isin(hash_values(keys.to_pandas()), hash_values(deleted.to_pandas()))
+        matched.append(np.flatnonzero(hit))
+    if not matched:
+        return None
+    return np.unique(np.concatenate(matched))
+
+
+def _read_keys(io: FileIO, file_path: str, key_schema: Schema) -> pa.Table:
+    return pa.Table.from_batches(list(iter_data_file(io, file_path, key_schema)), schema=arrow_schema(key_schema))
+
+
+def _field_id_columns(arrow_schema: pa.Schema) -> Dict[int, str]:
+    """Map Iceberg field ids to the top-level column names of a Parquet file"""
+    columns = {}
+    for field in arrow_schema:
+        field_id = (field.metadata or {}).get(PARQUET_FIELD_ID_KEY)
+        if field_id is not None:
+            columns[int(field_id)] = field.name
+    return columns
+
+
+def project_batch(batch: pa.RecordBatch, schema: Schema, target: pa.Schema) -> pa.RecordBatch:
+    """Align a batch read from a data file with an Iceberg schema (by field id, then by name)"""
+    by_id = _field_id_columns(batch.schema)
+    arrays = []
+    for field, target_field in zip(schema.fields, target):
+        source = by_id.get(field.field_id)
+        if source is None and field.name in batch.schema.names:
+            source = field.name
+        if source is None:
+            arrays.append(pa.nulls(batch.num_rows, type=target_field.type))
+            continue
+        column = batch.column(batch.schema.get_field_index(source))
+        if column.type != target_field.type:
+            try:
+                column = column.cast(target_field.type)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                pass
+        arrays.append(column)
+
+    return pa.RecordBatch.from_arrays(arrays, names=[f.name for f in schema.fields])
+
+
+def arrow_schema(schema: Schema) -> pa.Schema:
+    """Get the Arrow schema used for batches projected onto an Iceberg schema"""
+    return schema_to_pyarrow(schema, include_field_ids=False)
+
+
+def _read_columns(file_schema: pa.Schema, schema: Schema) -> Optional[List[str]]:
+    """The file's top-level columns needed for ``schema`` (None reads them all)"""
+    by_id = _field_id_columns(file_schema)
+    columns = []
+    for field in schema.fields:
+        name = by_id.get(field.field_id)
+        if name is None and field.name in file_schema.names:
+            name = field.name
+        if name is not None and name not in columns:
+            columns.append(name)
+    # Without any matching column the batches would lose their row counts
+    return columns or None
+
+
+def iter_data_file(io: FileIO, file_path: str, schema: Schema,
+                   keep: Optional[np.ndarray] = None,
+                   drop: Optional[np.ndarray] = None,
+                   batch_size: int = DEFAULT_BATCH_SIZE,
+                   row_groups: Optional[Iterable[int]] = None) -> Iterator[pa.RecordBatch]:
+    """Read a Parquet data file as batches projected onto the given schema
+
+    Only the columns of ``schema`` are read, so a projected schema prunes
+    columns. ``keep`` restricts the output to the given sorted row positions
+    (only the row groups containing them are read); ``drop`` removes the given
+    positions; ``row_groups`` limits reading to the given row group indexes.
+    """
+    selected = set(row_groups) if row_groups is not None else None
+    target = arrow_schema(schema)
+    with io.new_input(file_path).open() as f:
+        parquet_file = pq.ParquetFile(f)
+        columns = _read_columns(parquet_file.schema_arrow, schema)
+        row_offset = 0
+        for rg in range(parquet_file.metadata.num_row_groups):
+            rg_rows = parquet_file.metadata.row_group(rg).num_rows
+            rg_start, rg_end = row_offset, row_offset + rg_rows
+            row_offset = rg_end
+
+            if selected is not None and rg not in selected:
+                continue
+            if keep is not None:
+                lo, hi = np.searchsorted(keep, [rg_start, rg_end])
+                if lo == hi:
+                    continue
+
+            batch_start = rg_start
+            for batch in parquet_file.iter_batches(batch_size=batch_size, row_groups=[rg], columns=columns):
+                batch_end = batch_start + batch.num_rows
+                if keep is not None:
+                    lo, hi = np.searchsorted(keep, [batch_start, batch_end])
+                    batch = batch.take(pa.array(keep[lo:hi] - batch_start))
+                elif drop is not None and len(drop):
+                    lo, hi = np.searchsorted(drop, [batch_start, batch_end])
+                    if lo < hi:
+                        mask = np.ones(batch.num_rows, dtype=bool)
+                        mask[drop[lo:hi] - batch_start] = False
+                        batch = batch.filter(pa.array(mask))
+                batch_start = batch_end
+
+                if batch.num_rows:
+                    yield project_batch(batch, schema, target)
+
+
+def summarize_files(files: Iterable[DataFile]) -> Dict[str, Any]:
+    """Summarize a set of files by content type"""
+    summary = {
+        "data_files": 0,
+        "position_delete_files": 0,
+        "equality_delete_files": 0,
+        "records": 0,
+        "bytes": 0
+    }
+    for data_file in files:
+        if is_data_file(data_file):
+            summary["data_files"] += 1
+            summary["records"] += data_file.record_count
+        elif is_position_delete_file(data_file):
+            summary["position_delete_files"] += 1
+        else:
+            summary["equality_delete_files"] += 1
+        summary["bytes"] += data_file.file_size_in_bytes
+    return summary
+
+
+def _partition_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def partition_summary(table: Table, snapshot: Optional[Snapshot], max_partitions: int = 1000) -> Dict[str, Any]:
+    """Summarize a snapshot's live files per partition, from manifests only (no data is read)"""
+    specs = table.specs()
+    schema = snapshot_schema(table, snapshot)
+    partitions: Dict[Any, Dict[str, Any]] = {}
+
+    for manifest in snapshot_manifests(table.io, snapshot):
+        spec = specs.get(manifest.partition_spec_id)
+        fields = spec.fields if spec is not None else []
+        for data_file in manifest_files(table.io, manifest):
+            raw = [data_file.partition[i] for i in range(len(fields))]
+            key = (manifest.partition_spec_id, tuple(_partition_value(value) for value in raw))
+            entry = partitions.get(key)
+            if entry is None:
+                partition = {}
+                for field, value in zip(fields, raw):
+                    try:
+                        partition[field.name] = field.transform.to_human_string(
+                            schema.find_type(field.source_id), value)
+                    except Exception:
+                        partition[field.name] = _partition_value(value)
+                entry = partitions[key] = {
+                    "spec_id": manifest.partition_spec_id,
+                    "partition": partition,
+                    **summarize_files([])
+                }
+            file_summary = summarize_files([data_file])
+            for name, count in file_summary.items():
+                entry[name] += count
+
+    ordered = sorted(partitions.values(), key=lambda p: (p["spec_id"], json.dumps(p["partition"], default=str)))
+    current_spec = table.spec()
+    return {
+        "spec_id": current_spec.spec_id,
+        "fields": [
+            {"name": field.name, "source_id": field.source_id, "transform": str(field.transform)}
+            for field in current_spec.fields
+        ],
+        "partition_count": len(ordered),
+        "totals": {name: sum(p[name] for p in ordered) for name in summarize_files([])},
+        "partitions": ordered[:max_partitions],
+        "truncated": len(ordered) > max_partitions
+    }
+
+
+
+def manifest_column_statistics(table: Table, snapshot: Optional[Snapshot]) -> Dict[str, Any]:
+    """Table statistics from the data files' column metrics in the manifests (no data is read)
+
+    Counts ignore delete files, string bounds may be truncated and there are
+    no distinct counts; columns whose metrics a writer did not collect
+    report None.
+    """
+    schema = snapshot_schema(table, snapshot)
+    fields = [field for field in schema.fields if field.field_type.is_primitive]
+    totals = {field.field_id: {"null_count": 0, "min": None, "max": None, "nulls_known": True}
+              for field in fields}
+    rows = 0
+    files = live_files(table.io, snapshot)
+    data_files = [f for f in files.values() if is_data_file(f)]
+    for data_file in data_files:
+        rows += data_file.record_count
+        null_counts = data_file.null_value_counts or {}
+        lower_bounds = data_file.lower_bounds or {}
+        upper_bounds = data_file.upper_bounds or {}
+        for field in fields:
+            column = totals[field.field_id]
+            if field.field_id in null_counts:
+                column["null_count"] += null_counts[field.field_id]
+            else:
+                column["nulls_known"] = False
+            for name, bounds, better in (("min", lower_bounds, min), ("max", upper_bounds, max)):
+                if field.field_id in bounds:
+                    value = from_bytes(field.field_type, bounds[field.field_id])
+                    column[name] = value if column[name] is None else better(column[name], value)
+
+    column_stats = {}
+    for field in fields:
+        column = totals[field.field_id]
+        null_count = column["null_count"] if column["nulls_known"] else None
+        column_stats[field.name] = {
+            "count": rows,
+            "distinct_count": None,
+            "null_count": null_count,
+            "null_percentage": (round(null_count / rows * 100, 2) if rows else 0) if null_count is not None else None,
+            "min": json_value(column["min"]),
+            "max": json_value(column["max"])
+        }
+
+    deletes = len(files) - len(data_files)
+    stats = {
+        "total_rows": rows,
+        "distinct_rows": None,
+        "column_statistics": column_stats,
+        "engine": "metadata",
+        "snapshot_id": snapshot.snapshot_id if snapshot else None,
+        "note": "From manifest column metrics: no distinct counts, and string bounds may be truncated"
+    }
+    if deletes:
+        stats["warnings"] = [f"{deletes} delete file(s) were not applied to counts"]
+    return stats
@@ -0,0 +1,112 @@
+"""
+Random access to a table's rows by offset, for paging through large tables
+
+Rows are ordered by data file path, then by position within the file. Live
+row counts per file come from the manifests minus deleted rows (position
+deletes, and rows matched by equality deletes, both resolved once when the
+pager is built), so a page is read from just the files that hold it,
+skipping the row groups and columns it does not need.
+"""
+
+from typing import List, Optional
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+import numpy as np
+import pyarrow as pa
+from pyiceberg.manifest import DataFileContent
+from pyiceberg.schema import Schema
+from pyiceberg.table import Table
+from pyiceberg.table.snapshots import Snapshot
+
+from app.core.manifests import (arrow_schema, equality_delete_positions, iter_data_file, read_position_deletes,
+                                snapshot_schema)
+
+
+@dataclass
+class PagedFile:
+    """One data file and the rows of it that are live"""
+    file_path: str
+    record_count: int
+    live_rows: int
+    drop: Optional[np.ndarray] = None  # sorted deleted positions
+    _live_before: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+
+    def positions(self, start: int, count: int) -> np.ndarray:
+        """Physical row positions of the live rows [start, start + count)"""
+        live = np.arange(start, start + count)
+        if self.drop is None or len(self.drop) == 0:
+            return live
+        if self._live_before is None:
+            # Live rows before each deleted position, computed once per file and delete set
+            self._live_before = self.drop - np.arange(len(self.drop))
+        # Live row k sits after every deletion that has at most k live rows before it
+        return live + np.searchsorted(self._live_before, live, side='right')
+
+
+class TablePager:
+    """Read any page of rows of one table snapshot
+
+    Building a pager plans the snapshot's files and resolves its deletes
+    once (equality deletes by reading the key columns of the files they
+    apply to); pages are then cheap, so pagers are meant to be kept per
+    snapshot.
+    """
+
+    def __init__(self, table: Table, snapshot: Optional[Snapshot]):
+        self.table = table
+        self.snapshot = snapshot
+        self.schema = snapshot_schema(table, snapshot)
+        tasks = list(table.scan(snapshot_id=snapshot.snapshot_id).plan_files()) if snapshot else []
+        tasks.sort(key=lambda task: task.file.file_path)
+
+        position_deletes = {f.file_path: f for task in tasks for f in task.delete_files
+                            if f.content == DataFileContent.POSITION_DELETES}
+        deleted = read_position_deletes(table.io, position_deletes.values()) if position_deletes else {}
+
+        self.files: List[PagedFile] = []
+        for task in tasks:
+            data_file = task.file
+            drop = deleted.get(data_file.file_path)
+            matched = equality_delete_positions(table.io, data_file.file_path, self.schema, task.delete_files)
+            if matched is not None:
+                drop = matched if drop is None else np.union1d(drop, matched)
+            if drop is not None:
+                drop = drop[drop < data_file.record_count]
+            live_rows = data_file.record_count - (len(drop) if drop is not None else 0)
+            self.files.append(PagedFile(data_file.file_path, data_file.record_count, live_rows, drop))
+        self.starts = np.concatenate([[0], np.cumsum([f.live_rows for f in self.files])]).astype(np.int64)
+        self.total_rows = int(self.starts[-1])
+
+    def _projected_schema(self, columns: Optional[List[str]]) -> Schema:
+        if not columns:
+            return self.schema
+        names = {field.name for field in self.schema.fields}
+        unknown = [column for column in columns if column not in names]
+        if unknown:
+            raise ValueError(f"Unknown column(s): {', '.join(unknown)}")
+        return self.schema.select(*columns)
+
+    def page(self, offset: int, limit: int, columns: Optional[List[str]] = None) -> pa.Table:
+        """Rows [offset, offset + limit) of the table, restricted to ``columns`` if given"""
+        if offset < 0:
+            raise ValueError("offset must not be negative")
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        schema = self._projected_schema(columns)
+        target = arrow_schema(schema)
+
+        batches = []
+        index = bisect_right(self.starts, offset) - 1
+        remaining = min(limit, max(self.total_rows - offset, 0))
+        while remaining > 0 and index < len(self.files):
+            paged_file = self.files[index]
+            start = offset - int(self.starts[index])
+            count = min(remaining, paged_file.live_rows - start)
+            if count > 0:
+                batches.extend(iter_data_file(self.table.io, paged_file.file_path, schema,
+                                              keep=paged_file.positions(start, count)))
+                offset += count
+                remaining -= count
+            index += 1
+        return pa.Table.from_batches(batches, schema=target)
@@ -0,0 +1,582 @@
+"""
+Cost-based choice of engine and strategy for previews, queries and statistics
+
+Costs are estimated from the snapshot summary (records, files, bytes) and,
+when a query's WHERE clause can be turned into an Iceberg filter, from the
+files left after partition and min/max pruning in the manifests. A
+strategy's cost is a rough time: a setup cost, a cost per file opened and
+the bytes it reads divided by the engine's throughput. The cheapest
+strategy that can answer the request is chosen; the others stay in the
+plan, cheapest first, as fallbacks.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+import json
+import math
+
+from pyiceberg.expressions import (
+    And, BooleanExpression, EqualTo, GreaterThan, GreaterThanOrEqual, In, IsNull, LessThan, LessThanOrEqual,
+    Not, NotEqualTo, NotIn, NotNull, Or
+)
+from pyiceberg.manifest import DataFileContent
+from pyiceberg.table import Table
+from pyiceberg.table.snapshots import Snapshot
+
+from app.core.approximate import AGGREGATE_FUNCTIONS
+from app.core.manifests import snapshot_schema
+
+STRATEGIES = {
+    "metadata": "Answer from table metadata and manifests without reading data files",
+    "pyiceberg_limit": "PyIceberg scan that stops once it has the rows needed",
+    "duckdb_stream": "Stream data files into DuckDB one by one, stopping at the LIMIT when possible",
+    "iceberg_scan": "DuckDB's native iceberg_scan, with projection and filter pushdown",
+    "duckdb_arrow": "Load the table (after pruning) into memory as Arrow and query it with DuckDB",
+    "sketches": "Merge per-file sketches, profiling only the files without one",
+}
+OPERATION_STRATEGIES = {
+    "preview": ("metadata", "pyiceberg_limit", "duckdb_stream", "iceberg_scan", "duckdb_arrow"),
+    "query": ("metadata", "pyiceberg_limit", "duckdb_stream", "iceberg_scan", "duckdb_arrow"),
+    "statistics": ("metadata", "sketches", "pyiceberg_limit"),
+}
+ENGINES = {
+    "metadata": "metadata", "pyiceberg_limit": "pyiceberg", "duckdb_stream": "duckdb",
+    "iceberg_scan": "duckdb", "duckdb_arrow": "duckdb", "sketches": "sketch",
+}
+
+# Rough engine costs (seconds, bytes per second) used to rank strategies
+FILE_OPEN_SECONDS = 0.004
+METADATA_SECONDS_PER_FILE = 0.00002
+SETUP_SECONDS = {
+    "metadata": 0.001, "pyiceberg_limit": 0.005, "duckdb_stream": 0.015,
+    "iceberg_scan": 0.05, "duckdb_arrow": 0.01, "sketches": 0.005,
+}
+BYTES_PER_SECOND = {
+    "pyiceberg_limit": 150e6, "duckdb_stream": 100e6, "iceberg_scan": 400e6,
+    "duckdb_arrow": 250e6, "sketches": 40e6,
+}
+# Tables larger than this (on disk, after pruning) are not loaded into memory whole
+MAX_MATERIALIZE_BYTES = 512 * 1024 * 1024
+# Profiles expected to take longer than this are answered from the manifests instead
+STATISTICS_BUDGET_SECONDS = 30.0
+STATISTICS_SAMPLE_ROWS = 10000
+# Storage DuckDB's iceberg_scan can read with the configured credentials
+NATIVE_SCAN_SCHEMES = ("", "file", "s3")
+
+COMPARISONS = {
+    "COMPARE_EQUAL": EqualTo,
+    "COMPARE_NOTEQUAL": NotEqualTo,
+    "COMPARE_LESSTHAN": LessThan,
+    "COMPARE_LESSTHANOREQUALTO": LessThanOrEqual,
+    "COMPARE_GREATERTHAN": GreaterThan,
+    "COMPARE_GREATERTHANOREQUALTO": GreaterThanOrEqual,
+}
+# The comparison seen from the other side, for "constant <op> column"
+FLIPPED = {
+    "COMPARE_EQUAL": "COMPARE_EQUAL",
+    "COMPARE_NOTEQUAL": "COMPARE_NOTEQUAL",
+    "COMPARE_LESSTHAN": "COMPARE_GREATERTHAN",
+    "COMPARE_LESSTHANOREQUALTO": "COMPARE_GREATERTHANOREQUALTO",
+    "COMPARE_GREATERTHAN": "COMPARE_LESSTHAN",
+    "COMPARE_GREATERTHANOREQUALTO": "COMPARE_LESSTHANOREQUALTO",
+}
+INTEGER_TYPES = {"TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT", "UINTEGER",
+                 "UBIGINT"}
+
+
+def _column(node: Dict[str, Any]) -> Optional[str]:
+    if node.get("class") == "COLUMN_REF":
+        return node["column_names"][-1]
+    return None
+
+
+def _constant(node: Dict[str, Any]) -> Tuple[bool, Any]:
+    """(True, value) for a literal (possibly cast), else (False, None)"""
+    if node.get("class") == "CAST":
+        ok, value = _constant(node["child"])
+        cast = node.get("cast_type", {}).get("id")
+        if not ok:
+            return False, None
+        if cast == "BOOLEAN" and isinstance(value, str):
+            return True, value.strip().lower() in ("t", "true", "1", "y", "yes")
+        if cast in INTEGER_TYPES:
+            try:
+                return True, int(value)
+            except (TypeError, ValueError):
+                return False, None
+        # Dates and timestamps stay ISO strings, which Iceberg literals convert
+        return (True, value) if cast in ("DATE", "TIMESTAMP", "TIMESTAMP WITH TIME ZONE", "VARCHAR") else (False, None)
+
+    if node.get("class") != "CONSTANT" or node["value"].get("is_null"):
+        return False, None
+    value = node["value"]
+    kind = value["type"]["id"]
+    if kind in INTEGER_TYPES:
+        return True, int(value["value"])
+    if kind in ("DOUBLE", "FLOAT"):
+        return True, float(value["value"])
+    if kind == "DECIMAL":
+        return True, value["value"] / 10 ** value["type"]["type_info"]["scale"]
+    if kind in ("VARCHAR", "BOOLEAN"):
+        return True, value["value"]
+    return False, None
+
+
+def where_to_expression(node: Dict[str, Any]) -> Tuple[Optional[BooleanExpression], bool]:
+    """The Iceberg filter implied by a serialized WHERE clause, and whether it is the whole clause
+
+    Parts that cannot be translated are dropped from conjunctions, which
+    keeps the filter implied by the clause (safe for pruning) but not
+    equivalent to it.
+    """
+    kind = node.get("type")
+    children = node.get("children", [])
+
+    if kind in ("CONJUNCTION_AND", "CONJUNCTION_OR"):
+        parts = [where_to_expression(child) for child in children]
+        expressions = [expression for expression, _ in parts if expression is not None]
+        complete = all(complete for _, complete in parts)
+        if kind == "CONJUNCTION_OR" and len(expressions) < len(parts):
+            return None, False
+        if not expressions:
+            return None, False
+        if len(expressions) == 1:
+            return expressions[0], complete
+        return (And if kind == "CONJUNCTION_AND" else Or)(*expressions), complete
+
+    if kind in COMPARISONS:
+        left, right = node["left"], node["right"]
+        if _column(left) is None:
+            left, right, kind = right, left, FLIPPED[kind]
+        column = _column(left)
+        ok, value = _constant(right)
+        if column is None or not ok:
+            return None, False
+        return COMPARISONS[kind](column, value), True
+
+    if kind == "COMPARE_BETWEEN":
+        column = _column(node["input"])
+        low_ok, low = _constant(node["lower"])
+        high_ok, high = _constant(node["upper"])
+        if column is None or not (low_ok and high_ok):
+            return None, False
+        return And(GreaterThanOrEqual(column, low), LessThanOrEqual(column, high)), True
+
+    if kind in ("COMPARE_IN", "COMPARE_NOT_IN") and children:
+        column = _column(children[0])
+        values = [_constant(child) for child in children[1:]]
+        if column is None or not values or not all(ok for ok, _ in values):
+            return None, False
+        literals = {value for _, value in values}
+        return (In if kind == "COMPARE_IN" else NotIn)(column, literals), True
+
+    if kind in ("OPERATOR_IS_NULL", "OPERATOR_IS_NOT_NULL") and children:
+        column = _column(children[0])
+        if column is None:
+            return None, False
+        return (IsNull if kind == "OPERATOR_IS_NULL" else NotNull)(column), True
+
+    if kind == "OPERATOR_NOT" and children:
+        expression, complete = where_to_expression(children[0])
+        # The negation of a weaker filter is not implied by the clause
+        return (Not(expression), True) if expression is not None and complete else (None, False)
+
+    return None, False
+
+
+def _walk(node: Any):
+    """Every dict in a serialized statement tree"""
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+
+
+@dataclass
+class QueryShape:
+    """What the planner needs to know about a query over one table"""
+    analyzed: bool = False
+    single_scan: bool = False  # the table is read once, directly in the FROM clause
+    columns: Optional[List[str]] = None  # columns referenced; None when unknown or all
+    row_filter: Optional[BooleanExpression] = None  # implied by the WHERE clause
+    filter_complete: bool = True  # row_filter is the whole WHERE clause (or there is none)
+    limit: Optional[int] = None  # rows needed, OFFSET included
+    early_stop: bool = False  # the query can stop reading once it has ``limit`` rows
+    count_star: Optional[str] = None  # output column of a bare SELECT COUNT(*) FROM table
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "single_scan": self.single_scan,
+            "columns": self.columns,
+            "filter": str(self.row_filter) if self.row_filter is not None else None,
+            "filter_complete": self.filter_complete,
+            "limit": self.limit,
+            "early_stop": self.early_stop,
+        }
+
+
+def analyze_query(conn, sql: str, table_name: str, schema_columns: List[str]) -> QueryShape:
+    """Analyze a query over the registered ``table_name`` with DuckDB's SQL serializer"""
+    try:
+        serialized = json.loads(conn.execute("SELECT json_serialize_sql(?)", [sql]).fetchone()[0])
+        node = serialized["statements"][0]["node"]
+    except Exception:
+        return QueryShape()
+    if serialized.get("error") or len(serialized["statements"]) != 1 or node.get("type") != "SELECT_NODE":
+        return QueryShape()
+
+    shape = QueryShape(analyzed=True)
+    source = node.get("from_table") or {}
+    shape.single_scan = (source.get("type") == "BASE_TABLE"
+                         and source.get("table_name", "").lower() == table_name.lower()
+                         and sql.count(table_name) == 1)
+
+    known = {name.lower(): name for name in schema_columns}
+    referenced = {_column(item) for item in _walk(node) if item.get("class") == "COLUMN_REF"}
+    has_star = any(item.get("class") == "STAR" for item in _walk(node["select_list"]))
+    if not has_star and all(name.lower() in known for name in referenced):
+        shape.columns = sorted({known[name.lower()] for name in referenced})
+
+    modifiers = {modifier["type"]: modifier for modifier in node.get("modifiers", [])}
+    limit = modifiers.get("LIMIT_MODIFIER")
+    if limit is not None:
+        ok, count = _constant(limit["limit"]) if limit.get("limit") else (False, None)
+        offset_ok, offset = _constant(limit["offset"]) if limit.get("offset") else (True, 0)
+        if ok and offset_ok and isinstance(count, int) and isinstance(offset, int):
+            shape.limit = count + offset
+
+    aggregated = any(
+        (item.get("class") in ("FUNCTION", "AGGREGATE")
+         and (item.get("function_name") or "").lower() in AGGREGATE_FUNCTIONS)
+        or item.get("class") == "WINDOW"
+        for item in _walk(node["select_list"])
+    ) or bool(node.get("group_expressions")) or bool(node.get("having"))
+    shape.early_stop = (shape.single_scan and shape.limit is not None and not aggregated
+                        and "ORDER_MODIFIER" not in modifiers and "DISTINCT_MODIFIER" not in modifiers
+                        and not node.get("qualify") and not node.get("sample"))
+
+    where = node.get("where_clause")
+    if where and shape.single_scan:
+        shape.row_filter, shape.filter_complete = where_to_expression(where)
+    elif where:
+        shape.filter_complete = False
+
+    items = node["select_list"]
+    if (shape.single_scan and not where and len(items) == 1 and not node.get("group_expressions")
+            and not node.get("having") and set(modifiers) <= {"LIMIT_MODIFIER"} and (shape.limit or 0) >= 1
+            and items[0].get("class") in ("FUNCTION", "AGGREGATE") and not items[0].get("distinct")
+            and not items[0].get("filter") and (items[0].get("function_name") or "").lower() == "count_star"):
+        shape.count_star = items[0].get("alias") or "count_star()"
+    return shape
+
+
+@dataclass
+class ScanEstimate:
+    """Size of a snapshot, and of the part of it a filter selects"""
+    records: int = 0
+    data_files: int = 0
+    delete_files: int = 0
+    equality_deletes: bool = False
+    bytes: int = 0
+    selected_records: int = 0
+    selected_files: int = 0
+    selected_bytes: int = 0
+    column_fraction: float = 1.0
+    row_filter: Optional[str] = None
+    source: str = "snapshot_summary"
+
+    def files_for_rows(self, rows: int) -> Tuple[int, int]:
+        """Files and bytes read (in file order) to get ``rows`` selected rows"""
+        if not self.selected_files:
+            return 0, 0
+        per_file = max(self.selected_records / self.selected_files, 1)
+        files = min(self.selected_files, max(1, math.ceil(rows / per_file)))
+        return files, int(self.selected_bytes * files / self.selected_files)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "records": self.records,
+            "data_files": self.data_files,
+            "delete_files": self.delete_files,
+            "equality_deletes": self.equality_deletes,
+            "bytes": self.bytes,
+            "selected_records": self.selected_records,
+            "selected_files": self.selected_files,
+            "selected_bytes": self.selected_bytes,
+            "column_fraction": round(self.column_fraction, 3),
+            "filter": self.row_filter,
+            "source": self.source
+        }
+
+
+def _summary_int(snapshot: Snapshot, key: str) -> Optional[int]:
+    try:
+        value = snapshot.summary.get(key) if snapshot.summary is not None else None
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_scan(table: Table, snapshot: Optional[Snapshot],
+                  row_filter: Optional[BooleanExpression] = None) -> Tuple[ScanEstimate, Optional[BooleanExpression]]:
+    """Estimate a snapshot's size from its summary, pruning with ``row_filter`` in the manifests if given
+
+    Returns the estimate and the filter if it could be used (it may not
+    bind to the table's schema).
+    """
+    estimate = ScanEstimate()
+    if snapshot is None:
+        return estimate, None
+
+    totals = {key: _summary_int(snapshot, key) for key in
+              ("total-records", "total-data-files", "total-delete-files", "total-files-size",
+               "total-equality-deletes")}
+    if None not in (totals["total-records"], totals["total-data-files"], totals["total-files-size"]):
+        estimate.records = totals["total-records"]
+        estimate.data_files = totals["total-data-files"]
+        estimate.delete_files = totals["total-delete-files"] or 0
+        estimate.equality_deletes = bool(totals["total-equality-deletes"])
+        estimate.bytes = totals["total-files-size"]
+        estimate.selected_records = estimate.records
+        estimate.selected_files = estimate.data_files
+        estimate.selected_bytes = estimate.bytes
+        if row_filter is None:
+            return estimate, None
+
+    tasks = None
+    if row_filter is not None:
+        try:
+            tasks = list(table.scan(snapshot_id=snapshot.snapshot_id, row_filter=row_filter,
+                                    case_sensitive=False).plan_files())
+            estimate.row_filter = str(row_filter)
+        except Exception:
+            row_filter = None  # e.g. a literal that does not convert to the column's type
+    if tasks is None:
+        if estimate.data_files or estimate.records:
+            return estimate, None
+        tasks = list(table.scan(snapshot_id=snapshot.snapshot_id).plan_files())
+
+    estimate.source = "manifests"
+    delete_files = {f.file_path: f for task in tasks for f in task.delete_files}
+    estimate.selected_records = sum(task.file.record_count for task in tasks)
+    estimate.selected_files = len(tasks)
+    estimate.selected_bytes = (sum(task.file.file_size_in_bytes for task in tasks)
+                               + sum(f.file_size_in_bytes for f in delete_files.values()))
+    if row_filter is None or not estimate.data_files:
+        estimate.records = estimate.selected_records
+        estimate.data_files = estimate.selected_files
+        estimate.bytes = estimate.selected_bytes
+        estimate.delete_files = len(delete_files)
+        estimate.equality_deletes = any(f.content == DataFileContent.EQUALITY_DELETES
+                                        for f in delete_files.values())
+    return estimate, row_filter
+
+
+@dataclass
+class Candidate:
+    """One way of answering a request; cost_seconds is None when it cannot"""
+    strategy: str
+    cost_seconds: Optional[float]
+    bytes_read: int = 0
+    reason: str = ""
+
+    @property
+    def feasible(self) -> bool:
+        return self.cost_seconds is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "strategy": self.strategy,
+            "engine": ENGINES[self.strategy],
+            "estimated_seconds": round(self.cost_seconds, 4) if self.feasible else None,
+            "estimated_bytes": self.bytes_read,
+            "reason": self.reason
+        }
+
+
+@dataclass
+class Plan:
+    """The chosen strategy for a request, with every candidate considered"""
+    operation: str
+    strategy: str
+    estimate: ScanEstimate
+    candidates: List[Candidate]
+    forced: bool = False
+    row_filter: Optional[BooleanExpression] = None
+    shape: Optional[QueryShape] = None
+    failures: List[Dict[str, str]] = field(default_factory=list)
+
+    def candidate(self, strategy: str) -> Candidate:
+        return next(c for c in self.candidates if c.strategy == strategy)
+
+    def order(self) -> List[str]:
+        """Strategies to try: the chosen one, then (unless forced) the other feasible ones, cheapest first"""
+        if self.forced:
+            return [self.strategy]
+        rest = sorted((c for c in self.candidates if c.feasible and c.strategy != self.strategy),
+                      key=lambda c: c.cost_seconds)
+        return [self.strategy] + [c.strategy for c in rest]
+
+    def to_dict(self) -> Dict[str, Any]:
+        chosen = self.candidate(self.strategy)
+        plan = {
+            "operation": self.operation,
+            "strategy": self.strategy,
+            "engine": ENGINES[self.strategy],
+            "forced": self.forced,
+            "estimated_seconds": chosen.to_dict()["estimated_seconds"],
+            "estimated_bytes": chosen.bytes_read,
+            "reason": chosen.reason,
+            "estimate": self.estimate.to_dict(),
+            "candidates": [c.to_dict() for c in sorted(self.candidates,
+                                                       key=lambda c: (not c.feasible, c.cost_seconds or 0))]
+        }
+        if self.shape is not None:
+            plan["query"] = self.shape.to_dict()
+        if self.failures:
+            plan["failures"] = self.failures
+        return plan
+
+
+class CostPlanner:
+    """Estimate each strategy's cost for a request and pick the cheapest that can answer it"""
+
+    def __init__(self, duckdb_available: bool = True, native_scan: bool = False,
+                 max_materialize_bytes: int = MAX_MATERIALIZE_BYTES,
+                 statistics_budget_seconds: float = STATISTICS_BUDGET_SECONDS):
+        self.duckdb_available = duckdb_available
+        self.native_scan = native_scan
+        self.max_materialize_bytes = max_materialize_bytes
+        self.statistics_budget_seconds = statistics_budget_seconds
+
+    def _read_cost(self, strategy: str, files: int, bytes_read: float) -> float:
+        return SETUP_SECONDS[strategy] + files * FILE_OPEN_SECONDS + bytes_read / BYTES_PER_SECOND[strategy]
+
+    def _native_scan_problem(self, table: Table, estimate: ScanEstimate) -> Optional[str]:
+        if not self.duckdb_available or not self.native_scan:
+            return "DuckDB iceberg extension not loaded"
+        if estimate.delete_files:
+            return "table has delete files"
+        if urlparse(table.metadata_location or "").scheme not in NATIVE_SCAN_SCHEMES:
+            return "table storage not configured for DuckDB"
+        return None
+
+    def _choose(self, operation: str, estimate: ScanEstimate, candidates: List[Candidate],
+                strategy: Optional[str], default: Optional[str] = None, **kwargs) -> Plan:
+        if strategy:
+            if strategy not in OPERATION_STRATEGIES[operation]:
+                raise ValueError(f"Unknown strategy for {operation}: {strategy}. "
+                                 f"Valid strategies: {', '.join(OPERATION_STRATEGIES[operation])}")
+            chosen = next(c for c in candidates if c.strategy == strategy)
+            if not chosen.feasible:
+                raise ValueError(f"Strategy {strategy} cannot answer this {operation}: {chosen.reason}")
+            return Plan(operation, strategy, estimate, candidates, forced=True, **kwargs)
+
+        if default is None:
+            default = min((c for c in candidates if c.feasible), key=lambda c: c.cost_seconds).strategy
+        return Plan(operation, default, estimate, candidates, **kwargs)
+
+    def _scan_candidates(self, table: Table, estimate: ScanEstimate, shape: QueryShape,
+                         filtered: bool) -> List[Candidate]:
+        """Costs of the strategies that read data for a query (a preview is a query with a LIMIT)"""
+        candidates = []
+        needed_files, needed_bytes = (estimate.files_for_rows(shape.limit) if shape.early_stop
+                                      else (estimate.selected_files, estimate.selected_bytes))
+        # Without a usable filter, the readers see every file of the snapshot
+        scan_files = estimate.selected_files if filtered else estimate.data_files
+        scan_bytes = estimate.selected_bytes if filtered else estimate.bytes
+        megabytes = lambda n: f"{n / 1048576:.1f} MB"
+
+        if shape.early_stop and shape.filter_complete:
+            candidates.append(Candidate("pyiceberg_limit", self._read_cost("pyiceberg_limit", needed_files, needed_bytes),
+                                        needed_bytes, f"reads about {needed_files} file(s) for {shape.limit} rows"))
+        else:
+            candidates.append(Candidate("pyiceberg_limit", None, 0,
+                                        "needs a LIMIT without aggregation or ordering, and a fully pushed-down filter"))
+
+        if not self.duckdb_available:
+            candidates.append(Candidate("duckdb_stream", None, 0, "DuckDB not available"))
+        elif estimate.equality_deletes or (not shape.single_scan and scan_bytes > self.max_materialize_bytes):
+            candidates.append(Candidate("duckdb_stream", None, 0,
+                                        "equality deletes or a multi-reference query need the whole table in memory"))
+        elif shape.early_stop:
+            candidates.append(Candidate("duckdb_stream", self._read_cost("duckdb_stream", needed_files, needed_bytes),
+                                        needed_bytes, f"stops after about {needed_files} file(s)"))
+        else:
+            candidates.append(Candidate("duckdb_stream", self._read_cost("duckdb_stream", scan_files, scan_bytes),
+                                        scan_bytes, f"streams {scan_files} file(s), {megabytes(scan_bytes)}"))
+
+        problem = self._native_scan_problem(table, estimate)
+        if problem:
+            candidates.append(Candidate("iceberg_scan", None, 0, problem))
+        else:
+            native_files, native_bytes = (needed_files, needed_bytes) if shape.early_stop else (
+                estimate.selected_files, estimate.selected_bytes)
+            native_bytes = int(native_bytes * estimate.column_fraction)
+            candidates.append(Candidate("iceberg_scan", self._read_cost("iceberg_scan", native_files, native_bytes),
+                                        native_bytes, f"reads {megabytes(native_bytes)} of the needed columns"))
+
+        if not self.duckdb_available:
+            candidates.append(Candidate("duckdb_arrow", None, 0, "DuckDB not available"))
+        elif scan_bytes > self.max_materialize_bytes:
+            candidates.append(Candidate("duckdb_arrow", None, 0,
+                                        f"would load {megabytes(scan_bytes)} into memory"))
+        else:
+            candidates.append(Candidate("duckdb_arrow", self._read_cost("duckdb_arrow", scan_files, scan_bytes),
+                                        scan_bytes, f"loads {scan_files} file(s), {megabytes(scan_bytes)}"))
+        return candidates
+
+    def plan_preview(self, table: Table, snapshot: Optional[Snapshot], limit: int,
+                     strategy: Optional[str] = None) -> Plan:
+        estimate, _ = estimate_scan(table, snapshot)
+        shape = QueryShape(analyzed=True, single_scan=True, limit=limit, early_stop=True)
+        if estimate.records == 0:
+            metadata = Candidate("metadata", SETUP_SECONDS["metadata"], 0, "table is empty")
+        else:
+            metadata = Candidate("metadata", None, 0, "table has rows")
+        return self._choose("preview", estimate, [metadata] + self._scan_candidates(table, estimate, shape, False),
+                            strategy)
+
+    def plan_query(self, table: Table, snapshot: Optional[Snapshot], shape: QueryShape,
+                   strategy: Optional[str] = None) -> Plan:
+        estimate, row_filter = estimate_scan(table, snapshot, shape.row_filter)
+        if shape.row_filter is not None and row_filter is None:
+            shape.filter_complete = False
+        if shape.columns is not None:
+            width = len(snapshot_schema(table, snapshot).fields)
+            estimate.column_fraction = min(1.0, max(len(shape.columns), 1) / width) if width else 1.0
+
+        if shape.count_star and not estimate.delete_files:
+            metadata = Candidate("metadata", SETUP_SECONDS["metadata"], 0, "row count from the snapshot summary")
+        else:
+            metadata = Candidate("metadata", None, 0, "only a bare COUNT(*) of a table without deletes")
+        candidates = [metadata] + self._scan_candidates(table, estimate, shape, row_filter is not None)
+        return self._choose("query", estimate, candidates, strategy, row_filter=row_filter, shape=shape)
+
+    def plan_statistics(self, table: Table, snapshot: Optional[Snapshot], pending_files: Optional[int],
+                        pending_bytes: Optional[int], strategy: Optional[str] = None) -> Plan:
+        """Plan a profile: sketches unless profiling the new files would exceed the budget
+
+        Manifest metrics are cheaper still but have no distinct counts, so
+        they are only chosen when profiling is too expensive. Without
+        pending files (None), a stored profile answers the request.
+        """
+        estimate, _ = estimate_scan(table, snapshot)
+        sample_files, sample_bytes = estimate.files_for_rows(STATISTICS_SAMPLE_ROWS)
+        sample = Candidate("pyiceberg_limit", self._read_cost("pyiceberg_limit", sample_files, sample_bytes),
+                           sample_bytes, f"sample of the first {STATISTICS_SAMPLE_ROWS} rows")
+        if pending_files is None:
+            metadata = Candidate("metadata", SETUP_SECONDS["metadata"], 0, "stored profile")
+            sketches = Candidate("sketches", None, 0, "not needed: a profile is stored")
+            return self._choose("statistics", estimate, [metadata, sketches, sample], strategy, "metadata")
+
+        sketches = Candidate("sketches", self._read_cost("sketches", pending_files, pending_bytes), pending_bytes,
+                             f"{pending_files} of {estimate.data_files} file(s) need profiling")
+        metadata = Candidate("metadata", SETUP_SECONDS["metadata"] + estimate.data_files * METADATA_SECONDS_PER_FILE,
+                             0, "column metrics from manifests: no distinct counts")
+        default = "sketches" if sketches.cost_seconds <= self.statistics_budget_seconds else "metadata"
+        return self._choose("statistics", estimate, [metadata, sketches, sample], strategy, default)
@@ -0,0 +1,211 @@
+"""
+Incremental table profiling from per-data-file sketches
+
+Data files are immutable, so a file's profile (keyed by its path and the
+delete files applied to it) never has to be computed twice. Profiling a new
+snapshot merges the stored profiles of retained files and only reads the
+files that were added since.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import threading
+import time
+
+import pyarrow as pa
+from pyiceberg.io import FileIO
+from pyiceberg.manifest import DataFileContent
+from pyiceberg.schema import Schema
+from pyiceberg.table import Table
+from pyiceberg.table.snapshots import Snapshot
+
+from app.core.manifests import iter_data_file, read_position_deletes, snapshot_schema
+from app.core.sketches import ColumnSketch, HyperLogLog, hash_values
+
+# In-memory file sketch cache (a 10-column file profile is about 50 KiB)
+DEFAULT_SKETCH_CACHE_BYTES = 256 * 1024 * 1024
+
+
+class FileProfile:
+    """Row count, row-level distinct sketch and column sketches of one data file"""
+
+    def __init__(self, columns: Optional[Dict[str, ColumnSketch]] = None, row_count: int = 0,
+                 row_hll: Optional[HyperLogLog] = None):
+        self.columns = columns or {}
+        self.row_count = row_count
+        self.row_hll = row_hll or HyperLogLog()
+
+    @classmethod
+    def for_schema(cls, arrow_schema: pa.Schema) -> 'FileProfile':
+        return cls({field.name: ColumnSketch(ColumnSketch.kind_of(field.type)) for field in arrow_schema})
+
+    def add_batch(self, batch: pa.RecordBatch):
+        self.row_count += batch.num_rows
+        self.row_hll.add_hashes(hash_values(batch.to_pandas()))
+        for name, array in zip(batch.schema.names, batch.columns):
+            sketch = self.columns.get(name)
+            if sketch is None:
+                sketch = self.columns[name] = ColumnSketch(ColumnSketch.kind_of(array.type))
+            sketch.add(array)
+
+    def merge(self, other: 'FileProfile') -> 'FileProfile':
+        columns = dict(self.columns)
+        for name, sketch in other.columns.items():
+            existing = columns.get(name)
+            columns[name] = existing.merge(sketch) if existing is not None and existing.kind == sketch.kind else sketch
+        return FileProfile(columns, self.row_count + other.row_count, self.row_hll.merge(other.row_hll))
+
+    def nbytes(self) -> int:
+        """Approximate in-memory size of the profile"""
+        return self.row_hll.nbytes() + sum(sketch.nbytes() for sketch in self.columns.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "row_count": self.row_count,
+            "row_hll": self.row_hll.to_dict(),
+            "columns": {name: sketch.to_dict() for name, sketch in self.columns.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FileProfile':
+        return cls({name: ColumnSketch.from_dict(sketch) for name, sketch in data["columns"].items()},
+                   data["row_count"], HyperLogLog.from_dict(data["row_hll"]))
+
+
+class SketchStore:
+    """In-memory LRU of file profiles keyed by data file identity, bounded by their size
+
+    A profile holds a 4 KiB HyperLogLog per column plus the row-level one, so a
+    wide table costs tens of KiB per data file; the cache is capped in bytes
+    rather than entries.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_SKETCH_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._profiles: "OrderedDict[str, Tuple[FileProfile, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[FileProfile]:
+        with self._lock:
+            entry = self._profiles.get(key)
+            if entry is None:
+                return None
+            self._profiles.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, profile: FileProfile):
+        size = profile.nbytes()
+        with self._lock:
+            previous = self._profiles.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous[1]
+            self._profiles[key] = (profile, size)
+            self.nbytes += size
+            # The newest profile is kept even when it alone exceeds the cap
+            while self.nbytes > self.max_bytes and len(self._profiles) > 1:
+                _, (_, evicted) = self._profiles.popitem(last=False)
+                self.nbytes -= evicted
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+
+def file_profile_key(file_path: str, delete_paths: List[str], schema: Schema) -> str:
+    """Identify a file profile: the file, the deletes applied to it and the schema it was read with"""
+    if not delete_paths:
+        return f"{file_path}#s{schema.schema_id}"
+    digest = hashlib.sha1("\n".join(sorted(delete_paths)).encode()).hexdigest()[:16]
+    return f"{file_path}#s{schema.schema_id}#d{digest}"
+
+
+class TableProfiler:
+    """Build table statistics by merging per-file profiles, profiling only unseen files"""
+
+    def __init__(self, store: Optional[SketchStore] = None, max_workers: int = 4):
+        self.store = store if store is not None else SketchStore()
+        self.max_workers = max_workers
+
+    def _profile_file(self, io: FileIO, file_path: str, schema: Schema, delete_files: List[Any]) -> FileProfile:
+        """Read one data file (minus its position deletes) into a profile"""
+        position_deletes = [f for f in delete_files if f.content == DataFileContent.POSITION_DELETES]
+        drop = read_position_deletes(io, position_deletes).get(file_path) if position_deletes else None
+
+        profile = None
+        for batch in iter_data_file(io, file_path, schema, drop=drop):
+            if profile is None:
+                profile = FileProfile.for_schema(batch.schema)
+            profile.add_batch(batch)
+        return profile or FileProfile()
+
+    def _split(self, tasks: List[Any], schema: Schema) -> Tuple[List[FileProfile], List[Tuple[str, Any]]]:
+        """Stored profiles of the tasks' files, and the tasks (with their profile keys) still to profile"""
+        profiles: List[FileProfile] = []
+        missing: List[Tuple[str, Any]] = []
+        for task in tasks:
+            key = file_profile_key(task.file.file_path, [f.file_path for f in task.delete_files], schema)
+            profile = self.store.get(key)
+            if profile is not None:
+                profiles.append(profile)
+            else:
+                missing.append((key, task))
+        return profiles, missing
+
+    def pending(self, table: Table, snapshot: Optional[Snapshot]) -> Tuple[int, int]:
+        """Files and bytes a profile of the snapshot would still have to read"""
+        tasks = list(table.scan(snapshot_id=snapshot.snapshot_id).plan_files()) if snapshot else []
+        _, missing = self._split(tasks, snapshot_schema(table, snapshot))
+        return len(missing), sum(task.file.file_size_in_bytes for _, task in missing)
+
+    def profile(self, table: Table, snapshot: Optional[Snapshot]) -> Dict[str, Any]:
+        """Profile a snapshot, reusing stored profiles of its retained data files"""
+        started = time.time()
+        schema = snapshot_schema(table, snapshot)
+        tasks = list(table.scan(snapshot_id=snapshot.snapshot_id).plan_files()) if snapshot else []
+        profiles, missing = self._split(tasks, schema)
+        equality_deletes = sum(1 for task in tasks for f in task.delete_files
+                               if f.content == DataFileContent.EQUALITY_DELETES)
+
+        def compute(item):
+            key, task = item
+            profile = self._profile_file(table.io, task.file.file_path, schema, list(task.delete_files))
+            self.store.put(key, profile)
+            return profile
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                profiles.extend(executor.map(compute, missing))
+
+        merged = FileProfile()
+        for profile in profiles:
+            merged = merged.merge(profile)
+
+        column_stats = {}
+        for field in schema.fields:
+            sketch = merged.columns.get(field.name)
+            column_stats[field.name] = sketch.to_statistics() if sketch is not None else {
+                "count": merged.row_count, "distinct_count": 0, "null_count": merged.row_count,
+                "null_percentage": 100.0 if merged.row_count else 0
+            }
+
+        stats = {
+            "total_rows": merged.row_count,
+            "distinct_rows": min(merged.row_hll.estimate(), merged.row_count),
+            "column_statistics": column_stats,
+            "engine": "sketch",
+            "snapshot_id": snapshot.snapshot_id if snapshot else None,
+            "incremental": {
+                "data_files": len(tasks),
+                "files_reused": len(tasks) - len(missing),
+                "files_profiled": len(missing),
+                "bytes_read": sum(task.file.file_size_in_bytes for _, task in missing),
+                "elapsed_seconds": round(time.time() - started, 3)
+            },
+            "note": "Distinct counts, quantiles, histograms and top values are approximate (sketch-based)"
+        }
+        if equality_deletes:
+            stats["warnings"] = [f"{equality_deletes} equality delete file(s) were not applied"]
+
+        return stats
@@ -0,0 +1,181 @@
+"""
+Background worker that profiles new table snapshots off the request path
+"""
+
+from typing import Dict, Any, Optional, Tuple, Set
+import heapq
+import itertools
+import threading
+import time
+import traceback
+
+from app.core.catalog_pool import TableVersion
+from app.core.stats_store import StatsStore
+
+# Tables requested by a user jump ahead of everything found by the watcher
+REQUESTED_PRIORITY = 1_000_000
+
+
+def table_key(namespace: Tuple[str, ...], table_name: str) -> str:
+    return ".".join((*namespace, table_name))
+
+
+class ProfilingWorker:
+    """Watch the catalog for new snapshots and profile them, hot tables first
+
+    A watcher thread polls every table's current snapshot and queues the ones
+    without a stored profile; a fixed number of worker threads (the
+    concurrency limit) take the hottest queued table and profile it. Users
+    can also request a specific version (another ref or an older snapshot),
+    which is queued as its own job.
+    """
+
+    def __init__(self, explorer, store: StatsStore, max_concurrency: int = 2, poll_interval: float = 300):
+        self.explorer = explorer
+        self.store = store
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+
+        self._queue = []
+        self._queued: Set[str] = set()
+        self._running: Set[str] = set()
+        self._hits: Dict[str, int] = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads = []
+        # Updated by the watcher and worker threads; read and written under _cond
+        self._stats = {"profiled": 0, "failed": 0, "last_poll": None, "last_error": None}
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        watcher = threading.Thread(target=self._watch, name="profiling-watcher", daemon=True)
+        self._threads.append(watcher)
+        for i in range(self.max_concurrency):
+            self._threads.append(threading.Thread(target=self._work, name=f"profiling-worker-{i}", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads) and not self._stop.is_set()
+
+    def record_access(self, namespace: Tuple[str, ...], table_name: str):
+        """Count a statistics request so frequently viewed tables are profiled first"""
+        key = table_key(namespace, table_name)
+        with self._cond:
+            self._hits[key] = self._hits.get(key, 0) + 1
+
+    def request(self, namespace: Tuple[str, ...], table_name: str, version: Optional[TableVersion] = None):
+        """Queue a table (by default its current snapshot) ahead of the watcher's backlog"""
+        self._enqueue(namespace, table_name, REQUESTED_PRIORITY, version)
+
+    @staticmethod
+    def job_key(namespace: Tuple[str, ...], table_name: str, version: Optional[TableVersion] = None) -> str:
+        key = table_key(namespace, table_name)
+        if version is None or version.is_default:
+            return key
+        return f"{key}@{version.ref or ''}:{version.snapshot_id or ''}:{version.as_of or ''}"
+
+    def _enqueue(self, namespace: Tuple[str, ...], table_name: str, priority: int = 0,
+                 version: Optional[TableVersion] = None):
+        job = self.job_key(namespace, table_name, version)
+        with self._cond:
+            if job in self._running:
+                return
+            priority += self._hits.get(table_key(namespace, table_name), 0)
+            if job in self._queued:
+                if priority < REQUESTED_PRIORITY:
+                    return
+                # Re-push with the higher priority; the stale entry is skipped when popped
+            self._queued.add(job)
+            heapq.heappush(self._queue, (-priority, next(self._counter), job, namespace, table_name, version))
+            self._cond.notify()
+
+    def _watch(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                with self._cond:
+                    self._stats["last_error"] = str(e)
+                print(f"Warning: profiling watcher failed: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def poll(self):
+        """Queue every table whose current snapshot has no stored profile"""
+        for namespace, tables in self.explorer.get_all_tables().items():
+            for table_name in tables:
+                if self._stop.is_set():
+                    return
+                try:
+                    table, snapshot = self.explorer._load_table(namespace, table_name)
+                except Exception as e:
+                    print(f"Warning: profiling watcher could not load {namespace}.{table_name}: {e}")
+                    continue
+                if snapshot is not None and not self.store.has_profile(table_key(namespace, table_name),
+                                                                       snapshot.snapshot_id):
+                    self._enqueue(namespace, table_name)
+        with self._cond:
+            self._stats["last_poll"] = time.time()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stop.is_set():
+                    self._cond.wait()
+                if self._stop.is_set():
+                    return
+                _, _, key, namespace, table_name, version = heapq.heappop(self._queue)
+                if key not in self._queued or key in self._running:
+                    continue
+                self._queued.discard(key)
+                self._running.add(key)
+
+            try:
+                self.profile_table(namespace, table_name, version)
+                with self._cond:
+                    self._stats["profiled"] += 1
+            except Exception as e:
+                with self._cond:
+                    self._stats["failed"] += 1
+                    self._stats["last_error"] = f"{key}: {e}"
+                print(f"Warning: background profiling of {key} failed: {e}")
+                traceback.print_exc()
+            finally:
+                with self._cond:
+                    self._running.discard(key)
+
+    def profile_table(self, namespace: Tuple[str, ...], table_name: str,
+                      version: Optional[TableVersion] = None) -> Optional[Dict[str, Any]]:
+        """Profile a version of a table (by default its current snapshot) and store the result"""
+        table, snapshot = self.explorer._load_table(namespace, table_name, version)
+        if snapshot is None:
+            return None
+        key = table_key(namespace, table_name)
+        if self.store.has_profile(key, snapshot.snapshot_id):
+            return None
+        profile = self.explorer.profiler.profile(table, snapshot)
+        self.store.put_profile(key, snapshot.snapshot_id, profile)
+        return profile
+
+    def status(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "running": self.running,
+                "max_concurrency": self.max_concurrency,
+                "poll_interval": self.poll_interval,
+                "queued": len(self._queued),
+                "in_progress": sorted(self._running),
+                **self._stats
+            }
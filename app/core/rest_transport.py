@@ -0,0 +1,329 @@
+"""
+HTTP transport for the Iceberg REST (Nessie) catalog: pooled keep-alive
+connections, per-call timeouts, retries with jittered backoff, a circuit
+breaker and a concurrency limit, with latency and retry metrics
+"""
+
+from typing import Dict, Any, Optional
+from collections import deque
+from dataclasses import dataclass, asdict
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from pyiceberg.catalog.rest import RestCatalog
+
+from app.core.config import LakehouseConfig
+
+# Only calls that are safe to repeat are retried after the server saw them
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+LATENCY_WINDOW = 1024
+
+
+class CatalogUnavailable(ConnectionError):
+    """The catalog cannot be used now: its circuit is open, too many calls are
+    in flight, or a call still failed after its retries"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class TransportSettings:
+    """Tuning of the catalog transport (see LakehouseConfig.catalog_*)"""
+    max_concurrency: int = 16
+    pool_maxsize: int = 16  # keep-alive connections per host
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    retries: int = 3
+    backoff_seconds: float = 0.2
+    max_backoff_seconds: float = 5.0
+    breaker_failures: int = 5
+    breaker_reset_seconds: float = 30.0
+    acquire_timeout: float = 10.0  # longest wait for a free call slot
+
+    @classmethod
+    def from_config(cls, config: Optional[LakehouseConfig]) -> 'TransportSettings':
+        if config is None:
+            return cls()
+        return cls(
+            max_concurrency=config.catalog_max_concurrency,
+            # Every call slot gets a connection to keep alive
+            pool_maxsize=max(config.catalog_max_concurrency, 1),
+            connect_timeout=config.catalog_connect_timeout,
+            read_timeout=config.catalog_read_timeout,
+            retries=config.catalog_retries,
+            backoff_seconds=config.catalog_backoff_seconds,
+            breaker_failures=config.catalog_breaker_failures,
+            breaker_reset_seconds=config.catalog_breaker_reset_seconds
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class CircuitBreaker:
+    """Stop calling a failing catalog for a while
+
+    Closed: calls go through. After ``failures`` consecutive failed calls
+    the circuit opens and calls are refused for ``reset_seconds``; then one
+    trial call is let through (half-open), which closes the circuit if it
+    succeeds and opens it again if it fails.
+    """
+
+    def __init__(self, failures: int = 5, reset_seconds: float = 30.0):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise CatalogUnavailable if the call must not be made now"""
+        with self._lock:
+            if self.state == "closed" or self.failures < 1:
+                return
+            remaining = self.opened_at + self.reset_seconds - time.monotonic()
+            if self.state == "open" and remaining > 0:
+                raise CatalogUnavailable(
+                    f"Catalog circuit open after {self.consecutive_failures} consecutive failures; "
+                    f"retrying in {remaining:.0f}s", retry_after=remaining)
+            if self._trial_running:
+                raise CatalogUnavailable("Catalog circuit half-open: waiting for the trial call",
+                                         retry_after=1.0)
+            self.state = "half-open"
+            self._trial_running = True
+
+    def abandon(self):
+        """A call let through was not made after all"""
+        with self._lock:
+            self._trial_running = False
+            if self.state == "half-open":
+                self.state = "open"
+
+    def record(self, success: bool):
+        with self._lock:
+            self._trial_running = False
+            if success:
+                self.state = "closed"
+                self.consecutive_failures = 0
+                return
+            self.consecutive_failures += 1
+            if self.failures >= 1 and (self.state == "half-open" or self.consecutive_failures >= self.failures):
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def retry_after(self) -> Optional[float]:
+        """Seconds until an open circuit lets a trial call through (None when it is not open)"""
+        with self._lock:
+            if self.state != "open":
+                return None
+            return max(self.opened_at + self.reset_seconds - time.monotonic(), 0.0)
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "times_opened": self.times_opened
+            }
+
+
+class CatalogTransport(HTTPAdapter):
+    """Requests adapter for every catalog client of one explorer
+
+    Mounted on the REST catalog sessions of all refs, so they share one
+    keep-alive pool, one concurrency limit and one circuit. A call holds a
+    slot of the limiter while it runs (not while it backs off); calls
+    without an explicit timeout get the configured connect/read timeouts.
+    Connect timeouts are retried for every method; other connection errors,
+    read timeouts and 429/502/503/504 answers only for idempotent ones. A
+    call counts against the circuit when it still fails after its retries
+    with a connection error, timeout or 5xx; 4xx answers mean the catalog is
+    up. Whatever still fails after the retries (including a 429) is raised
+    as CatalogUnavailable, so callers see one error for an unusable catalog.
+    """
+
+    def __init__(self, settings: Optional[TransportSettings] = None):
+        self.settings = settings or TransportSettings()
+        super().__init__(pool_connections=4, pool_maxsize=self.settings.pool_maxsize, max_retries=0)
+        self.breaker = CircuitBreaker(self.settings.breaker_failures, self.settings.breaker_reset_seconds)
+        self._slots = threading.BoundedSemaphore(max(self.settings.max_concurrency, 1))
+        self._metrics_lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._in_flight = 0
+        self._metrics = {
+            "calls": 0, "succeeded": 0, "failed": 0, "retries": 0, "retried_calls": 0,
+            "timeouts": 0, "rejected_open_circuit": 0, "rejected_concurrency": 0,
+            "max_in_flight": 0, "total_seconds": 0.0
+        }
+
+    def _count(self, **increments):
+        with self._metrics_lock:
+            for key, value in increments.items():
+                self._metrics[key] += value
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """Full jitter: a random wait up to the exponential backoff (or the server's Retry-After)"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.replace(".", "", 1).isdigit():
+                return min(float(retry_after), self.settings.max_backoff_seconds)
+        ceiling = min(self.settings.max_backoff_seconds, self.settings.backoff_seconds * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _retry_after(self, response: Optional[requests.Response] = None) -> float:
+        """When a caller may try again after a failed call: the server's Retry-After, else when the circuit closes"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.replace(".", "", 1).isdigit():
+                return float(retry_after)
+        remaining = self.breaker.retry_after()
+        return remaining if remaining is not None else 1.0
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.settings.acquire_timeout):
+            self._count(rejected_concurrency=1)
+            raise CatalogUnavailable(
+                f"Too many concurrent catalog calls (limit {self.settings.max_concurrency})", retry_after=1.0)
+        with self._metrics_lock:
+            self._in_flight += 1
+            self._metrics["max_in_flight"] = max(self._metrics["max_in_flight"], self._in_flight)
+
+    def _release(self):
+        with self._metrics_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        try:
+            self.breaker.before_call()
+        except CatalogUnavailable:
+            self._count(rejected_open_circuit=1)
+            raise
+        if timeout is None:
+            timeout = (self.settings.connect_timeout, self.settings.read_timeout)
+
+        idempotent = request.method in IDEMPOTENT_METHODS
+        started = time.monotonic()
+        attempt = 0
+        try:
+            while True:
+                response, error = None, None
+                try:
+                    self._acquire()
+                except CatalogUnavailable:
+                    self.breaker.abandon()
+                    raise
+                try:
+                    response = super().send(request, stream=stream, timeout=timeout, verify=verify,
+                                            cert=cert, proxies=proxies)
+                    if not stream:
+                        # Read the body while holding the slot, so the limit covers the whole exchange
+                        response.content
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                        requests.exceptions.ChunkedEncodingError) as e:
+                    response, error = None, e
+                finally:
+                    self._release()
+
+                if error is not None:
+                    if isinstance(error, requests.exceptions.Timeout):
+                        self._count(timeouts=1)
+                    # A read timeout may leave the call applied on the server
+                    retryable = idempotent or isinstance(error, requests.exceptions.ConnectTimeout)
+                else:
+                    retryable = idempotent and response.status_code in RETRY_STATUSES
+
+                if not retryable or attempt >= self.settings.retries:
+                    break
+                delay = self._backoff(attempt, response)
+                if response is not None:
+                    response.close()
+                attempt += 1
+                self._count(retries=1, retried_calls=1 if attempt == 1 else 0)
+                time.sleep(delay)
+        except CatalogUnavailable:
+            self._record_call(started, success=False)
+            raise
+        except BaseException:
+            self.breaker.record(False)
+            self._record_call(started, success=False)
+            raise
+
+        success = error is None and response.status_code < 500
+        self.breaker.record(success)
+        self._record_call(started, success)
+        if error is not None:
+            raise CatalogUnavailable(f"Catalog unavailable: {error}", self._retry_after()) from error
+        if not success or response.status_code == 429:
+            retry_after = self._retry_after(response)
+            response.close()
+            raise CatalogUnavailable(f"Catalog unavailable: {request.method} {request.path_url} "
+                                     f"answered {response.status_code}", retry_after)
+        return response
+
+    def close(self):
+        # Sessions are closed when a catalog client is discarded, but the pool is shared by all of them
+        pass
+
+    def shutdown(self):
+        super().close()
+
+    def _record_call(self, started: float, success: bool):
+        elapsed = time.monotonic() - started
+        with self._metrics_lock:
+            self._metrics["calls"] += 1
+            self._metrics["succeeded" if success else "failed"] += 1
+            self._metrics["total_seconds"] += elapsed
+            self._latencies.append(elapsed)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Call counts, retries, rejections and latency percentiles over the last calls"""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+            latencies = sorted(self._latencies)
+            metrics["in_flight"] = self._in_flight
+
+        def percentile(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 2)
+
+        calls = metrics["calls"]
+        metrics["total_seconds"] = round(metrics["total_seconds"], 3)
+        metrics["latency_ms"] = {
+            "mean": round(metrics["total_seconds"] / calls * 1000, 2) if calls else None,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": round(latencies[-1] * 1000, 2) if latencies else None,
+            "window": len(latencies)
+        }
+        metrics["circuit"] = self.breaker.status()
+        metrics["settings"] = self.settings.to_dict()
+        return metrics
+
+
+class TransportRestCatalog(RestCatalog):
+    """PyIceberg REST catalog whose HTTP calls (including the initial config fetch) use a CatalogTransport"""
+
+    def __init__(self, name: str, transport: CatalogTransport, **properties: str):
+        self._transport = transport
+        super().__init__(name, **properties)
+
+    def _create_session(self) -> requests.Session:
+        session = super()._create_session()
+        # SigV4 signing mounts its own adapter on the catalog URI, which takes precedence
+        for prefix in ("http://", "https://"):
+            session.mount(prefix, self._transport)
+        return session
@@ -0,0 +1,345 @@
+"""
+Analyst sessions: a private on-disk DuckDB database per session, where query
+results are saved as named tables that later queries can build on
+
+Each session lives in its own directory (database file, spill directory and
+a small JSON description), so it survives restarts of the explorer until it
+has been idle for longer than the idle timeout. DuckDB spills to the session's
+directory when a query exceeds the session's memory limit, and the database
+plus its spill files are kept within the session's storage quota.
+
+Sessions are private to the process that opened them: under gunicorn, route
+a session's requests to one worker (or run a single worker).
+"""
+
+from typing import List, Dict, Any, Optional
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+import os
+import re
+import secrets
+import shutil
+import threading
+import time
+
+import duckdb
+import pandas as pd
+
+DATABASE_FILE = "session.duckdb"
+METADATA_FILE = "session.json"
+SPILL_DIRECTORY = "spill"
+SWEEP_INTERVAL_SECONDS = 10
+
+SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+TABLE_NAME_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,62}$")
+# Lakehouse tables are registered as table_<name> (sample_<name> when approximate)
+RESERVED_PREFIXES = ("table_", "sample_")
+
+
+class SessionNotFound(ValueError):
+    """No such session, or it expired"""
+
+
+def _now() -> float:
+    return time.time()
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else None
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(directory, name))
+            except OSError:
+                pass
+    return total
+
+
+def validate_table_name(name: str) -> str:
+    if not name or not TABLE_NAME_PATTERN.match(name):
+        raise ValueError(f"Invalid table name {name!r}: use letters, digits and underscores, "
+                         f"not starting with a digit")
+    if name.lower().startswith(RESERVED_PREFIXES):
+        raise ValueError(f"Invalid table name {name!r}: names starting with "
+                         f"{' or '.join(RESERVED_PREFIXES)} are reserved")
+    return name
+
+
+class AnalystSession:
+    """One analyst's workspace: saved tables in an on-disk DuckDB database
+
+    Queries on a session run one at a time (callers hold ``lock``), each on
+    a cursor of the session's connection.
+    """
+
+    def __init__(self, session_id: str, directory: str, quota_bytes: int, memory_limit_mb: int,
+                 created_at: Optional[float] = None, last_used: Optional[float] = None,
+                 tables: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.session_id = session_id
+        self.directory = directory
+        self.quota_bytes = quota_bytes
+        self.memory_limit_mb = memory_limit_mb
+        self.created_at = created_at or _now()
+        self.last_used = last_used or self.created_at
+        self.tables: Dict[str, Dict[str, Any]] = tables or {}
+        self.lock = threading.RLock()
+        self.conn = None
+
+    @classmethod
+    def load(cls, directory: str, quota_bytes: int, memory_limit_mb: int) -> 'AnalystSession':
+        """A session saved in ``directory`` by an earlier process"""
+        with open(os.path.join(directory, METADATA_FILE)) as f:
+            data = json.load(f)
+        return cls(data["session_id"], directory, quota_bytes, memory_limit_mb,
+                   data.get("created_at"), data.get("last_used"), data.get("tables"))
+
+    def open(self):
+        if self.conn is not None:
+            return
+        os.makedirs(os.path.join(self.directory, SPILL_DIRECTORY), exist_ok=True)
+        conn = duckdb.connect(os.path.join(self.directory, DATABASE_FILE))
+        spill = os.path.join(self.directory, SPILL_DIRECTORY).replace("'", "''")
+        conn.execute(f"SET memory_limit='{int(self.memory_limit_mb)}MB'")
+        conn.execute(f"SET temp_directory='{spill}'")
+        conn.execute(f"SET max_temp_directory_size='{max(int(self.quota_bytes), 1)}B'")
+        self.conn = conn
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            finally:
+                self.conn = None
+
+    def cursor(self):
+        """A cursor of the session's connection (the session must be in use)"""
+        self.open()
+        return self.conn.cursor()
+
+    def touch(self):
+        self.last_used = _now()
+        self._write_metadata()
+
+    def _write_metadata(self):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, METADATA_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump({"session_id": self.session_id, "created_at": self.created_at,
+                       "last_used": self.last_used, "tables": self.tables}, f)
+        os.replace(path + ".tmp", path)
+
+    def usage_bytes(self) -> int:
+        """Storage in use: live database blocks, the write-ahead log and spill files"""
+        database = os.path.join(self.directory, DATABASE_FILE)
+        if self.conn is not None:
+            with self.conn.cursor() as cursor:
+                used_blocks, block_size = cursor.execute(
+                    "SELECT used_blocks, block_size FROM pragma_database_size()").fetchone()
+            used = int(used_blocks) * int(block_size)
+        else:
+            used = os.path.getsize(database) if os.path.exists(database) else 0
+        wal = database + ".wal"
+        if os.path.exists(wal):
+            used += os.path.getsize(wal)
+        return used + _directory_size(os.path.join(self.directory, SPILL_DIRECTORY))
+
+    def create_table_sql(self, name: str, select_sql: str) -> str:
+        """Statement saving the result of ``select_sql`` as table ``name``"""
+        return f'CREATE OR REPLACE TABLE "{validate_table_name(name)}" AS {select_sql.rstrip().rstrip(";")}'
+
+    def record_table(self, name: str, query: str, source: Optional[str] = None,
+                     snapshot_id: Optional[int] = None) -> Dict[str, Any]:
+        """Describe a table just saved, dropping it again if it takes the session over its quota"""
+        with self.conn.cursor() as cursor:
+            rows = cursor.execute(f'SELECT count(*) FROM "{name}"').fetchone()[0]
+            columns = [row[0] for row in cursor.execute(f'DESCRIBE "{name}"').fetchall()]
+            cursor.execute("CHECKPOINT")
+        usage = self.usage_bytes()
+        if usage > self.quota_bytes:
+            self.drop_table(name)
+            raise ValueError(f"Saving {name} would use {usage / 1048576:.1f} MB, over the session's "
+                             f"{self.quota_bytes / 1048576:.0f} MB quota; drop saved tables or save less")
+        self.tables[name] = {
+            "name": name,
+            "rows": int(rows),
+            "columns": columns,
+            "query": query,
+            "source": source,
+            "snapshot_id": snapshot_id,
+            "created_at": _now()
+        }
+        self._write_metadata()
+        return self.tables[name]
+
+    def drop_table(self, name: str):
+        validate_table_name(name)
+        self.open()
+        with self.conn.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS "{name}"')
+            cursor.execute("CHECKPOINT")
+        if self.tables.pop(name, None) is not None:
+            self._write_metadata()
+
+    def head(self, name: str, limit: int) -> pd.DataFrame:
+        with self.cursor() as cursor:
+            return cursor.execute(f'SELECT * FROM "{name}" LIMIT {int(limit)}').fetchdf()
+
+    def execute(self, sql: str, limit: int, save_as: Optional[str] = None) -> pd.DataFrame:
+        """Run ``sql`` over the saved tables; with ``save_as``, save its whole result and return the first rows"""
+        if save_as:
+            with self.cursor() as cursor:
+                cursor.execute(self.create_table_sql(save_as, sql))
+            self.record_table(save_as, sql)
+            return self.head(save_as, limit)
+        if "LIMIT" not in sql.upper():
+            sql = f"{sql.rstrip().rstrip(';')} LIMIT {int(limit)}"
+        with self.cursor() as cursor:
+            return cursor.execute(sql).fetchdf()
+
+    def to_dict(self, idle_seconds: Optional[float] = None) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "created_at": _iso(self.created_at),
+            "last_used": _iso(self.last_used),
+            "expires_at": _iso(self.last_used + idle_seconds) if idle_seconds else None,
+            "tables": sorted(self.tables.values(), key=lambda table: table["created_at"]),
+            "usage_bytes": self.usage_bytes(),
+            "quota_bytes": self.quota_bytes,
+            "memory_limit_mb": self.memory_limit_mb
+        }
+
+
+class SessionManager:
+    """Create, find and expire analyst sessions stored under ``root``
+
+    A session expires once it has not been used for ``idle_seconds``; its
+    directory is deleted the next time the manager looks at it (sessions in
+    use are never expired).
+    """
+
+    def __init__(self, root: str, idle_seconds: float = 3600, quota_mb: int = 1024,
+                 memory_limit_mb: int = 512, max_sessions: int = 64):
+        self.root = os.path.abspath(root)
+        self.idle_seconds = idle_seconds
+        self.quota_bytes = int(quota_mb) * 1024 * 1024
+        self.memory_limit_mb = memory_limit_mb
+        self.max_sessions = max_sessions
+        self._sessions: Dict[str, AnalystSession] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        os.makedirs(self.root, exist_ok=True)
+
+    def _directory(self, session_id: str) -> str:
+        return os.path.join(self.root, session_id)
+
+    def _expired(self, last_used: float) -> bool:
+        return bool(self.idle_seconds) and _now() - last_used > self.idle_seconds
+
+    def _remove(self, session: AnalystSession):
+        session.close()
+        shutil.rmtree(session.directory, ignore_errors=True)
+
+    def sweep(self, force: bool = False) -> List[str]:
+        """Delete expired sessions, including ones left on disk by earlier processes"""
+        expired = []
+        with self._lock:
+            if not force and _now() - self._last_sweep < SWEEP_INTERVAL_SECONDS:
+                return expired
+            self._last_sweep = _now()
+            for session_id in list(os.listdir(self.root)):
+                session = self._sessions.get(session_id)
+                if session is None:
+                    if not SESSION_ID_PATTERN.match(session_id):
+                        continue
+                    try:
+                        session = AnalystSession.load(self._directory(session_id), self.quota_bytes,
+                                                      self.memory_limit_mb)
+                    except (OSError, ValueError, KeyError):
+                        continue
+                if not self._expired(session.last_used) or not session.lock.acquire(blocking=False):
+                    continue
+                try:
+                    self._sessions.pop(session_id, None)
+                    self._remove(session)
+                    expired.append(session_id)
+                finally:
+                    session.lock.release()
+        return expired
+
+    def create(self) -> AnalystSession:
+        self.sweep(force=True)
+        with self._lock:
+            count = sum(1 for name in os.listdir(self.root) if SESSION_ID_PATTERN.match(name))
+            if count >= self.max_sessions:
+                raise ValueError(f"Too many open sessions (limit {self.max_sessions}); delete one first")
+            session_id = secrets.token_urlsafe(12)
+            session = AnalystSession(session_id, self._directory(session_id), self.quota_bytes,
+                                     self.memory_limit_mb)
+            session._write_metadata()
+            self._sessions[session_id] = session
+            return session
+
+    def get(self, session_id: str) -> AnalystSession:
+        """The session, reopened from disk if an earlier process created it"""
+        self.sweep()
+        return self._lookup(session_id)
+
+    def _lookup(self, session_id: str) -> AnalystSession:
+        if not session_id or not SESSION_ID_PATTERN.match(session_id):
+            raise SessionNotFound(f"Unknown session: {session_id}")
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                try:
+                    session = AnalystSession.load(self._directory(session_id), self.quota_bytes,
+                                                  self.memory_limit_mb)
+                except (OSError, ValueError, KeyError):
+                    raise SessionNotFound(f"Unknown or expired session: {session_id}")
+                if self._expired(session.last_used):
+                    raise SessionNotFound(f"Unknown or expired session: {session_id}")
+                self._sessions[session_id] = session
+            return session
+
+    @contextmanager
+    def use(self, session_id: str):
+        """Hold a session for one operation, keeping it from expiring meanwhile"""
+        session = self.get(session_id)
+        with session.lock:
+            if session.session_id not in self._sessions:
+                raise SessionNotFound(f"Unknown or expired session: {session_id}")
+            session.open()
+            try:
+                yield session
+            finally:
+                session.touch()
+
+    def delete(self, session_id: str):
+        session = self.get(session_id)
+        with session.lock:
+            with self._lock:
+                self._sessions.pop(session_id, None)
+            self._remove(session)
+
+    def list(self) -> List[Dict[str, Any]]:
+        self.sweep(force=True)
+        sessions = []
+        for name in sorted(os.listdir(self.root)):
+            if SESSION_ID_PATTERN.match(name):
+                try:
+                    sessions.append(self._lookup(name).to_dict(self.idle_seconds))
+                except SessionNotFound:
+                    pass
+        return sessions
+
+    def close(self):
+        """Close every session's database (the sessions stay on disk)"""
+        with self._lock:
+            for session in self._sessions.values():
+                with session.lock:
+                    session.close()
+            self._sessions.clear()
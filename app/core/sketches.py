@@ -0,0 +1,375 @@
+"""
+Mergeable column sketches used to build table statistics incrementally
+
+Every sketch can be built from one data file, merged with the sketch of any
+other file and serialized to JSON, so a table profile is the merge of the
+profiles of its live data files.
+"""
+
+from typing import List, Dict, Any, Optional
+from datetime import date, datetime, time
+from decimal import Decimal
+import base64
+import math
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+HISTOGRAM_BINS = 10
+
+
+def json_value(value: Any) -> Any:
+    """Convert a scalar to a JSON-serializable value"""
+    if value is None:
+        return None
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if hasattr(value, 'item'):  # numpy types
+        return value.item()
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def hash_values(values: Any) -> np.ndarray:
+    """Hash a pandas Series or DataFrame to 64-bit values"""
+    try:
+        hashed = pd.util.hash_pandas_object(values, index=False)
+    except TypeError:
+        # Nested values (lists, structs) are hashed by their string form
+        hashed = pd.util.hash_pandas_object(values.astype(str), index=False)
+    return hashed.to_numpy(dtype=np.uint64)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct-count sketch over 64-bit hashes"""
+
+    def __init__(self, precision: int = 12, registers: Optional[np.ndarray] = None):
+        # Precision >= 12 keeps the remaining hash bits exactly representable as float64
+        if not 12 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 12 and 18")
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        suffix_bits = 64 - self.precision
+        index = (hashes >> np.uint64(suffix_bits)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << suffix_bits) - 1)
+        # Rank = position of the leftmost 1-bit in the remaining bits
+        bit_length = np.frexp(remainder.astype(np.float64))[1]
+        rank = (suffix_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def estimate(self) -> int:
+        m = float(len(self.registers))
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+    def nbytes(self) -> int:
+        return self.registers.nbytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"p": self.precision, "registers": base64.b64encode(self.registers.tobytes()).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HyperLogLog':
+        registers = np.frombuffer(base64.b64decode(data["registers"]), dtype=np.uint8).copy()
+        return cls(data["p"], registers)
+
+
+class TDigest:
+    """Merging t-digest for approximate quantiles of numeric columns"""
+
+    def __init__(self, compression: int = 100, means: Optional[np.ndarray] = None,
+                 weights: Optional[np.ndarray] = None):
+        self.compression = compression
+        self.means = means if means is not None else np.empty(0, dtype=np.float64)
+        self.weights = weights if weights is not None else np.empty(0, dtype=np.float64)
+
+    @property
+    def total_weight(self) -> float:
+        return float(self.weights.sum())
+
+    def add(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+        self._compress(np.concatenate([self.means, values]),
+                       np.concatenate([self.weights, np.ones(len(values))]))
+
+    def merge(self, other: 'TDigest') -> 'TDigest':
+        merged = TDigest(self.compression)
+        merged._compress(np.concatenate([self.means, other.means]),
+                         np.concatenate([self.weights, other.weights]))
+        return merged
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        """Group sorted centroids by the integer part of the k1 scale function"""
+        if len(means) == 0:
+            self.means, self.weights = means, weights
+            return
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, cluster[1:] != cluster[:-1]])
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self.means) == 0:
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+        positions = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.total_weight, positions, self.means))
+
+    def cdf(self, values: np.ndarray) -> np.ndarray:
+        if len(self.means) == 0:
+            return np.zeros(len(values))
+        positions = np.cumsum(self.weights) - self.weights / 2
+        return np.interp(values, self.means, positions, left=0, right=self.total_weight) / self.total_weight
+
+    def nbytes(self) -> int:
+        return self.means.nbytes + self.weights.nbytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"compression": self.compression, "means": self.means.tolist(), "weights": self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TDigest':
+        return cls(data["compression"], np.asarray(data["means"], dtype=np.float64),
+                   np.asarray(data["weights"], dtype=np.float64))
+
+
+class TopK:
+    """Frequent values, kept with extra capacity so merged counts stay close to exact
+
+    Only the `capacity` most frequent values of each file survive, so counts are
+    lower bounds. `error` bounds how much any value may have been undercounted
+    (the sum of the largest count dropped at each truncation); None means
+    unknown, for sketches stored before the bound was tracked.
+    """
+
+    def __init__(self, k: int = 10, capacity: Optional[int] = None, counts: Optional[Dict[Any, int]] = None,
+                 error: Optional[int] = 0):
+        self.k = k
+        self.capacity = capacity or k * 10
+        self.counts = counts or {}
+        self.error = error
+
+    @property
+    def exact(self) -> bool:
+        return self.error == 0
+
+    def add(self, values: pd.Series):
+        counts = values.value_counts(dropna=True)
+        if len(counts) > self.capacity:
+            self._add_error(int(counts.iloc[self.capacity]))
+        self._merge_counts({json_value(v): int(c) for v, c in counts.head(self.capacity).items()})
+
+    def merge(self, other: 'TopK') -> 'TopK':
+        error = None if self.error is None or other.error is None else self.error + other.error
+        merged = TopK(self.k, self.capacity, dict(self.counts), error)
+        merged._merge_counts(other.counts)
+        return merged
+
+    def _add_error(self, count: int):
+        if self.error is not None:
+            self.error += count
+
+    def _merge_counts(self, counts: Dict[Any, int]):
+        for value, count in counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+        if len(self.counts) > self.capacity:
+            items = sorted(self.counts.items(), key=lambda item: -item[1])
+            self._add_error(items[self.capacity][1])
+            self.counts = dict(items[:self.capacity])
+
+    def top(self) -> List[Dict[str, Any]]:
+        """The k most frequent values; approximate counts carry their upper bound as max_count"""
+        items = sorted(self.counts.items(), key=lambda item: -item[1])[:self.k]
+        if self.exact:
+            return [{"value": value, "count": count} for value, count in items]
+        return [{"value": value, "count": count,
+                 "max_count": count + self.error if self.error is not None else None}
+                for value, count in items]
+
+    def nbytes(self) -> int:
+        # Dict slot plus a boxed key and count per entry
+        return 64 + sum(100 + (len(v) if isinstance(v, str) else 0) for v in self.counts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"k": self.k, "capacity": self.capacity, "error": self.error,
+                "counts": [[v, c] for v, c in self.counts.items()]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TopK':
+        return cls(data["k"], data["capacity"], {v: c for v, c in data["counts"]}, data.get("error"))
+
+
+class ColumnSketch:
+    """Mergeable summary of one column: counts, bounds, distinct values, quantiles and frequent values"""
+
+    def __init__(self, kind: str):
+        self.kind = kind  # "numeric", "temporal", "text" or "other"
+        self.count = 0
+        self.null_count = 0
+        self.minimum = None
+        self.maximum = None
+        self.total = 0.0
+        self.hll = HyperLogLog()
+        self.digest = TDigest() if kind == "numeric" else None
+        self.topk = TopK() if kind in ("numeric", "text") else None
+
+    @staticmethod
+    def kind_of(arrow_type: pa.DataType) -> str:
+        if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+            return "numeric"
+        if pa.types.is_temporal(arrow_type):
+            return "temporal"
+        if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type) or pa.types.is_boolean(arrow_type):
+            return "text"
+        return "other"
+
+    def add(self, array: pa.Array):
+        nulls = array.null_count
+        self.null_count += nulls
+        self.count += len(array) - nulls
+        if len(array) == nulls:
+            return
+
+        values = array.drop_null()
+        if self.kind in ("numeric", "temporal", "text"):
+            bounds = pc.min_max(values)
+            # Bounds are kept in their JSON form so deserialized sketches merge cleanly
+            self._update_bounds(json_value(bounds["min"].as_py()), json_value(bounds["max"].as_py()))
+
+        series = values.to_pandas()
+        self.hll.add_hashes(hash_values(series))
+
+        if self.kind == "numeric":
+            numbers = values.cast(pa.float64()).to_numpy(zero_copy_only=False)
+            self.total += float(np.nansum(numbers))
+            self.digest.add(numbers)
+        if self.topk is not None and not (self.kind == "numeric" and pa.types.is_floating(array.type)):
+            self.topk.add(series)
+
+    def _update_bounds(self, minimum: Any, maximum: Any):
+        if minimum is not None and (self.minimum is None or minimum < self.minimum):
+            self.minimum = minimum
+        if maximum is not None and (self.maximum is None or maximum > self.maximum):
+            self.maximum = maximum
+
+    def merge(self, other: 'ColumnSketch') -> 'ColumnSketch':
+        merged = ColumnSketch(self.kind)
+        merged.count = self.count + other.count
+        merged.null_count = self.null_count + other.null_count
+        merged.minimum, merged.maximum = self.minimum, self.maximum
+        try:
+            merged._update_bounds(other.minimum, other.maximum)
+        except TypeError:
+            pass  # bounds of incompatible types after schema evolution
+        merged.total = self.total + other.total
+        merged.hll = self.hll.merge(other.hll)
+        if self.digest is not None and other.digest is not None:
+            merged.digest = self.digest.merge(other.digest)
+        if self.topk is not None and other.topk is not None:
+            merged.topk = self.topk.merge(other.topk)
+        return merged
+
+    def to_statistics(self) -> Dict[str, Any]:
+        """Render the sketch as the column statistics returned by the API"""
+        rows = self.count + self.null_count
+        stats = {
+            "count": rows,
+            "distinct_count": min(self.hll.estimate(), self.count),
+            "null_count": self.null_count,
+            "null_percentage": round(self.null_count / rows * 100, 2) if rows > 0 else 0,
+            "min": self.minimum,
+            "max": self.maximum
+        }
+
+        if self.kind == "numeric" and self.count:
+            stats["mean"] = json_value(self.total / self.count)
+            stats["quantiles"] = {f"p{int(q * 100):02d}": json_value(self.digest.quantile(q)) for q in QUANTILES}
+            stats["histogram"] = self._histogram()
+        if self.topk is not None and self.topk.counts:
+            stats["top_values"] = self.topk.top()
+            stats["top_values_approximate"] = not self.topk.exact
+
+        return stats
+
+    def _histogram(self) -> List[Dict[str, Any]]:
+        """Equi-width histogram between min and max, derived from the merged t-digest"""
+        low, high = float(self.minimum), float(self.maximum)
+        if low == high:
+            return [{"lower": low, "upper": high, "count": self.count}]
+        edges = np.linspace(low, high, HISTOGRAM_BINS + 1)
+        cdf = self.digest.cdf(edges)
+        cdf[0], cdf[-1] = 0.0, 1.0
+        counts = np.round(np.diff(cdf) * self.count).astype(np.int64)
+        return [{"lower": float(edges[i]), "upper": float(edges[i + 1]), "count": int(counts[i])}
+                for i in range(HISTOGRAM_BINS)]
+
+    def nbytes(self) -> int:
+        """Approximate in-memory size, used to bound sketch caches"""
+        size = 200 + self.hll.nbytes()
+        if self.digest is not None:
+            size += self.digest.nbytes()
+        if self.topk is not None:
+            size += self.topk.nbytes()
+        return size
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "count": self.count,
+            "null_count": self.null_count,
+            "min": self.minimum,
+            "max": self.maximum,
+            "total": self.total,
+            "hll": self.hll.to_dict(),
+            "digest": self.digest.to_dict() if self.digest is not None else None,
+            "topk": self.topk.to_dict() if self.topk is not None else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ColumnSketch':
+        sketch = cls(data["kind"])
+        sketch.count = data["count"]
+        sketch.null_count = data["null_count"]
+        sketch.minimum = data["min"]
+        sketch.maximum = data["max"]
+        sketch.total = data["total"]
+        sketch.hll = HyperLogLog.from_dict(data["hll"])
+        if data["digest"] is not None:
+            sketch.digest = TDigest.from_dict(data["digest"])
+        if data["topk"] is not None:
+            sketch.topk = TopK.from_dict(data["topk"])
+        return sketch
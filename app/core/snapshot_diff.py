@@ -0,0 +1,262 @@
+"""
+Incremental diff between two Iceberg snapshots
+
+Only manifests that are not shared by both snapshots are read, and only the
+data/delete files that were added or removed between them are scanned, so the
+cost of a diff scales with the size of the change rather than the table.
+Rows a rewrite (e.g. a copy-on-write delete) copied unchanged into a new file
+are netted out, so only rows that really appeared or disappeared are listed.
+"""
+
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from dataclasses import dataclass
+
+import numpy as np
+import pyarrow as pa
+from pyiceberg.io import FileIO
+from pyiceberg.manifest import ManifestContent
+from pyiceberg.schema import Schema
+from pyiceberg.table import Table
+from pyiceberg.table.snapshots import Snapshot
+
+from app.core.manifests import (
+    DEFAULT_BATCH_SIZE,
+    snapshot_manifests,
+    files_in_manifests,
+    is_data_file,
+    is_position_delete_file,
+    is_equality_delete_file,
+    read_position_deletes,
+    position_deletes_for,
+    iter_data_file,
+    summarize_files,
+)
+from app.core.sketches import hash_values
+
+INSERTED = "inserted"
+DELETED = "deleted"
+CHANGE_TYPES = (INSERTED, DELETED)
+
+
+def resolve_snapshot(table: Table, ref: Optional[str]) -> Optional[Snapshot]:
+    """Resolve a snapshot id or a table branch/tag name to a snapshot
+
+    An empty ref resolves to the table's current snapshot.
+    """
+    if ref is None or str(ref).strip() == "":
+        return table.current_snapshot()
+
+    ref = str(ref).strip()
+    if ref.lstrip('-').isdigit():
+        snapshot = table.snapshot_by_id(int(ref))
+        if snapshot is None:
+            raise ValueError(f"Snapshot {ref} not found")
+        return snapshot
+
+    snapshot_ref = table.metadata.refs.get(ref)
+    if snapshot_ref is None:
+        raise ValueError(f"Unknown snapshot id or ref: {ref}")
+    return table.snapshot_by_id(snapshot_ref.snapshot_id)
+
+
+@dataclass
+class DiffSegment:
+    """A run of changed rows that comes from a single data file"""
+    change: str
+    file_path: str
+    file_size: int
+    row_count: int
+    keep: Optional[np.ndarray] = None
+    drop: Optional[np.ndarray] = None
+    file_rows: Optional[int] = None  # record count of the data file, when the segment drops positions
+
+    def positions(self) -> np.ndarray:
+        """Physical row positions of the segment's rows, in file order"""
+        if self.keep is not None:
+            return self.keep
+        every = np.arange(self.file_rows, dtype=np.int64)
+        return every if self.drop is None else np.setdiff1d(every, self.drop, assume_unique=True)
+
+
+def _matched(hashes: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Mark the rows of ``hashes`` that have a counterpart in ``other`` (as a multiset: each pairs once)"""
+    order = np.argsort(hashes, kind='stable')
+    ordered = hashes[order]
+    # Occurrence number of each row among the rows with the same hash
+    rank = np.arange(len(ordered)) - np.searchsorted(ordered, ordered, side='left')
+    other = np.sort(other)
+    available = np.searchsorted(other, ordered, side='right') - np.searchsorted(other, ordered, side='left')
+    matched = np.empty(len(hashes), dtype=bool)
+    matched[order] = rank < available
+    return matched
+
+
+class SnapshotDiff:
+    """File-level diff of two snapshots with lazy row access"""
+
+    def __init__(self, io: FileIO, from_snapshot: Optional[Snapshot], to_snapshot: Optional[Snapshot], schema: Schema):
+        self.io = io
+        self.from_snapshot = from_snapshot
+        self.to_snapshot = to_snapshot
+        self.schema = schema
+        self.unchanged_rows = 0
+        self._segments: Optional[List[DiffSegment]] = None
+
+        from_manifests = {m.manifest_path: m for m in snapshot_manifests(io, from_snapshot)}
+        to_manifests = {m.manifest_path: m for m in snapshot_manifests(io, to_snapshot)}
+
+        # Manifests shared by both snapshots cannot contain a change
+        self.manifests_read = (len(from_manifests.keys() - to_manifests.keys())
+                               + len(to_manifests.keys() - from_manifests.keys()))
+        self.manifests_skipped = len(from_manifests.keys() & to_manifests.keys())
+        # ... but their delete files still hide rows of the files that changed
+        self._shared_delete_manifests = [m for path, m in from_manifests.items()
+                                         if path in to_manifests and m.content == ManifestContent.DELETES]
+
+        from_files = files_in_manifests(io, (m for p, m in from_manifests.items() if p not in to_manifests))
+        to_files = files_in_manifests(io, (m for p, m in to_manifests.items() if p not in from_manifests))
+
+        self.added_files = {p: f for p, f in to_files.items() if p not in from_files}
+        self.removed_files = {p: f for p, f in from_files.items() if p not in to_files}
+
+    def _build_segments(self) -> List[DiffSegment]:
+        """Plan the changed rows per data file
+
+        A row is visible in a snapshot unless a position delete live in that
+        snapshot hides it: one of the changed delete files, or a delete file
+        both snapshots share (read only for the data files that changed).
+        """
+        added_data = {p: f for p, f in self.added_files.items() if is_data_file(f)}
+        removed_data = {p: f for p, f in self.removed_files.items() if is_data_file(f)}
+        added_deletes = read_position_deletes(
+            self.io, (f for f in self.added_files.values() if is_position_delete_file(f)))
+        removed_deletes = read_position_deletes(
+            self.io, (f for f in self.removed_files.values() if is_position_delete_file(f)))
+
+        # Data files in both snapshots whose deletes changed
+        surviving = (set(added_deletes) | set(removed_deletes)) - set(added_data) - set(removed_data)
+        shared_deletes = {}
+        if self._shared_delete_manifests and (surviving or removed_data):
+            shared_files = files_in_manifests(self.io, self._shared_delete_manifests)
+            shared_deletes = position_deletes_for(self.io, shared_files.values(), surviving | set(removed_data))
+
+        def deleted(path: str, changed: Dict[str, np.ndarray]) -> np.ndarray:
+            chunks = [d for d in (shared_deletes.get(path), changed.get(path)) if d is not None]
+            return np.unique(np.concatenate(chunks)) if chunks else np.empty(0, dtype=np.int64)
+
+        segments = []
+
+        # Rows of added data files, minus rows deleted again within the range
+        for path, data_file in added_data.items():
+            drop = deleted(path, added_deletes)
+            drop = drop[drop < data_file.record_count]
+            segments.append(DiffSegment(INSERTED, path, data_file.file_size_in_bytes,
+                                        data_file.record_count - len(drop), drop=drop if len(drop) else None,
+                                        file_rows=data_file.record_count))
+
+        # Rows of removed data files that were still visible before the change
+        for path, data_file in removed_data.items():
+            drop = deleted(path, removed_deletes)
+            drop = drop[drop < data_file.record_count]
+            segments.append(DiffSegment(DELETED, path, data_file.file_size_in_bytes,
+                                        data_file.record_count - len(drop), drop=drop if len(drop) else None,
+                                        file_rows=data_file.record_count))
+
+        # Rows of surviving files that a removed delete no longer hides, or a new delete now hides
+        for path in sorted(surviving):
+            before, after = deleted(path, removed_deletes), deleted(path, added_deletes)
+            restored = np.setdiff1d(before, after, assume_unique=True)
+            hidden = np.setdiff1d(after, before, assume_unique=True)
+            segments.append(DiffSegment(INSERTED, path, 0, len(restored), keep=restored))
+            segments.append(DiffSegment(DELETED, path, 0, len(hidden), keep=hidden))
+
+        segments = [s for s in segments if s.row_count > 0]
+        if any(s.change == INSERTED for s in segments) and any(s.change == DELETED for s in segments):
+            segments = self._net_unchanged(segments)
+        return segments
+
+    def _net_unchanged(self, segments: List[DiffSegment]) -> List[DiffSegment]:
+        """Drop rows that were both deleted and inserted with the same values
+
+        A rewrite removes a data file and adds one holding the rows it kept,
+        so without this every surviving row would be listed twice. Rows are
+        compared by a hash of all their values, pairing equal rows one to one.
+        """
+        positions, hashes = [], []
+        for segment in segments:
+            batches = list(iter_data_file(self.io, segment.file_path, self.schema,
+                                          keep=segment.keep, drop=segment.drop))
+            row_hashes = (np.concatenate([hash_values(batch.to_pandas()) for batch in batches])
+                          if batches else np.empty(0, dtype=np.uint64))
+            # Positions past the end of the file are not read (they sort last)
+            positions.append(segment.positions()[:len(row_hashes)])
+            hashes.append(row_hashes)
+
+        def side(change: str) -> np.ndarray:
+            chunks = [h for s, h in zip(segments, hashes) if s.change == change]
+            return np.concatenate(chunks)
+
+        inserted, deleted = side(INSERTED), side(DELETED)
+        matched = {INSERTED: _matched(inserted, deleted), DELETED: _matched(deleted, inserted)}
+        self.unchanged_rows = int(matched[INSERTED].sum())
+
+        netted, offsets = [], {INSERTED: 0, DELETED: 0}
+        for segment, segment_positions in zip(segments, positions):
+            start = offsets[segment.change]
+            offsets[segment.change] = start + len(segment_positions)
+            keep = segment_positions[~matched[segment.change][start:start + len(segment_positions)]]
+            if len(keep):
+                netted.append(DiffSegment(segment.change, segment.file_path, segment.file_size, len(keep),
+                                          keep=keep))
+        return netted
+
+    def segments(self, change_type: Optional[str] = None) -> List[DiffSegment]:
+        if self._segments is None:
+            self._segments = self._build_segments()
+        if change_type is None:
+            return self._segments
+        return [s for s in self._segments if s.change == change_type]
+
+    def summary(self) -> Dict[str, Any]:
+        """Describe the diff (data files are read only to net out rows a rewrite kept unchanged)"""
+        segments = self.segments()
+        summary = {
+            "from_snapshot_id": self.from_snapshot.snapshot_id if self.from_snapshot else None,
+            "to_snapshot_id": self.to_snapshot.snapshot_id if self.to_snapshot else None,
+            "inserted_rows": sum(s.row_count for s in segments if s.change == INSERTED),
+            "deleted_rows": sum(s.row_count for s in segments if s.change == DELETED),
+            "added_files": summarize_files(self.added_files.values()),
+            "removed_files": summarize_files(self.removed_files.values()),
+            "manifests_read": self.manifests_read,
+            "manifests_skipped": self.manifests_skipped,
+            "unchanged_rows": self.unchanged_rows,
+            "files_to_read": len({s.file_path for s in segments}),
+            "bytes_to_read": sum(s.file_size for s in segments)
+        }
+
+        equality_deletes = [f for f in list(self.added_files.values()) + list(self.removed_files.values())
+                            if is_equality_delete_file(f)]
+        if equality_deletes:
+            summary["warnings"] = [
+                f"{len(equality_deletes)} equality delete file(s) changed; rows affected by them are not listed"
+            ]
+
+        return summary
+
+    def iter_rows(self, change_type: Optional[str] = None, offset: int = 0,
+                  batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Tuple[str, pa.RecordBatch]]:
+        """Yield (change, batch) pairs, skipping whole files that fall before the offset"""
+        for segment in self.segments(change_type):
+            if offset >= segment.row_count:
+                offset -= segment.row_count
+                continue
+
+            for batch in iter_data_file(self.io, segment.file_path, self.schema,
+                                        keep=segment.keep, drop=segment.drop, batch_size=batch_size):
+                if offset:
+                    if offset >= batch.num_rows:
+                        offset -= batch.num_rows
+                        continue
+                    batch = batch.slice(offset)
+                    offset = 0
+                yield segment.change, batch
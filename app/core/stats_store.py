@@ -0,0 +1,145 @@
+"""
+Persistent store for table profiles and per-file sketches (SQLite)
+"""
+
+from typing import Dict, Any, Iterable, Optional
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.core.profiling import DEFAULT_SKETCH_CACHE_BYTES, FileProfile, SketchStore
+
+
+class StatsStore:
+    """Table profiles keyed by (table, snapshot id) plus file sketches, in one SQLite file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS table_profiles (
+                table_key TEXT NOT NULL,
+                snapshot_id INTEGER NOT NULL,
+                computed_at REAL NOT NULL,
+                profile TEXT NOT NULL,
+                PRIMARY KEY (table_key, snapshot_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_table_profiles_latest
+                ON table_profiles (table_key, computed_at);
+            CREATE TABLE IF NOT EXISTS file_sketches (
+                sketch_key TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                profile TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def put_profile(self, table_key: str, snapshot_id: int, profile: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO table_profiles (table_key, snapshot_id, computed_at, profile) VALUES (?, ?, ?, ?)",
+                (table_key, snapshot_id, time.time(), json.dumps(profile, default=str))
+            )
+            self._conn.commit()
+
+    def get_profile(self, table_key: str, snapshot_id: int) -> Optional[Dict[str, Any]]:
+        """Get the stored profile of a snapshot, with the time it was computed"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT snapshot_id, computed_at, profile FROM table_profiles WHERE table_key = ? AND snapshot_id = ?",
+                (table_key, snapshot_id)
+            ).fetchone()
+        return self._row_to_profile(row)
+
+    def latest_profile(self, table_key: str, snapshot_ids: Optional[Iterable[int]] = None) -> Optional[Dict[str, Any]]:
+        """Get the most recently computed profile of a table, optionally only among some snapshots"""
+        if snapshot_ids is None:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT snapshot_id, computed_at, profile FROM table_profiles WHERE table_key = ? "
+                    "ORDER BY computed_at DESC LIMIT 1",
+                    (table_key,)
+                ).fetchone()
+            return self._row_to_profile(row)
+
+        wanted = set(snapshot_ids)
+        with self._lock:
+            stored = self._conn.execute(
+                "SELECT snapshot_id FROM table_profiles WHERE table_key = ? ORDER BY computed_at DESC",
+                (table_key,)
+            ).fetchall()
+        for (snapshot_id,) in stored:
+            if snapshot_id in wanted:
+                return self.get_profile(table_key, snapshot_id)
+        return None
+
+    def _row_to_profile(self, row) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        snapshot_id, computed_at, profile = row
+        return {"snapshot_id": snapshot_id, "computed_at": computed_at, "profile": json.loads(profile)}
+
+    def has_profile(self, table_key: str, snapshot_id: int) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM table_profiles WHERE table_key = ? AND snapshot_id = ?", (table_key, snapshot_id)
+            ).fetchone()
+        return row is not None
+
+    def get_file_sketch(self, sketch_key: str) -> Optional[FileProfile]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT profile FROM file_sketches WHERE sketch_key = ?", (sketch_key,)
+            ).fetchone()
+        return FileProfile.from_dict(json.loads(row[0])) if row else None
+
+    def put_file_sketch(self, sketch_key: str, profile: FileProfile):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_sketches (sketch_key, created_at, profile) VALUES (?, ?, ?)",
+                (sketch_key, time.time(), json.dumps(profile.to_dict()))
+            )
+            self._conn.commit()
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            profiles = self._conn.execute("SELECT COUNT(*), COUNT(DISTINCT table_key) FROM table_profiles").fetchone()
+            sketches = self._conn.execute("SELECT COUNT(*) FROM file_sketches").fetchone()
+        return {
+            "path": self.path,
+            "profiles": profiles[0],
+            "tables": profiles[1],
+            "file_sketches": sketches[0]
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PersistentSketchStore(SketchStore):
+    """File sketch cache that falls through to the stats store, so sketches survive restarts"""
+
+    def __init__(self, stats_store: StatsStore, max_bytes: int = DEFAULT_SKETCH_CACHE_BYTES):
+        super().__init__(max_bytes)
+        self.stats_store = stats_store
+
+    def get(self, key: str) -> Optional[FileProfile]:
+        profile = super().get(key)
+        if profile is None:
+            profile = self.stats_store.get_file_sketch(key)
+            if profile is not None:
+                super().put(key, profile)
+        return profile
+
+    def put(self, key: str, profile: FileProfile):
+        super().put(key, profile)
+        self.stats_store.put_file_sketch(key, profile)
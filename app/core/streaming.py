@@ -0,0 +1,199 @@
+"""
+Streaming SQL query execution with progress reporting
+
+The table is handed to DuckDB as an Arrow stream read data file by data
+file, so a query that can produce rows early (a filter or projection with
+a LIMIT) returns its first batches long before the scan would finish. The
+query runs on a worker thread while the caller iterates messages: running
+progress (files and bytes scanned, rows read and emitted), result batches
+and a final summary.
+"""
+
+from typing import Callable, Dict, Any, Iterator, Optional
+import queue
+import threading
+import time
+
+import pyarrow as pa
+from pyiceberg.expressions import AlwaysTrue, BooleanExpression
+from pyiceberg.manifest import DataFileContent
+from pyiceberg.table import Table
+from pyiceberg.table.snapshots import Snapshot
+
+from app.core.manifests import arrow_schema, iter_data_file, read_position_deletes, snapshot_schema
+
+PROGRESS_INTERVAL_SECONDS = 0.5
+# Result batches buffered between the query thread and a slow consumer
+QUEUE_SIZE = 4
+
+
+class QueryCancelled(Exception):
+    """Raised in the query thread once the consumer has stopped reading"""
+
+
+class StreamingQuery:
+    """Run a query over a table scanned file by file, yielding progress and result batches as they come"""
+
+    def __init__(self, table: Table, snapshot: Optional[Snapshot], batch_size: int = 1000,
+                 progress_interval: float = PROGRESS_INTERVAL_SECONDS,
+                 row_filter: Optional[BooleanExpression] = None):
+        """``row_filter`` only prunes files (by partition and column bounds); the query filters rows itself"""
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive")
+        self.table = table
+        self.snapshot = snapshot
+        self.schema = snapshot_schema(table, snapshot)
+        self.batch_size = batch_size
+        self.progress_interval = progress_interval
+        self.tasks = list(table.scan(snapshot_id=snapshot.snapshot_id, row_filter=row_filter or AlwaysTrue(),
+                                     case_sensitive=False).plan_files()) if snapshot else []
+
+        self.files_total = len(self.tasks)
+        self.bytes_total = sum(task.file.file_size_in_bytes for task in self.tasks)
+        self.rows_total = sum(task.file.record_count for task in self.tasks)
+        self.files_scanned = 0
+        self.bytes_scanned = 0
+        self.rows_read = 0
+        self.rows_emitted = 0
+        self.first_batch_seconds: Optional[float] = None
+        self._started = time.time()
+        self._cancelled = threading.Event()
+
+    def progress(self) -> Dict[str, Any]:
+        return {
+            "files_scanned": self.files_scanned,
+            "files_total": self.files_total,
+            "bytes_scanned": self.bytes_scanned,
+            "bytes_total": self.bytes_total,
+            "rows_read": self.rows_read,
+            "rows_emitted": self.rows_emitted,
+            "elapsed_seconds": round(time.time() - self._started, 3)
+        }
+
+    def _scan_batches(self) -> Iterator[pa.RecordBatch]:
+        """Batches of the table's rows in file order, counting progress as they are read"""
+        if any(f.content == DataFileContent.EQUALITY_DELETES for task in self.tasks for f in task.delete_files):
+            # Equality deletes need PyIceberg's own reader, which returns the whole table at once
+            result = self.table.scan(snapshot_id=self.snapshot.snapshot_id).to_arrow()
+            self.files_scanned, self.bytes_scanned = self.files_total, self.bytes_total
+            for batch in result.to_batches(max_chunksize=self.batch_size):
+                self.rows_read += batch.num_rows
+                yield batch
+            return
+
+        bytes_done = 0
+        for task in self.tasks:
+            data_file = task.file
+            position_deletes = [f for f in task.delete_files if f.content == DataFileContent.POSITION_DELETES]
+            drop = (read_position_deletes(self.table.io, position_deletes).get(data_file.file_path)
+                    if position_deletes else None)
+            file_rows = 0
+            for batch in iter_data_file(self.table.io, data_file.file_path, self.schema, drop=drop,
+                                        batch_size=self.batch_size):
+                if self._cancelled.is_set():
+                    raise QueryCancelled()
+                file_rows += batch.num_rows
+                self.rows_read += batch.num_rows
+                # Bytes within a file are estimated from the share of its rows read so far
+                share = min(1.0, file_rows / data_file.record_count) if data_file.record_count else 1.0
+                self.bytes_scanned = bytes_done + int(data_file.file_size_in_bytes * share)
+                yield batch
+            bytes_done += data_file.file_size_in_bytes
+            self.bytes_scanned = bytes_done
+            self.files_scanned += 1
+
+    def _source(self, sql: str, temp_table_name: str):
+        source = pa.RecordBatchReader.from_batches(arrow_schema(self.schema), self._scan_batches())
+        # A stream can be scanned once; queries reading the table twice need it materialized
+        if sql.count(temp_table_name) > 1:
+            source = source.read_all()
+        return source
+
+    def collect(self, conn, sql: str, temp_table_name: str) -> pa.Table:
+        """Execute ``sql`` on the calling thread and return the whole result
+
+        The scan still stops as soon as DuckDB has the rows it needs.
+        """
+        conn.register(temp_table_name, self._source(sql, temp_table_name))
+        try:
+            return conn.execute(sql).fetch_arrow_table()
+        finally:
+            # Stop the scan so nothing is left reading once DuckDB has its rows
+            self._cancelled.set()
+            conn.unregister(temp_table_name)
+
+    def run(self, conn, sql: str, temp_table_name: str,
+            convert: Callable[[pa.RecordBatch], Any] = lambda batch: batch) -> Iterator[Dict[str, Any]]:
+        """Execute ``sql`` (which reads ``temp_table_name``) on ``conn`` in a worker thread
+
+        Yields {"event": "progress", ...} at least every progress interval
+        while the query runs, {"event": "batch", "batch": ..., "rows": N} for
+        each result batch and finally {"event": "done", ...}. Query errors
+        are raised. Closing the iterator cancels the query.
+
+        Result batches live in DuckDB's memory, so ``convert`` (e.g. to
+        pandas) runs on the query thread between fetches; touching them from
+        another thread while the scan is running can deadlock.
+        """
+        messages: "queue.Queue" = queue.Queue(maxsize=QUEUE_SIZE)
+
+        def put(item):
+            while not self._cancelled.is_set():
+                try:
+                    messages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+            raise QueryCancelled()
+
+        def work():
+            try:
+                conn.register(temp_table_name, self._source(sql, temp_table_name))
+                for batch in conn.execute(sql).fetch_record_batch(self.batch_size):
+                    put(("batch", (convert(batch), batch.num_rows)))
+                put(("done", None))
+            except QueryCancelled:
+                pass
+            except Exception as e:
+                try:
+                    put(("error", e))
+                except QueryCancelled:
+                    pass
+
+        self._started = time.time()
+        worker = threading.Thread(target=work, name="streaming-query", daemon=True)
+        worker.start()
+        last_progress = None
+        try:
+            while True:
+                try:
+                    kind, value = messages.get(timeout=self.progress_interval)
+                except queue.Empty:
+                    kind, value = "tick", None
+
+                if kind == "error":
+                    raise value
+                if kind == "batch":
+                    if self.first_batch_seconds is None:
+                        self.first_batch_seconds = round(time.time() - self._started, 3)
+                    self.rows_emitted += value[1]
+
+                progress = self.progress()
+                if kind == "done":
+                    yield {"event": "done", **progress, "first_batch_seconds": self.first_batch_seconds}
+                    return
+                # Unchanged progress is not repeated (elapsed time alone does not count)
+                counters = {k: v for k, v in progress.items() if k != "elapsed_seconds"}
+                if counters != last_progress:
+                    last_progress = counters
+                    yield {"event": "progress", **progress}
+                if kind == "batch":
+                    yield {"event": "batch", "batch": value[0], "rows": value[1]}
+        finally:
+            self._cancelled.set()
+            if worker.is_alive():
+                try:
+                    conn.interrupt()
+                except Exception:
+                    pass
+                worker.join(timeout=30)
@@ -9,6 +9,11 @@ class LakehouseExplorer {
         this.currentTable = null;
         this.tables = [];
         this.namespaces = [];
+        // Table details by "namespace.table", filled by prefetching and by opening tables
+        this.detailsCache = new Map();
+        this.prefetchParts = ['schema', 'metadata', 'partitions'];
+        // Analyst session holding saved query results, kept across page loads
+        this.sessionId = localStorage.getItem('analystSession');
         
         this.init();
     }
@@ -19,6 +24,7 @@ class LakehouseExplorer {
         this.loadNamespaces();
         this.loadTables();
         this.setupEventListeners();
+        this.loadSession();
     }
 
     setupEventListeners() {
@@ -67,10 +73,19 @@ class LakehouseExplorer {
                 if (this.currentTable) {
                     this.loadTableStatistics(this.currentTable.namespace, this.currentTable.name);
                 }
-                }
             });
         }
 
+        // Grids measure their viewport, which is empty while their tab is hidden
+        const previewTab = document.getElementById('preview-tab');
+        if (previewTab) {
+            previewTab.addEventListener('shown.bs.tab', () => this.previewGrid?.refresh());
+        }
+        const queryTab = document.getElementById('query-tab');
+        if (queryTab) {
+            queryTab.addEventListener('shown.bs.tab', () => this.queryGrid?.refresh());
+        }
+
         // Refresh preview button
         const refreshPreview = document.getElementById('refreshPreview');
         if (refreshPreview) {
@@ -125,7 +140,7 @@ class LakehouseExplorer {
             
             const namespaceList = document.getElementById('namespaceList');
             
-            if (data.status === 'success') {
+            if (response.ok) {
                 this.namespaces = data.namespaces;
                 
                 if (data.namespaces.length === 0) {
@@ -151,7 +166,7 @@ class LakehouseExplorer {
                 
                 namespaceList.innerHTML = html;
             } else {
-                namespaceList.innerHTML = `<p class="text-danger">Error: ${data.message}</p>`;
+                namespaceList.innerHTML = `<p class="text-danger">Error: ${data.error}</p>`;
             }
         } catch (error) {
             console.error('Failed to load namespaces:', error);
@@ -164,7 +179,7 @@ class LakehouseExplorer {
         try {
             let url = '/api/tables';
             if (namespace) {
-                url += `?namespace=${encodeURIComponent(namespace)}`;
+                url += `/${encodeURIComponent(namespace)}`;
             }
             
             const response = await fetch(url);
@@ -173,7 +188,13 @@ class LakehouseExplorer {
             const tablesList = document.getElementById('tablesList');
             const tableListTitle = document.getElementById('tableListTitle');
             
-            if (data.status === 'success') {
+            if (response.ok) {
+                if (namespace) {
+                    data.tables = data.tables.map(name => ({ namespace, name }));
+                } else {
+                    data.tables = Object.entries(data.namespaces).flatMap(([ns, info]) =>
+                        info.tables.map(name => ({ namespace: ns, name })));
+                }
                 this.tables = data.tables;
                 
                 // Update title
@@ -190,7 +211,7 @@ class LakehouseExplorer {
 
                 this.renderTables(data.tables);
             } else {
-                tablesList.innerHTML = `<p class="text-danger">Error: ${data.message}</p>`;
+                tablesList.innerHTML = `<p class="text-danger">Error: ${data.error}</p>`;
             }
         } catch (error) {
             console.error('Failed to load tables:', error);
@@ -228,6 +249,49 @@ class LakehouseExplorer {
         });
         
         tablesList.innerHTML = html;
+        this.prefetchTableDetails(tables);
+    }
+
+    detailsKey(namespace, tableName) {
+        return `${namespace}.${tableName}`;
+    }
+
+    async fetchTableDetails(tables, parts, previewLimit = 10) {
+        // One round trip for any number of tables; the server loads each table once
+        const response = await fetch('/api/tables/details', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                tables: tables.map(t => this.detailsKey(t.namespace, t.name)),
+                parts: parts,
+                preview_limit: previewLimit
+            })
+        });
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.error);
+        }
+
+        Object.entries(data.tables).forEach(([key, details]) => {
+            if (details.error) return;
+            const cached = this.detailsCache.get(key) || {};
+            this.detailsCache.set(key, { ...cached, ...details });
+        });
+        return data.tables;
+    }
+
+    prefetchTableDetails(tables) {
+        // Warm the cache for the tables in the tree so opening one is instant
+        const missing = tables
+            .filter(t => !this.detailsCache.has(this.detailsKey(t.namespace, t.name)))
+            .slice(0, 50);
+        if (missing.length === 0) return;
+
+        const idle = window.requestIdleCallback || (cb => setTimeout(cb, 200));
+        idle(() => {
+            this.fetchTableDetails(missing, this.prefetchParts)
+                .catch(error => console.debug('Prefetching table details failed:', error));
+        });
     }
 
     selectNamespace(namespace) {
@@ -262,12 +326,12 @@ class LakehouseExplorer {
             
             const tableListTitle = document.getElementById('tableListTitle');
             
-            if (data.status === 'success') {
+            if (response.ok) {
                 tableListTitle.textContent = `Search Results (${data.count} found)`;
-                this.renderTables(data.results);
+                this.renderTables(data.results.map(r => ({ namespace: r.namespace, name: r.table_name })));
             } else {
                 document.getElementById('tablesList').innerHTML = 
-                    `<p class="text-danger">Search error: ${data.message}</p>`;
+                    `<p class="text-danger">Search error: ${data.error}</p>`;
             }
         } catch (error) {
             console.error('Search failed:', error);
@@ -293,74 +357,91 @@ class LakehouseExplorer {
         modal.show();
         
         // Load data
-        this.loadTableInfo(namespace, tableName);
+        this.loadTableDetails(namespace, tableName);
     }
 
-    async loadTableInfo(namespace, tableName) {
+    async loadTableDetails(namespace, tableName) {
+        const key = this.detailsKey(namespace, tableName);
+        const cached = this.detailsCache.get(key) || {};
+
+        // Render whatever was prefetched right away, then fetch the rest in one request
+        if (cached.metadata) this.renderTableInfo(namespace, tableName, cached.metadata, cached.partitions);
+        if (cached.schema) this.renderTableSchema(cached.schema.fields);
+
+        const parts = ['schema', 'metadata', 'partitions'].filter(part => !cached[part]);
         try {
-            const response = await fetch(`/api/table/info?namespace=${encodeURIComponent(namespace)}&table=${encodeURIComponent(tableName)}`);
-            const data = await response.json();
-            
-            if (data.status === 'success') {
-                this.renderTableInfo(data.table_info);
-                this.renderTableSchema(data.table_info.columns);
-                this.loadTablePreview(namespace, tableName);
-            } else {
-                document.getElementById('tableInfo').innerHTML = 
-                    `<div class="alert alert-danger">Error: ${data.message}</div>`;
+            if (parts.length > 0) {
+                const result = await this.fetchTableDetails([{ namespace, name: tableName }], parts);
+                if (result[key].error) {
+                    throw new Error(result[key].error);
+                }
             }
+            if (this.currentTable?.namespace !== namespace || this.currentTable?.name !== tableName) return;
+
+            const merged = this.detailsCache.get(key);
+            this.renderTableInfo(namespace, tableName, merged.metadata, merged.partitions);
+            this.renderTableSchema(merged.schema?.fields);
+            this.loadTablePreview(namespace, tableName);
         } catch (error) {
-            console.error('Failed to load table info:', error);
+            console.error('Failed to load table details:', error);
             document.getElementById('tableInfo').innerHTML = 
-                '<div class="alert alert-danger">Failed to load table information</div>';
+                `<div class="alert alert-danger">Failed to load table information: ${error.message}</div>`;
         }
     }
 
-    renderTableInfo(info) {
+    renderTableInfo(namespace, tableName, metadata, partitions) {
+        if (!metadata || metadata.error) {
+            document.getElementById('tableInfo').innerHTML = 
+                `<div class="alert alert-danger">Error: ${metadata ? metadata.error : 'No metadata'}</div>`;
+            return;
+        }
+
         const html = `
             <div class="row">
                 <div class="col-md-6">
                     <table class="table table-bordered">
                         <tr>
                             <th>Namespace</th>
-                            <td>${info.namespace.join('.') || 'default'}</td>
+                            <td>${namespace}</td>
                         </tr>
                         <tr>
                             <th>Table Name</th>
-                            <td>${info.name}</td>
+                            <td>${tableName}</td>
                         </tr>
                         <tr>
                             <th>Location</th>
-                            <td><small class="text-muted">${info.location}</small></td>
+                            <td><small class="text-muted">${metadata.location}</small></td>
                         </tr>
                         <tr>
                             <th>Schema ID</th>
-                            <td>${info.schema_id}</td>
+                            <td>${metadata.schema.schema_id}</td>
                         </tr>
                         <tr>
                             <th>Snapshots</th>
-                            <td>${info.snapshots_count}</td>
+                            <td>${metadata.snapshot_count}</td>
                         </tr>
                         <tr>
                             <th>Current Snapshot</th>
-                            <td>${info.current_snapshot_id || 'None'}</td>
+                            <td>${metadata.current_snapshot_id || 'None'}</td>
                         </tr>
                         <tr>
-                            <th>Created</th>
-                            <td>${info.created_at ? new Date(info.created_at).toLocaleString() : 'Unknown'}</td>
+                            <th>Last Updated</th>
+                            <td>${metadata.last_updated_ms ? new Date(metadata.last_updated_ms).toLocaleString() : 'Unknown'}</td>
                         </tr>
                     </table>
                 </div>
                 <div class="col-md-6">
-                    ${info.partition_spec && info.partition_spec !== '[]' ? `
+                    ${metadata.partitions && metadata.partitions.length > 0 ? `
                         <h6>Partition Specification</h6>
-                        <pre class="bg-light p-2 rounded">${info.partition_spec}</pre>
+                        <pre class="bg-light p-2 rounded">${metadata.partitions.map(p => `${p.transform}(${p.name})`).join(', ')}</pre>
                     ` : ''}
                     
-                    ${Object.keys(info.properties || {}).length > 0 ? `
+                    ${partitions && !partitions.error ? this.renderPartitionSummary(partitions) : ''}
+                    
+                    ${Object.keys(metadata.properties || {}).length > 0 ? `
                         <h6>Properties</h6>
                         <table class="table table-sm">
-                            ${Object.entries(info.properties).map(([key, value]) => 
+                            ${Object.entries(metadata.properties).map(([key, value]) => 
                                 `<tr><th>${key}</th><td>${value}</td></tr>`
                             ).join('')}
                         </table>
@@ -372,6 +453,37 @@ class LakehouseExplorer {
         document.getElementById('tableInfo').innerHTML = html;
     }
 
+    renderPartitionSummary(partitions) {
+        const totals = partitions.totals;
+        const rows = partitions.fields.length > 0 ? partitions.partitions.slice(0, 20) : [];
+        return `
+            <h6>Files</h6>
+            <p class="small mb-2">
+                ${totals.data_files} data files, ${totals.records.toLocaleString()} records,
+                ${(totals.bytes / 1048576).toFixed(1)} MB
+                ${totals.position_delete_files + totals.equality_delete_files > 0 ?
+                    `, ${totals.position_delete_files + totals.equality_delete_files} delete files` : ''}
+                ${partitions.fields.length > 0 ? ` in ${partitions.partition_count} partitions` : ''}
+            </p>
+            ${rows.length > 0 ? `
+                <table class="table table-sm">
+                    <thead><tr><th>Partition</th><th>Files</th><th>Records</th><th>Size</th></tr></thead>
+                    <tbody>
+                        ${rows.map(p => `
+                            <tr>
+                                <td><code>${Object.entries(p.partition).map(([k, v]) => `${k}=${v}`).join(', ')}</code></td>
+                                <td>${p.data_files}</td>
+                                <td>${p.records.toLocaleString()}</td>
+                                <td>${(p.bytes / 1048576).toFixed(1)} MB</td>
+                            </tr>
+                        `).join('')}
+                    </tbody>
+                </table>
+                ${partitions.partition_count > rows.length ? `<small class="text-muted">Showing ${rows.length} of ${partitions.partition_count} partitions</small>` : ''}
+            ` : ''}
+        `;
+    }
+
     renderTableSchema(columns) {
         if (!columns || columns.length === 0) {
             document.getElementById('tableSchema').innerHTML = 
@@ -413,69 +525,61 @@ class LakehouseExplorer {
     }
 
     async loadTablePreview(namespace, tableName) {
-        const limit = document.getElementById('previewLimit').value || 10;
+        const pageSize = parseInt(document.getElementById('previewLimit')?.value || 200);
+        const container = document.getElementById('tablePreview');
+        const url = `/api/table/${encodeURIComponent(namespace)}/${encodeURIComponent(tableName)}/rows`;
         
         try {
-            document.getElementById('tablePreview').innerHTML = this.getLoadingHTML();
+            container.innerHTML = this.getLoadingHTML();
+            
+            // Column names come from the schema; the row count from a one-cell page
+            let fields = this.detailsCache.get(this.detailsKey(namespace, tableName))?.schema?.fields;
+            if (!fields) {
+                const response = await fetch(`/api/table/${encodeURIComponent(namespace)}/${encodeURIComponent(tableName)}/schema`);
+                const data = await response.json();
+                if (!response.ok) throw new Error(data.error);
+                fields = data.schema.fields;
+            }
+            const columns = fields.map(field => field.name);
             
-            const response = await fetch(`/api/table/preview?namespace=${encodeURIComponent(namespace)}&table=${encodeURIComponent(tableName)}&limit=${limit}`);
+            const response = await fetch(`${url}?offset=0&limit=1&columns=${encodeURIComponent(columns[0] || '')}`);
             const data = await response.json();
+            if (!response.ok) throw new Error(data.error);
             
-            if (data.status === 'success') {
-                this.renderTablePreview(data.data);
-            } else {
-                document.getElementById('tablePreview').innerHTML = 
-                    `<div class="alert alert-danger">Error: ${data.message}</div>`;
-            }
+            this.renderTablePreview(new RemoteTableSource(url, columns, data.page.total_rows, { pageSize }), fields);
         } catch (error) {
             console.error('Failed to load table preview:', error);
-            document.getElementById('tablePreview').innerHTML = 
-                '<div class="alert alert-danger">Failed to load table preview</div>';
+            container.innerHTML = `<div class="alert alert-danger">Failed to load table preview: ${error.message}</div>`;
         }
     }
 
-    renderTablePreview(data) {
-        if (!data.rows || data.rows.length === 0) {
-            document.getElementById('tablePreview').innerHTML = 
-                '<div class="alert alert-info">No data available or table is empty</div>';
+    renderTablePreview(source, fields) {
+        const container = document.getElementById('tablePreview');
+        if (source.rowCount === 0) {
+            container.innerHTML = '<div class="alert alert-info">No data available or table is empty</div>';
             return;
         }
 
-        const html = `
-            <div class="mb-3">
+        container.innerHTML = `
+            <div class="mb-2">
                 <small class="text-muted">
-                    Showing ${data.rows.length} rows × ${data.columns.length} columns
+                    ${source.rowCount.toLocaleString()} rows × ${source.columns.length} columns;
+                    pages of ${source.pageSize} rows are loaded as you scroll
                 </small>
             </div>
-            <div class="table-preview-container">
-                <table class="table table-striped table-hover">
-                    <thead class="table-dark">
-                        <tr>
-                            ${data.columns.map(col => `<th>${col}</th>`).join('')}
-                        </tr>
-                    </thead>
-                    <tbody>
-                        ${data.rows.map(row => `
-                            <tr>
-                                ${row.map(cell => `<td>${this.formatCellValue(cell)}</td>`).join('')}
-                            </tr>
-                        `).join('')}
-                    </tbody>
-                </table>
-            </div>
+            <div class="table-preview-grid"></div>
             <div class="mt-3">
                 <h6>Data Types</h6>
                 <div class="row">
-                    ${Object.entries(data.dtypes).map(([col, dtype]) => `
+                    ${fields.map(field => `
                         <div class="col-md-4 mb-1">
-                            <small><strong>${col}:</strong> <code>${dtype}</code></small>
+                            <small><strong>${field.name}:</strong> <code>${field.type}</code></small>
                         </div>
                     `).join('')}
                 </div>
             </div>
         `;
-        
-        document.getElementById('tablePreview').innerHTML = html;
+        this.previewGrid = new VirtualGrid(container.querySelector('.table-preview-grid'), source);
     }
 
     formatCellValue(value) {
@@ -488,6 +592,11 @@ class LakehouseExplorer {
         return value;
     }
 
+    formatCount(value) {
+        // Counts the chosen engine could not provide (e.g. distinct counts from manifest metrics) are null
+        return value === null || value === undefined ? '—' : value.toLocaleString();
+    }
+
     refreshData() {
         const refreshBtn = document.getElementById('refreshBtn');
         const originalHTML = refreshBtn.innerHTML;
@@ -523,6 +632,26 @@ class LakehouseExplorer {
         queryBtn.textContent = 'Executing...';
         queryBtn.disabled = true;
 
+        // Approximate answers come from a sample in one piece; exact queries can stream,
+        // unless they save their result or may read the session's saved tables
+        const approximate = document.getElementById('approximateQuery')?.checked || false;
+        const saveAs = approximate ? '' : (document.getElementById('saveAs')?.value || '').trim();
+        if (saveAs && !this.sessionId) {
+            await this.createSession();
+        }
+        const sessionId = approximate ? null : this.sessionId;
+        if (!approximate && !sessionId && document.getElementById('streamQuery')?.checked) {
+            try {
+                await this.streamQuery(queryText, document.getElementById('queryLimit')?.value || 100);
+            } catch (error) {
+                this.showError(`Error executing query: ${error.message}`);
+            } finally {
+                queryBtn.textContent = originalText;
+                queryBtn.disabled = false;
+            }
+            return;
+        }
+
         try {
             const response = await fetch(`/api/table/${this.currentTable.namespace}/${this.currentTable.name}/query`, {
                 method: 'POST',
@@ -531,14 +660,29 @@ class LakehouseExplorer {
                 },
                 body: JSON.stringify({
                     query: queryText,
-                    limit: document.getElementById('queryLimit')?.value || 100
+                    limit: document.getElementById('queryLimit')?.value || 100,
+                    approximate: approximate,
+                    sample_fraction: parseFloat(document.getElementById('sampleFraction')?.value || 0.05),
+                    session_id: sessionId,
+                    save_as: saveAs || null
                 })
             });
 
             const data = await response.json();
 
-            if (data.query_result.success) {
+            if (response.status === 404 && sessionId) {
+                this.clearSession();
+                this.showError(`${data.error}. Your saved tables are gone; run the query again to start a new session.`);
+            } else if (!response.ok) {
+                this.showError(`Query Error: ${data.error}`);
+            } else if (data.query_result.success) {
                 this.renderQueryResults(data.query_result);
+                if (data.query_result.saved_table) {
+                    document.getElementById('saveAs').value = '';
+                    this.showToast('Saved', `Saved ${data.query_result.saved_table.rows.toLocaleString()} rows as ` +
+                        `${data.query_result.saved_table.name}`, 'success');
+                    this.loadSession();
+                }
             } else {
                 this.showError(`Query Error: ${data.query_result.error}`);
             }
@@ -551,21 +695,219 @@ class LakehouseExplorer {
         }
     }
 
+    async createSession() {
+        const response = await fetch('/api/sessions', { method: 'POST' });
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.error);
+        }
+        this.sessionId = data.session.session_id;
+        localStorage.setItem('analystSession', this.sessionId);
+        this.renderSession(data.session);
+    }
+
+    clearSession() {
+        this.sessionId = null;
+        localStorage.removeItem('analystSession');
+        this.renderSession(null);
+    }
+
+    async loadSession() {
+        if (!this.sessionId) return;
+        try {
+            const response = await fetch(`/api/sessions/${this.sessionId}`);
+            if (response.status === 404) {
+                this.clearSession();
+                return;
+            }
+            const data = await response.json();
+            if (response.ok) {
+                this.renderSession(data.session);
+            }
+        } catch (error) {
+            console.error('Error loading session:', error);
+        }
+    }
+
+    async dropSessionTable(name) {
+        const response = await fetch(`/api/sessions/${this.sessionId}/tables/${encodeURIComponent(name)}`, { method: 'DELETE' });
+        const data = await response.json();
+        if (!response.ok) {
+            this.showError(data.error);
+            return;
+        }
+        this.renderSession(data.session);
+    }
+
+    async endSession() {
+        if (this.sessionId) {
+            await fetch(`/api/sessions/${this.sessionId}`, { method: 'DELETE' });
+        }
+        this.clearSession();
+    }
+
+    renderSession(session) {
+        // Saved tables can be queried by name (joined with the selected table) until the session expires
+        const container = document.getElementById('sessionTables');
+        if (!container) return;
+        if (!session || session.tables.length === 0) {
+            container.innerHTML = '';
+            return;
+        }
+        const mb = bytes => (bytes / 1048576).toFixed(1);
+        const escape = text => String(text).replace(/[&<>"']/g, c => `&#${c.charCodeAt(0)};`);
+        container.innerHTML = `
+            <small class="text-muted">
+                Saved tables (${mb(session.usage_bytes)} of ${mb(session.quota_bytes)} MB,
+                expires ${new Date(session.expires_at).toLocaleString()} if unused):
+            </small>
+            ${session.tables.map(table => `
+                <span class="badge bg-light text-dark border ms-1" title="${escape(table.query)}">
+                    <a href="#" class="session-table" data-name="${escape(table.name)}">${escape(table.name)}</a>
+                    (${table.rows.toLocaleString()} rows)
+                    <a href="#" class="session-drop text-danger ms-1" data-name="${escape(table.name)}" title="Drop">&times;</a>
+                </span>
+            `).join('')}
+            <a href="#" class="session-end small ms-2">End session</a>
+        `;
+        container.querySelectorAll('.session-table').forEach(link => link.addEventListener('click', event => {
+            event.preventDefault();
+            document.getElementById('sqlQuery').value = `SELECT * FROM ${link.dataset.name} LIMIT 10`;
+        }));
+        container.querySelectorAll('.session-drop').forEach(link => link.addEventListener('click', event => {
+            event.preventDefault();
+            this.dropSessionTable(link.dataset.name);
+        }));
+        container.querySelector('.session-end').addEventListener('click', event => {
+            event.preventDefault();
+            this.endSession();
+        });
+    }
+
+    async streamQuery(queryText, limit) {
+        // Server-Sent Events over a POST: rows are appended as each batch arrives
+        const response = await fetch(`/api/table/${this.currentTable.namespace}/${this.currentTable.name}/query/stream`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ query: queryText, limit: limit, batch_size: 200 })
+        });
+        if (!response.ok) {
+            const data = await response.json();
+            this.showError(`Query Error: ${data.error}`);
+            return;
+        }
+
+        const container = document.getElementById('queryResults');
+        container.innerHTML = `
+            <div class="query-result-header">
+                <h4>Query Results <span class="badge bg-info text-dark" id="streamStatus">Running</span></h4>
+                <p class="query-info" id="streamProgress"></p>
+                <div class="progress mb-2" style="height: 4px;">
+                    <div class="progress-bar" id="streamProgressBar" style="width: 0%"></div>
+                </div>
+            </div>
+            <div class="query-result-grid"></div>
+        `;
+        const gridContainer = container.querySelector('.query-result-grid');
+        let source = null;
+
+        const handlers = {
+            start: () => {},
+            progress: (data) => this.renderStreamProgress(data),
+            rows: (data) => {
+                if (source === null) {
+                    source = new LocalRowsSource(data.columns);
+                    this.queryGrid = new VirtualGrid(gridContainer, source);
+                }
+                source.appendRows(data.data);
+                this.queryGrid.refresh();
+            },
+            done: (data) => {
+                this.renderStreamProgress(data);
+                document.getElementById('streamStatus').outerHTML = '';
+                if (data.rows_emitted === 0) {
+                    gridContainer.innerHTML = '<p class="no-data">No data returned</p>';
+                }
+            },
+            error: (data) => {
+                document.getElementById('streamStatus').outerHTML = '<span class="badge bg-danger">Failed</span>';
+                this.showError(`Query Error: ${data.error}`);
+            }
+        };
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                const event = (frame.match(/^event: (.*)$/m) || [])[1];
+                const data = (frame.match(/^data: (.*)$/m) || [])[1];
+                if (event && data && handlers[event]) {
+                    handlers[event](JSON.parse(data));
+                }
+            }
+        }
+    }
+
+    renderStreamProgress(progress) {
+        const mb = bytes => (bytes / 1048576).toFixed(1);
+        document.getElementById('streamProgress').innerHTML = `
+            <strong>Rows:</strong> ${progress.rows_emitted.toLocaleString()} |
+            <strong>Scanned:</strong> ${progress.files_scanned} of ${progress.files_total} files,
+            ${mb(progress.bytes_scanned)} of ${mb(progress.bytes_total)} MB
+            (${progress.rows_read.toLocaleString()} rows read) |
+            <strong>Elapsed:</strong> ${progress.elapsed_seconds}s
+            ${progress.first_batch_seconds != null ? `| <strong>First rows:</strong> ${progress.first_batch_seconds}s` : ''}
+        `;
+        const share = progress.bytes_total ? progress.bytes_scanned / progress.bytes_total : 1;
+        document.getElementById('streamProgressBar').style.width = `${(share * 100).toFixed(0)}%`;
+    }
+
     renderQueryResults(queryResult) {
         const container = document.getElementById('queryResults');
         if (!container) return;
 
         const result = queryResult.result;
+        const approx = queryResult.approximate;
+        const intervals = approx ? approx.confidence_intervals || {} : {};
         
         let html = `
             <div class="query-result-header">
-                <h4>Query Results</h4>
+                <h4>Query Results${approx ? ' <span class="badge bg-warning text-dark">Approximate</span>' : ''}</h4>
                 <p class="query-info">
                     <strong>Rows:</strong> ${result.row_count} | 
-                    <strong>Engine:</strong> ${result.engine || 'duckdb'}
+                    <strong>Engine:</strong> ${result.engine || 'duckdb'}${queryResult.plan ? ` (${queryResult.plan.strategy})` : ''}
                 </p>
-            </div>
         `;
+        if (approx) {
+            html += `
+                <p class="query-info">
+                    <strong>Sample:</strong> ${approx.units_sampled} of ${approx.units_total} row groups
+                    (${(approx.fraction_rows_read * 100).toFixed(1)}% of rows) across ${approx.strata} strata
+                    (${approx.partitions_sampled} of ${approx.partitions} partitions) |
+                    <strong>Confidence:</strong> ${approx.confidence * 100}%
+                    ${approx.note ? `<br><em>${approx.note}</em>` : ''}
+                </p>
+            `;
+        }
+        html += '</div>';
+
+        // Exact results can be long, so they go into a virtualized grid
+        if (!approx && result.data && result.data.length > 0) {
+            container.innerHTML = html + '<div class="query-result-grid"></div>';
+            this.queryGrid = new VirtualGrid(container.querySelector('.query-result-grid'),
+                new LocalRowsSource(result.columns, result.data));
+            return;
+        }
 
         if (result.data && result.data.length > 0) {
             html += '<div class="table-container">';
@@ -580,10 +922,17 @@ class LakehouseExplorer {
             
             // Data rows
             html += '<tbody>';
-            result.data.forEach(row => {
+            result.data.forEach((row, rowIndex) => {
                 html += '<tr>';
-                row.forEach(cell => {
-                    const cellValue = cell === null ? '<em>null</em>' : String(cell);
+                row.forEach((cell, colIndex) => {
+                    let cellValue = cell === null ? '<em>null</em>' : String(cell);
+                    const columnIntervals = intervals[result.columns[colIndex]];
+                    const interval = columnIntervals ? columnIntervals[rowIndex] : undefined;
+                    if (interval) {
+                        cellValue += ` <small class="text-muted">[${interval[0]}, ${interval[1]}]</small>`;
+                    } else if (interval === null) {
+                        cellValue += ' <small class="text-muted">[uncertain]</small>';
+                    }
                     html += `<td>${cellValue}</td>`;
                 });
                 html += '</tr>';
@@ -630,7 +979,15 @@ class LakehouseExplorer {
         let html = `
             <div class="statistics-header">
                 <h4>Table Statistics</h4>
-                <p class="stats-engine">Engine: ${stats.engine || 'duckdb'}</p>
+                <p class="stats-engine">Engine: ${stats.engine || 'duckdb'}${stats.plan ? ` (${stats.plan.strategy})` : ''}</p>
+                ${stats.note ? `<p class="text-muted">${stats.note}</p>` : ''}
+                ${stats.freshness ? `
+                    <p class="stats-freshness text-muted">
+                        Computed ${stats.freshness.computed_at ? new Date(stats.freshness.computed_at).toLocaleString() : ''}
+                        (snapshot ${stats.freshness.snapshot_id})
+                        ${stats.freshness.status === 'stale' ? '<span class="badge bg-warning text-dark">Stale - refresh queued</span>' : ''}
+                    </p>
+                ` : ''}
             </div>
             
             <div class="stats-summary">
@@ -640,8 +997,14 @@ class LakehouseExplorer {
                 </div>
                 <div class="stat-item">
                     <label>Distinct Rows:</label>
-                    <span>${stats.distinct_rows.toLocaleString()}</span>
+                    <span>${this.formatCount(stats.distinct_rows)}</span>
                 </div>
+                ${stats.incremental ? `
+                    <div class="stat-item">
+                        <label>Data Files Reused:</label>
+                        <span>${stats.incremental.files_reused} / ${stats.incremental.data_files}</span>
+                    </div>
+                ` : ''}
             </div>
         `;
 
@@ -650,20 +1013,22 @@ class LakehouseExplorer {
             html += '<h5>Column Statistics</h5>';
             html += '<div class="stats-table-container">';
             html += '<table class="stats-table">';
-            html += '<thead><tr><th>Column</th><th>Count</th><th>Distinct</th><th>Nulls</th><th>Null %</th></tr></thead>';
+            html += '<thead><tr><th>Column</th><th>Count</th><th>Distinct</th><th>Nulls</th><th>Null %</th><th>Min</th><th>Max</th></tr></thead>';
             html += '<tbody>';
 
             Object.entries(stats.column_statistics).forEach(([col, colStats]) => {
                 if (colStats.error) {
-                    html += `<tr><td>${col}</td><td colspan="4">Error: ${colStats.error}</td></tr>`;
+                    html += `<tr><td>${col}</td><td colspan="6">Error: ${colStats.error}</td></tr>`;
                 } else {
                     html += `
                         <tr>
                             <td><strong>${col}</strong></td>
                             <td>${colStats.count.toLocaleString()}</td>
-                            <td>${colStats.distinct_count.toLocaleString()}</td>
-                            <td>${colStats.null_count.toLocaleString()}</td>
-                            <td>${colStats.null_percentage}%</td>
+                            <td>${this.formatCount(colStats.distinct_count)}</td>
+                            <td>${this.formatCount(colStats.null_count)}</td>
+                            <td>${colStats.null_percentage === null ? '—' : `${colStats.null_percentage}%`}</td>
+                            <td>${this.formatCellValue(colStats.min)}</td>
+                            <td>${this.formatCellValue(colStats.max)}</td>
                         </tr>
                     `;
                 }
@@ -0,0 +1,226 @@
+/**
+ * Virtualized data grid
+ * Renders only the visible rows and columns of a result and loads the
+ * pages it needs on demand, so very large and very wide tables stay smooth.
+ */
+
+class PageCache {
+    // Least recently used pages are evicted beyond maxPages
+    constructor(maxPages = 60) {
+        this.maxPages = maxPages;
+        this.pages = new Map();
+    }
+
+    peek(key) {
+        return this.pages.get(key);
+    }
+
+    touch(key) {
+        const page = this.pages.get(key);
+        if (page !== undefined) {
+            this.pages.delete(key);
+            this.pages.set(key, page);
+        }
+        return page;
+    }
+
+    set(key, page) {
+        this.pages.delete(key);
+        this.pages.set(key, page);
+        while (this.pages.size > this.maxPages) {
+            this.pages.delete(this.pages.keys().next().value);
+        }
+    }
+
+    clear() {
+        this.pages.clear();
+    }
+}
+
+class RemoteTableSource {
+    // Pages of rows × blocks of columns from /api/table/<ns>/<table>/rows, in columnar JSON
+    constructor(url, columns, rowCount, { pageSize = 200, columnBlock = 24, maxPages = 60 } = {}) {
+        this.url = url;
+        this.columns = columns;
+        this.rowCount = rowCount;
+        this.pageSize = pageSize;
+        this.columnBlock = columnBlock;
+        this.cache = new PageCache(maxPages);
+        this.pending = new Map();
+    }
+
+    key(page, block) {
+        return `${page}:${block}`;
+    }
+
+    getCell(row, col) {
+        const page = Math.floor(row / this.pageSize);
+        const block = Math.floor(col / this.columnBlock);
+        const data = this.cache.peek(this.key(page, block));
+        if (!data) return undefined;
+        return data[col - block * this.columnBlock][row - page * this.pageSize];
+    }
+
+    ensure(rowStart, rowEnd, colStart, colEnd) {
+        const loads = [];
+        const lastPage = Math.floor(Math.max(rowEnd - 1, 0) / this.pageSize);
+        const lastBlock = Math.floor(Math.max(colEnd - 1, 0) / this.columnBlock);
+        for (let page = Math.floor(rowStart / this.pageSize); page <= lastPage; page++) {
+            for (let block = Math.floor(colStart / this.columnBlock); block <= lastBlock; block++) {
+                const key = this.key(page, block);
+                if (this.cache.touch(key) !== undefined) continue;
+                if (!this.pending.has(key)) {
+                    this.pending.set(key, this.load(page, block).finally(() => this.pending.delete(key)));
+                }
+                loads.push(this.pending.get(key));
+            }
+        }
+        return Promise.all(loads);
+    }
+
+    async load(page, block) {
+        const columns = this.columns.slice(block * this.columnBlock, (block + 1) * this.columnBlock);
+        const separator = this.url.includes('?') ? '&' : '?';
+        const response = await fetch(`${this.url}${separator}offset=${page * this.pageSize}` +
+            `&limit=${this.pageSize}&columns=${encodeURIComponent(columns.join(','))}`);
+        const data = await response.json();
+        if (!response.ok) {
+            throw new Error(data.error);
+        }
+        this.cache.set(this.key(page, block), data.page.data);
+    }
+}
+
+class LocalRowsSource {
+    // Rows already in the browser (query results); more can be appended while streaming
+    constructor(columns, rows = []) {
+        this.columns = columns;
+        this.rows = rows;
+    }
+
+    get rowCount() {
+        return this.rows.length;
+    }
+
+    getCell(row, col) {
+        return this.rows[row][col];
+    }
+
+    ensure() {
+        return Promise.resolve();
+    }
+
+    appendRows(rows) {
+        for (const row of rows) {
+            this.rows.push(row);
+        }
+    }
+}
+
+class VirtualGrid {
+    constructor(container, source, { rowHeight = 28, columnWidth = 160, height = 480, overscan = 4 } = {}) {
+        this.container = container;
+        this.source = source;
+        this.rowHeight = rowHeight;
+        this.columnWidth = columnWidth;
+        this.overscan = overscan;
+        this.frame = null;
+
+        container.innerHTML = `
+            <div class="vgrid" style="height: ${height}px;">
+                <div class="vgrid-sizer">
+                    <div class="vgrid-header" style="height: ${rowHeight}px;"></div>
+                    <div class="vgrid-body"></div>
+                </div>
+            </div>
+            <small class="text-muted vgrid-status"></small>
+        `;
+        this.viewport = container.querySelector('.vgrid');
+        this.sizer = container.querySelector('.vgrid-sizer');
+        this.header = container.querySelector('.vgrid-header');
+        this.body = container.querySelector('.vgrid-body');
+        this.status = container.querySelector('.vgrid-status');
+
+        this.viewport.addEventListener('scroll', () => this.scheduleRender());
+        this.refresh();
+    }
+
+    refresh() {
+        // Call after the source's row count changes
+        this.sizer.style.width = `${this.source.columns.length * this.columnWidth}px`;
+        this.sizer.style.height = `${(this.source.rowCount + 1) * this.rowHeight}px`;
+        this.scheduleRender();
+    }
+
+    scheduleRender() {
+        if (this.frame === null) {
+            this.frame = requestAnimationFrame(() => {
+                this.frame = null;
+                this.render();
+            });
+        }
+    }
+
+    visibleRange() {
+        const top = this.viewport.scrollTop;
+        const left = this.viewport.scrollLeft;
+        const rowStart = Math.max(0, Math.floor(top / this.rowHeight) - this.overscan);
+        const rowEnd = Math.min(this.source.rowCount,
+            Math.ceil((top + this.viewport.clientHeight) / this.rowHeight) + this.overscan);
+        const colStart = Math.max(0, Math.floor(left / this.columnWidth) - 1);
+        const colEnd = Math.min(this.source.columns.length,
+            Math.ceil((left + this.viewport.clientWidth) / this.columnWidth) + 1);
+        return { rowStart, rowEnd, colStart, colEnd };
+    }
+
+    render() {
+        const { rowStart, rowEnd, colStart, colEnd } = this.visibleRange();
+        const cell = (text, row, col, className) =>
+            `<div class="${className}" style="top: ${row * this.rowHeight}px; left: ${col * this.columnWidth}px; ` +
+            `width: ${this.columnWidth}px; height: ${this.rowHeight}px;">${text}</div>`;
+
+        let header = '';
+        for (let col = colStart; col < colEnd; col++) {
+            const name = VirtualGrid.escape(this.source.columns[col]);
+            header += cell(name, 0, col, 'vgrid-cell vgrid-header-cell');
+        }
+        this.header.innerHTML = header;
+
+        let body = '';
+        let missing = false;
+        for (let row = rowStart; row < rowEnd; row++) {
+            for (let col = colStart; col < colEnd; col++) {
+                const value = this.source.getCell(row, col);
+                if (value === undefined) missing = true;
+                body += cell(VirtualGrid.format(value), row + 1, col, 'vgrid-cell');
+            }
+        }
+        this.body.innerHTML = body;
+
+        // Data row r sits below the header, at (r + 1) row heights
+        const total = this.source.rowCount;
+        const first = Math.min(Math.floor(this.viewport.scrollTop / this.rowHeight) + 1, total);
+        const last = Math.min(Math.floor((this.viewport.scrollTop + this.viewport.clientHeight) / this.rowHeight) - 1, total);
+        this.status.textContent = total === 0 ? 'No rows' :
+            `Rows ${first.toLocaleString()}–${Math.max(first, last).toLocaleString()} of ${total.toLocaleString()} · ` +
+            `${this.source.columns.length} columns`;
+
+        if (missing) {
+            this.source.ensure(rowStart, rowEnd, colStart, colEnd)
+                .then(() => this.scheduleRender())
+                .catch(error => { this.status.textContent = `Failed to load rows: ${error.message}`; });
+        }
+    }
+
+    static escape(text) {
+        return String(text).replace(/[&<>"']/g, ch =>
+            ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' })[ch]);
+    }
+
+    static format(value) {
+        if (value === undefined) return '<span class="text-muted">…</span>';
+        if (value === null) return '<em class="text-muted">null</em>';
+        if (typeof value === 'object') return VirtualGrid.escape(JSON.stringify(value));
+        return VirtualGrid.escape(value);
+    }
+}
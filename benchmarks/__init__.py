@@ -0,0 +1,6 @@
+"""
+Benchmark suite for Lakehouse Explorer on a local synthetic lakehouse
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.compare baseline.json results.json
+"""
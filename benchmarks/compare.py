@@ -0,0 +1,93 @@
+"""
+Compare two benchmark result files and report regressions
+
+    python -m benchmarks.compare baseline.json results.json --threshold 0.25
+"""
+
+from typing import List, Dict, Any, Optional
+import argparse
+import json
+import sys
+
+# Changes below this many milliseconds are noise, whatever the ratio
+MIN_LATENCY_DELTA_MS = 2.0
+MIN_RSS_DELTA_MB = 16.0
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.25) -> Dict[str, Any]:
+    """Match cases by name and flag median latency or peak RSS growth beyond ``threshold``"""
+    before = {r["name"]: r for r in baseline.get("results", []) if "latency_ms" in r}
+    rows = []
+    regressions = []
+    for result in current.get("results", []):
+        old = before.get(result["name"])
+        if old is None or "latency_ms" not in result:
+            continue
+        old_ms, new_ms = old["latency_ms"]["median"], result["latency_ms"]["median"]
+        row = {
+            "name": result["name"],
+            "baseline_ms": old_ms,
+            "current_ms": new_ms,
+            "latency_ratio": round(new_ms / old_ms, 3) if old_ms else None,
+            "baseline_rss_mb": old.get("peak_rss_mb"),
+            "current_rss_mb": result.get("peak_rss_mb"),
+            "baseline_bytes_read": old.get("bytes_read_per_run"),
+            "current_bytes_read": result.get("bytes_read_per_run"),
+            "regressed": []
+        }
+        if new_ms > old_ms * (1 + threshold) and new_ms - old_ms > MIN_LATENCY_DELTA_MS:
+            row["regressed"].append("latency")
+        old_rss, new_rss = old.get("peak_rss_mb"), result.get("peak_rss_mb")
+        if old_rss and new_rss and new_rss > old_rss * (1 + threshold) and new_rss - old_rss > MIN_RSS_DELTA_MB:
+            row["regressed"].append("memory")
+        if old.get("success") and not result.get("success"):
+            row["regressed"].append("failure")
+        if row["regressed"]:
+            regressions.append(row["name"])
+        rows.append(row)
+
+    return {
+        "threshold": threshold,
+        "baseline_commit": baseline.get("environment", {}).get("git_commit"),
+        "current_commit": current.get("environment", {}).get("git_commit"),
+        "compared": rows,
+        "missing": sorted(set(before) - {r["name"] for r in current.get("results", [])}),
+        "regressions": regressions
+    }
+
+
+def print_comparison(comparison: Dict[str, Any]):
+    print(f"\nComparison {comparison['baseline_commit']} -> {comparison['current_commit']} "
+          f"(threshold {comparison['threshold']:.0%})")
+    for row in comparison["compared"]:
+        ratio = f"{row['latency_ratio']:.2f}x" if row["latency_ratio"] is not None else "n/a"
+        flag = f"  REGRESSED ({', '.join(row['regressed'])})" if row["regressed"] else ""
+        print(f"{row['name']:<60} {row['baseline_ms']:>10.1f} -> {row['current_ms']:>10.1f} ms  {ratio:>7}{flag}")
+    if comparison["missing"]:
+        print(f"{len(comparison['missing'])} baseline case(s) not in the current run")
+    print(f"{len(comparison['regressions'])} regression(s)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--json", action="store_true", help="Print the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    comparison = compare_results(baseline, current, args.threshold)
+    if args.json:
+        print(json.dumps(comparison, indent=2))
+    else:
+        print_comparison(comparison)
+    return 2 if comparison["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
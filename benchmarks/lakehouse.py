@@ -0,0 +1,253 @@
+"""
+Build a local lakehouse (PyIceberg SQL catalog on SQLite + filesystem warehouse) with synthetic tables
+"""
+
+from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, asdict
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from pyiceberg.catalog import Catalog
+from pyiceberg.expressions import LessThan
+from pyiceberg.manifest import (DataFile, DataFileContent, FileFormat, ManifestContent, ManifestEntry,
+                                ManifestEntryStatus, ManifestWriterV2, write_manifest_list)
+from pyiceberg.table import Table, TableProperties
+from pyiceberg.table.refs import MAIN_BRANCH, SnapshotRefType
+from pyiceberg.table.snapshots import (Operation, Snapshot, SnapshotSummaryCollector, Summary,
+                                       update_snapshot_summaries)
+from pyiceberg.table.update import AddSnapshotUpdate, AssertRefSnapshotId, SetSnapshotRefUpdate
+
+from app.core.config import LakehouseConfig
+from app.core.manifests import PARQUET_FIELD_ID_KEY, POSITION_DELETE_FILE_PATH_ID, read_position_deletes
+
+NAMESPACE = "bench"
+COLUMN_TYPES = ("int", "double", "string", "timestamp")
+DELETE_MODES = ("merge-on-read", "copy-on-write")
+# Reserved field id of the position column of a position delete file
+POSITION_DELETE_POS_ID = 2147483545
+
+
+@dataclass
+class SyntheticTableSpec:
+    """Shape of one synthetic table"""
+    name: str
+    rows: int = 100_000
+    columns: int = 8  # besides id and part
+    partitions: int = 0  # distinct values of the identity-partitioned "part" column; 0 = unpartitioned
+    files: int = 8  # number of appends (each writes one file per partition)
+    deletes: int = 0  # row-level delete commits, each removing ~1% of the rows
+    delete_mode: str = "merge-on-read"  # position delete files, or "copy-on-write" file rewrites
+    seed: int = 42
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+DEFAULT_TABLES = [
+    SyntheticTableSpec("narrow", rows=100_000, columns=4, files=4),
+    SyntheticTableSpec("wide", rows=50_000, columns=64, files=4),
+    SyntheticTableSpec("partitioned", rows=200_000, columns=8, partitions=8, files=8),
+    SyntheticTableSpec("many_files", rows=100_000, columns=8, files=64),
+    SyntheticTableSpec("with_deletes", rows=100_000, columns=8, files=8, deletes=3),
+    SyntheticTableSpec("with_rewrites", rows=100_000, columns=8, files=8, deletes=3, delete_mode="copy-on-write"),
+]
+
+
+def _column_type(index: int) -> str:
+    return COLUMN_TYPES[index % len(COLUMN_TYPES)]
+
+
+def synthetic_batch(spec: SyntheticTableSpec, start: int, count: int, rng: np.random.Generator) -> pa.Table:
+    """Rows ``start .. start + count`` of a synthetic table"""
+    data = {
+        "id": pa.array(np.arange(start, start + count), pa.int64()),
+        "part": pa.array((np.arange(start, start + count) % max(spec.partitions, 1)).astype(np.int32), pa.int32()),
+    }
+    categories = np.array([f"value_{i:03d}" for i in range(200)])
+    for i in range(spec.columns):
+        kind = _column_type(i)
+        if kind == "int":
+            values = pa.array(rng.integers(0, 1_000_000, count), pa.int64())
+        elif kind == "double":
+            values = pa.array(rng.exponential(100.0, count), pa.float64())
+        elif kind == "string":
+            values = pa.array(categories[rng.zipf(1.5, count) % len(categories)], pa.string())
+        else:
+            values = pa.array(1_700_000_000_000_000 + rng.integers(0, 86_400_000_000 * 365, count),
+                              pa.timestamp("us"))
+        # Sprinkle ~2% nulls so null counting is exercised
+        mask = rng.random(count) < 0.02
+        data[f"c{i:02d}_{kind}"] = pc.if_else(pa.array(mask), pa.nulls(count, values.type), values)
+    return pa.table(data)
+
+
+def create_table(catalog: Catalog, spec: SyntheticTableSpec):
+    """Create and fill one synthetic table, replacing any previous version"""
+    identifier = (NAMESPACE, spec.name)
+    if catalog.table_exists(identifier):
+        catalog.drop_table(identifier)
+
+    rng = np.random.default_rng(spec.seed)
+    table = catalog.create_table(identifier, schema=synthetic_batch(spec, 0, 1, rng).schema)
+    if spec.partitions:
+        with table.update_spec() as update:
+            update.add_identity("part")
+        table = catalog.load_table(identifier)
+
+    per_file = max(1, spec.rows // max(spec.files, 1))
+    written = 0
+    while written < spec.rows:
+        count = min(per_file, spec.rows - written)
+        table.append(synthetic_batch(spec, written, count, rng))
+        written += count
+
+    if spec.delete_mode not in DELETE_MODES:
+        raise ValueError(f"Unknown delete mode {spec.delete_mode!r}: expected one of {', '.join(DELETE_MODES)}")
+    for i in range(spec.deletes):
+        start = (i + 1) * spec.rows // (spec.deletes + 1)
+        if spec.delete_mode == "merge-on-read":
+            table = delete_positions(table, start - spec.rows // 100, start)
+        else:
+            # PyIceberg's own deletes rewrite the affected files into a new snapshot
+            table.delete(delete_filter=LessThan("id", start) & ~LessThan("id", start - spec.rows // 100))
+    return catalog.load_table(identifier)
+
+
+class _PositionDeleteManifestWriter(ManifestWriterV2):
+    def content(self) -> ManifestContent:
+        return ManifestContent.DELETES
+
+    @property
+    def _meta(self) -> Dict[str, str]:
+        return {**super()._meta, "content": "deletes"}
+
+
+def _commit_delete_files(table: Table, delete_files: List[DataFile]) -> Table:
+    """Commit delete files, in one delete manifest, as a new snapshot on top of the main branch
+
+    PyIceberg has no public operation that adds delete files, so the snapshot
+    is assembled from its manifest and manifest list writers and committed
+    through the catalog, guarded by the branch's current snapshot id.
+    """
+    metadata = table.metadata
+    parent = table.current_snapshot()
+    schema, spec = metadata.schema(), metadata.spec()
+    snapshot_id = metadata.new_snapshot_id()
+    sequence_number = metadata.next_sequence_number()
+    compression = metadata.properties.get(TableProperties.WRITE_AVRO_COMPRESSION,
+                                          TableProperties.WRITE_AVRO_COMPRESSION_DEFAULT)
+    commit_uuid = uuid.uuid4()
+    locations = table.location_provider()
+
+    manifest_output = table.io.new_output(locations.new_metadata_location(f"{commit_uuid}-m0.avro"))
+    with _PositionDeleteManifestWriter(spec, schema, manifest_output, snapshot_id, compression) as writer:
+        for delete_file in delete_files:
+            writer.add(ManifestEntry.from_args(status=ManifestEntryStatus.ADDED, snapshot_id=snapshot_id,
+                                               data_file=delete_file))
+    manifests = [writer.to_manifest_file(), *(parent.manifests(table.io) if parent else [])]
+
+    manifest_list = locations.new_metadata_location(f"snap-{snapshot_id}-0-{commit_uuid}.avro")
+    with write_manifest_list(metadata.format_version, table.io.new_output(manifest_list), snapshot_id,
+                             parent.snapshot_id if parent else None, sequence_number, compression) as writer:
+        writer.add_manifests(manifests)
+
+    collector = SnapshotSummaryCollector()
+    for delete_file in delete_files:
+        collector.add_file(data_file=delete_file, schema=schema, partition_spec=spec)
+    summary = update_snapshot_summaries(Summary(Operation.DELETE, **collector.build()),
+                                        parent.summary if parent else None)
+    snapshot = Snapshot(snapshot_id=snapshot_id, parent_snapshot_id=parent.snapshot_id if parent else None,
+                        sequence_number=sequence_number, timestamp_ms=int(time.time() * 1000),
+                        manifest_list=manifest_list, summary=summary, schema_id=metadata.current_schema_id)
+    table.catalog.commit_table(
+        table,
+        requirements=(AssertRefSnapshotId(ref=MAIN_BRANCH, snapshot_id=parent.snapshot_id if parent else None),),
+        updates=(AddSnapshotUpdate(snapshot=snapshot),
+                 SetSnapshotRefUpdate(ref_name=MAIN_BRANCH, type=SnapshotRefType.BRANCH, snapshot_id=snapshot_id)))
+    return table.refresh()
+
+
+def _position_delete_file(table: Table, data_file: DataFile, positions: np.ndarray) -> DataFile:
+    """Write the position delete file of one data file"""
+    path_bytes = data_file.file_path.encode()
+    schema = pa.schema([
+        pa.field("file_path", pa.string(), nullable=False,
+                 metadata={PARQUET_FIELD_ID_KEY: str(POSITION_DELETE_FILE_PATH_ID)}),
+        pa.field("pos", pa.int64(), nullable=False, metadata={PARQUET_FIELD_ID_KEY: str(POSITION_DELETE_POS_ID)}),
+    ])
+    deletes = pa.table([pa.array([data_file.file_path] * len(positions), pa.string()),
+                        pa.array(positions, pa.int64())], schema=schema)
+    location = table.location_provider().new_data_location(f"delete-{uuid.uuid4()}.parquet")
+    with table.io.new_output(location).create(overwrite=True) as f:
+        pq.write_table(deletes, f)
+    return DataFile.from_args(
+        content=DataFileContent.POSITION_DELETES,
+        file_path=location,
+        file_format=FileFormat.PARQUET,
+        partition=data_file.partition,
+        record_count=len(positions),
+        file_size_in_bytes=len(table.io.new_input(location)),
+        lower_bounds={POSITION_DELETE_FILE_PATH_ID: path_bytes},
+        upper_bounds={POSITION_DELETE_FILE_PATH_ID: path_bytes},
+        spec_id=data_file.spec_id,
+    )
+
+
+def delete_positions(table: Table, id_from: int, id_to: int) -> Table:
+    """Delete the rows with ``id_from <= id < id_to`` merge-on-read, with one position delete file per data file"""
+    delete_files = []
+    for task in table.scan(row_filter=~LessThan("id", id_from) & LessThan("id", id_to)).plan_files():
+        with table.io.new_input(task.file.file_path).open() as f:
+            ids = pq.read_table(f, columns=["id"]).column("id").to_numpy()
+        positions = np.flatnonzero((ids >= id_from) & (ids < id_to))
+        already = read_position_deletes(table.io, task.delete_files).get(task.file.file_path)
+        if already is not None:
+            positions = np.setdiff1d(positions, already, assume_unique=True)
+        if len(positions):
+            delete_files.append(_position_delete_file(table, task.file, positions))
+
+    if delete_files:
+        table = _commit_delete_files(table, delete_files)
+    return table
+
+
+def build_lakehouse(root: str, specs: Optional[List[SyntheticTableSpec]] = None, rebuild: bool = True) -> Catalog:
+    """Create the SQL catalog and warehouse under ``root`` and fill it with the synthetic tables"""
+    try:
+        from pyiceberg.catalog.sql import SqlCatalog
+    except ImportError:
+        raise ImportError("The benchmark lakehouse needs the SQL catalog: pip install -r requirements-dev.txt")
+
+    root = os.path.abspath(root)
+    if rebuild:
+        shutil.rmtree(root, ignore_errors=True)
+    warehouse = os.path.join(root, "warehouse")
+    os.makedirs(warehouse, exist_ok=True)
+
+    catalog = SqlCatalog("bench", uri=f"sqlite:///{os.path.join(root, 'catalog.db')}", warehouse=f"file://{warehouse}")
+    if (NAMESPACE,) not in catalog.list_namespaces():
+        catalog.create_namespace(NAMESPACE)
+
+    if rebuild:
+        for spec in specs if specs is not None else DEFAULT_TABLES:
+            create_table(catalog, spec)
+    return catalog
+
+
+def benchmark_config(root: str, stats_store_path: Optional[str] = None) -> LakehouseConfig:
+    """Explorer configuration for the local lakehouse (the catalog itself is injected)"""
+    warehouse = os.path.join(os.path.abspath(root), "warehouse")
+    return LakehouseConfig(
+        nessie_uri=f"sqlite:///{os.path.join(os.path.abspath(root), 'catalog.db')}",
+        s3_endpoint="",
+        s3_access_key="",
+        s3_secret_key="",
+        warehouse_path=f"file://{warehouse}",
+        stats_store_path=stats_store_path
+    )
@@ -0,0 +1,483 @@
+"""
+Concurrent load test of the API with a mixed analytics workload
+
+Virtual users browse the table tree, search, look at schemas, previews and
+statistics and run SQL, with think time between requests. The target is an
+in-process server, a running deployment (--url), or a sweep of gunicorn
+worker/thread configurations over the local synthetic lakehouse.
+
+    python -m benchmarks.load --users 50 --duration 60
+    python -m benchmarks.load --sweep 1x4,2x4,4x4,4x8 --users 50 --output sweep.json
+    python -m benchmarks.load --url http://explorer:5000 --users 20 --think-time 2
+"""
+
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field, asdict
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from benchmarks.lakehouse import DEFAULT_TABLES, SyntheticTableSpec, benchmark_config, build_lakehouse
+from benchmarks.measure import PAGE_SIZE, percentile
+
+ROOT_ENV = "BENCH_LAKEHOUSE_ROOT"
+
+# Relative weights of what an analyst does in the explorer
+DEFAULT_MIX = {
+    "browse": 25,
+    "search": 10,
+    "schema": 15,
+    "preview": 20,
+    "statistics": 10,
+    "query": 20
+}
+
+QUERIES = [
+    "SELECT part, count(*) AS n FROM {table} GROUP BY part",
+    "SELECT * FROM {table} WHERE id % 97 = 0 LIMIT 50",
+    "SELECT min(id), max(id), count(*) FROM {table}",
+]
+
+
+@dataclass
+class LoadSettings:
+    users: int = 10
+    duration: float = 30.0  # seconds, after ramp-up
+    ramp_up: float = 5.0  # seconds over which users start
+    think_time: float = 1.0  # mean seconds between a user's requests (exponential)
+    timeout: float = 60.0
+    mix: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    seed: int = 7
+
+
+class Workload:
+    """Turn an operation name into a concrete request against one of the known tables"""
+
+    def __init__(self, tables: List[Tuple[str, str]], mix: Dict[str, int]):
+        unknown = set(mix) - set(DEFAULT_MIX)
+        if unknown:
+            raise ValueError(f"Unknown operation(s) in mix: {', '.join(sorted(unknown))}")
+        if not tables:
+            raise ValueError("The target has no tables to load-test against")
+        self.tables = tables
+        self.operations = [op for op, weight in mix.items() if weight > 0]
+        self.weights = [mix[op] for op in self.operations]
+
+    def next_request(self, rng: random.Random) -> Tuple[str, str, str, Optional[Dict[str, Any]]]:
+        operation = rng.choices(self.operations, self.weights)[0]
+        namespace, table = rng.choice(self.tables)
+        base = f"/api/table/{namespace}/{table}"
+        if operation == "browse":
+            return operation, "GET", rng.choice(["/api/namespaces", "/api/tables", f"/api/tables/{namespace}"]), None
+        if operation == "search":
+            return operation, "GET", f"/api/search?q={table[:rng.randint(1, len(table))]}", None
+        if operation == "schema":
+            return operation, "GET", rng.choice([f"{base}/schema", f"{base}/metadata"]), None
+        if operation == "preview":
+            return operation, "GET", f"{base}/preview?limit={rng.choice([10, 50, 100])}", None
+        if operation == "statistics":
+            return operation, "GET", f"{base}/statistics", None
+        return operation, "POST", f"{base}/query", {"query": rng.choice(QUERIES).format(table=table), "limit": 100}
+
+
+def discover_tables(base_url: str, timeout: float = 30) -> List[Tuple[str, str]]:
+    response = requests.get(f"{base_url}/api/tables", timeout=timeout)
+    response.raise_for_status()
+    namespaces = response.json()["namespaces"]
+    return [(namespace, table) for namespace, info in namespaces.items() for table in info["tables"]]
+
+
+def process_rss(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of a process (gunicorn workers of a master), from /proc"""
+    children = []
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return children
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; the ppid follows the closing paren
+                fields = f.read().rsplit(")", 1)[1].split()
+            if int(fields[1]) == pid:
+                children.append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+
+class MemorySampler:
+    """Periodically record the RSS of the server processes (e.g. each gunicorn worker)"""
+
+    def __init__(self, pids: Callable[[], List[int]], interval: float = 0.5):
+        self.pids = pids
+        self.interval = interval
+        self.samples: Dict[int, List[int]] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._sample()
+        self._thread.start()
+
+    def stop(self) -> Dict[str, Any]:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return self.summary()
+
+    def _sample(self):
+        for pid in self.pids():
+            rss = process_rss(pid)
+            if rss is not None:
+                self.samples.setdefault(pid, []).append(rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def summary(self) -> Dict[str, Any]:
+        mb = 2 ** 20
+        processes = {
+            str(pid): {
+                "start_mb": round(values[0] / mb, 1),
+                "peak_mb": round(max(values) / mb, 1),
+                "end_mb": round(values[-1] / mb, 1),
+                "growth_mb": round((values[-1] - values[0]) / mb, 1)
+            }
+            for pid, values in self.samples.items() if values
+        }
+        return {
+            "processes": processes,
+            "total_peak_mb": round(sum(p["peak_mb"] for p in processes.values()), 1),
+            "total_growth_mb": round(sum(p["growth_mb"] for p in processes.values()), 1),
+            "max_growth_mb": max((p["growth_mb"] for p in processes.values()), default=0)
+        }
+
+
+def summarize(samples: List[Tuple[str, float, int, bool]], elapsed: float) -> Dict[str, Any]:
+    """Latency percentiles, throughput and error rate, overall and per operation"""
+    def stats(rows):
+        latencies = [latency for _, latency, _, _ in rows]
+        errors = sum(1 for _, _, _, ok in rows if not ok)
+        if not latencies:
+            return {"requests": 0}
+        return {
+            "requests": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4),
+            "throughput_rps": round(len(rows) / elapsed, 2) if elapsed else None,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 0.50), 1),
+                "p95": round(percentile(latencies, 0.95), 1),
+                "p99": round(percentile(latencies, 0.99), 1),
+                "mean": round(sum(latencies) / len(latencies), 1),
+                "max": round(max(latencies), 1)
+            }
+        }
+
+    by_operation: Dict[str, list] = {}
+    status_codes: Dict[str, int] = {}
+    for row in samples:
+        by_operation.setdefault(row[0], []).append(row)
+        status_codes[str(row[2])] = status_codes.get(str(row[2]), 0) + 1
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        **stats(samples),
+        "status_codes": status_codes,
+        "operations": {operation: stats(rows) for operation, rows in sorted(by_operation.items())}
+    }
+
+
+def run_load(base_url: str, settings: LoadSettings, pids: Optional[Callable[[], List[int]]] = None) -> Dict[str, Any]:
+    """Drive ``settings.users`` concurrent users against ``base_url`` and summarize the run"""
+    workload = Workload(discover_tables(base_url, settings.timeout), settings.mix)
+    samples: List[Tuple[str, float, int, bool]] = []
+    lock = threading.Lock()
+    measuring = threading.Event()
+    stop = threading.Event()
+
+    def user(index: int):
+        rng = random.Random(settings.seed * 1000 + index)
+        session = requests.Session()
+        time.sleep(settings.ramp_up * index / max(settings.users, 1))
+        while not stop.is_set():
+            operation, method, path, body = workload.next_request(rng)
+            started = time.perf_counter()
+            try:
+                response = session.request(method, f"{base_url}{path}", json=body, timeout=settings.timeout)
+                status = response.status_code
+                ok = status < 400 and _body_ok(response)
+            except requests.RequestException:
+                status, ok = 0, False
+            latency = (time.perf_counter() - started) * 1000
+            if measuring.is_set():
+                with lock:
+                    samples.append((operation, latency, status, ok))
+            if settings.think_time > 0:
+                stop.wait(rng.expovariate(1 / settings.think_time))
+
+    memory = MemorySampler(pids) if pids else None
+    threads = [threading.Thread(target=user, args=(i,), daemon=True) for i in range(settings.users)]
+    for thread in threads:
+        thread.start()
+
+    # Only the steady state after ramp-up is measured
+    time.sleep(settings.ramp_up)
+    if memory:
+        memory.start()
+    measuring.set()
+    started = time.time()
+    time.sleep(settings.duration)
+    measuring.clear()
+    elapsed = time.time() - started
+    stop.set()
+    for thread in threads:
+        thread.join(settings.timeout)
+
+    report = summarize(samples, elapsed)
+    report["settings"] = asdict(settings)
+    report["memory"] = memory.stop() if memory else None
+    return report
+
+
+def _body_ok(response: requests.Response) -> bool:
+    """The query endpoint reports SQL failures inside a 200 response"""
+    if "query_result" not in response.text[:64]:
+        return True
+    try:
+        return response.json()["query_result"].get("success", True) is not False
+    except (ValueError, KeyError, AttributeError):
+        return False
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_healthy(base_url: str, timeout: float = 60, process: Optional[subprocess.Popen] = None):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/health", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"Server at {base_url} did not become healthy within {timeout}s")
+
+
+def create_load_test_app():
+    """App factory for gunicorn workers, over the lakehouse already built at $BENCH_LAKEHOUSE_ROOT"""
+    from app import create_app
+    from app.core.explorer import LakehouseExplorer
+
+    root = os.environ[ROOT_ENV]
+    catalog = build_lakehouse(root, rebuild=False)
+    return create_app(explorer=LakehouseExplorer(benchmark_config(root), catalog=catalog))
+
+
+class InProcessServer:
+    """Serve the app from a thread of this process (Werkzeug, one thread per request)"""
+
+    def __init__(self, root: str):
+        import logging
+        from werkzeug.serving import make_server
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        os.environ[ROOT_ENV] = root
+        self.port = _free_port()
+        self.server = make_server("127.0.0.1", self.port, create_load_test_app(), threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def pids(self) -> List[int]:
+        return [os.getpid()]
+
+    def __enter__(self) -> 'InProcessServer':
+        self.thread.start()
+        _wait_until_healthy(self.base_url)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+
+
+class GunicornServer:
+    """Run the app under gunicorn with a given number of workers and threads per worker"""
+
+    def __init__(self, root: str, workers: int, threads: int, timeout: int = 120):
+        if shutil.which("gunicorn") is None:
+            raise RuntimeError("gunicorn is required for worker sweeps: pip install gunicorn")
+        self.root = root
+        self.workers = workers
+        self.threads = threads
+        self.timeout = timeout
+        self.port = _free_port()
+        self.process = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def pids(self) -> List[int]:
+        return child_pids(self.process.pid) if self.process else []
+
+    def __enter__(self) -> 'GunicornServer':
+        env = dict(os.environ, **{ROOT_ENV: self.root})
+        self.process = subprocess.Popen(
+            ["gunicorn", "-w", str(self.workers), "--threads", str(self.threads), "--timeout", str(self.timeout),
+             "-b", f"127.0.0.1:{self.port}", "--log-level", "warning",
+             "benchmarks.load:create_load_test_app()"],
+            env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.DEVNULL
+        )
+        try:
+            _wait_until_healthy(self.base_url, process=self.process)
+        except Exception:
+            self.__exit__()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def parse_sweep(value: str) -> List[Tuple[int, int]]:
+    """"1x4,2x4,4x8" -> [(1, 4), (2, 4), (4, 8)] as (workers, threads)"""
+    configs = []
+    for item in value.split(","):
+        workers, _, threads = item.strip().lower().partition("x")
+        configs.append((int(workers), int(threads or 1)))
+    return configs
+
+
+def recommend(runs: List[Dict[str, Any]], slo_p95_ms: float, max_error_rate: float) -> Optional[Dict[str, Any]]:
+    """Cheapest configuration (fewest workers, then threads) within the SLO, preferring higher throughput"""
+    within = [
+        run for run in runs
+        if run.get("requests") and run["latency_ms"]["p95"] <= slo_p95_ms and run["error_rate"] <= max_error_rate
+    ]
+    if not within:
+        return None
+    best_throughput = max(run["throughput_rps"] for run in within)
+    # Anything within 10% of the best throughput counts as good enough; take the smallest
+    good = [run for run in within if run["throughput_rps"] >= 0.9 * best_throughput]
+    best = min(good, key=lambda run: (run["workers"], run["threads"]))
+    return {"workers": best["workers"], "threads": best["threads"], "throughput_rps": best["throughput_rps"],
+            "p95_ms": best["latency_ms"]["p95"]}
+
+
+def print_report(label: str, report: Dict[str, Any]):
+    if not report.get("requests"):
+        print(f"{label}: no requests completed")
+        return
+    latency = report["latency_ms"]
+    memory = report.get("memory") or {}
+    print(f"{label:<16} {report['throughput_rps']:>8.1f} req/s  p50 {latency['p50']:>8.1f}  p95 {latency['p95']:>8.1f}  "
+          f"p99 {latency['p99']:>8.1f} ms  errors {report['error_rate']:>6.1%}  "
+          f"mem peak {memory.get('total_peak_mb', 0):>7.1f} MB  growth {memory.get('max_growth_mb', 0):>6.1f} MB")
+    for operation, stats in report["operations"].items():
+        if stats.get("requests"):
+            print(f"    {operation:<12} {stats['requests']:>6} req  p50 {stats['latency_ms']['p50']:>8.1f}  "
+                  f"p95 {stats['latency_ms']['p95']:>8.1f}  p99 {stats['latency_ms']['p99']:>8.1f} ms  "
+                  f"errors {stats['error_rate']:>6.1%}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the Lakehouse Explorer API")
+    parser.add_argument("--url", help="Test a running deployment instead of a local server")
+    parser.add_argument("--sweep", help="Gunicorn configurations to compare, as WORKERSxTHREADS,... (e.g. 1x4,2x4,4x8)")
+    parser.add_argument("--root", help="Lakehouse directory (default: a temporary directory)")
+    parser.add_argument("--reuse", action="store_true", help="Reuse the tables already built under --root")
+    parser.add_argument("--rows", type=int, default=20000, help="Rows per synthetic table")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds per run")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Seconds over which users start")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean think time between requests (seconds)")
+    parser.add_argument("--mix", help="Operation weights, e.g. browse=25,search=10,preview=20,query=20")
+    parser.add_argument("--slo-p95-ms", type=float, default=2000, help="p95 latency target for the sweep recommendation")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--output", help="Write the report(s) to this JSON file")
+    args = parser.parse_args(argv)
+
+    settings = LoadSettings(users=args.users, duration=args.duration, ramp_up=args.ramp_up,
+                            think_time=args.think_time)
+    if args.mix:
+        settings.mix = {name: int(weight) for name, weight in (item.split("=") for item in args.mix.split(","))}
+
+    output: Dict[str, Any] = {"settings": asdict(settings)}
+    if args.url:
+        report = run_load(args.url.rstrip("/"), settings)
+        print_report(args.url, report)
+        output["runs"] = [report]
+    else:
+        import tempfile
+        root = os.path.abspath(args.root or os.path.join(tempfile.gettempdir(), "lakehouse-explorer-load"))
+        specs = [SyntheticTableSpec(**dict(spec.to_dict(), rows=args.rows)) for spec in DEFAULT_TABLES]
+        if not args.reuse:
+            print(f"Building synthetic lakehouse in {root} ...")
+        build_lakehouse(root, specs, rebuild=not args.reuse)
+        output["tables"] = [spec.to_dict() for spec in specs]
+
+        if args.sweep:
+            runs = []
+            for workers, threads in parse_sweep(args.sweep):
+                with GunicornServer(root, workers, threads) as server:
+                    report = run_load(server.base_url, settings, server.pids)
+                report.update(workers=workers, threads=threads)
+                print_report(f"{workers} x {threads}", report)
+                runs.append(report)
+            output["runs"] = runs
+            output["recommendation"] = recommend(runs, args.slo_p95_ms, args.max_error_rate)
+            if output["recommendation"]:
+                rec = output["recommendation"]
+                print(f"Recommended: {rec['workers']} worker(s) x {rec['threads']} thread(s) "
+                      f"({rec['throughput_rps']} req/s, p95 {rec['p95_ms']} ms)")
+            else:
+                print(f"No configuration met p95 <= {args.slo_p95_ms} ms with error rate <= {args.max_error_rate:.0%}")
+        else:
+            with InProcessServer(root) as server:
+                report = run_load(server.base_url, settings, server.pids)
+            print_report("in-process", report)
+            output["runs"] = [report]
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Latency, peak RSS and bytes-read measurement for one benchmarked operation
+"""
+
+from typing import Callable, Dict, Any, Optional, List
+import gc
+import resource
+import statistics
+import sys
+import threading
+import time
+
+PAGE_SIZE = resource.getpagesize()
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (Linux /proc; None elsewhere)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def max_rss() -> int:
+    """Peak RSS of the process so far, in bytes"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def bytes_read() -> Optional[int]:
+    """Bytes this process has read through read() syscalls, page cache hits included (Linux /proc)"""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class RssSampler:
+    """Sample RSS on a background thread to find the peak reached during an operation"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> 'RssSampler':
+        if self.peak is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self._sample()
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> Dict[str, Any]:
+    """Run ``fn`` ``warmup + repeat`` times and summarize the measured runs
+
+    Bytes read and peak RSS are taken over the measured runs; RSS is sampled
+    on Linux and falls back to the process high-water mark elsewhere.
+    """
+    for _ in range(warmup):
+        fn()
+
+    gc.collect()
+    rss_before = current_rss()
+    read_before = bytes_read()
+    latencies = []
+    result = None
+    with RssSampler() as sampler:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = fn()
+            latencies.append((time.perf_counter() - started) * 1000)
+    read_after = bytes_read()
+
+    peak = sampler.peak if sampler.peak is not None else max_rss()
+    return {
+        "latency_ms": {
+            "min": round(min(latencies), 3),
+            "median": round(statistics.median(latencies), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "mean": round(statistics.mean(latencies), 3),
+            "max": round(max(latencies), 3)
+        },
+        "repeat": repeat,
+        "peak_rss_mb": round(peak / 2 ** 20, 2),
+        "rss_growth_mb": round((peak - rss_before) / 2 ** 20, 2) if rss_before is not None else None,
+        "bytes_read_per_run": (read_after - read_before) // repeat if read_before is not None else None,
+        "result": result
+    }
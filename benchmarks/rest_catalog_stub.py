@@ -0,0 +1,310 @@
+"""
+Stub Iceberg REST catalog over the local synthetic lakehouse, injecting latency and failures
+
+Serves the read endpoints the explorer uses (config, namespaces, tables,
+load table) from the SQL catalog built by benchmarks.lakehouse, so the
+catalog transport's timeouts, retries, circuit breaker and concurrency
+limit can be exercised without a Nessie server.
+
+    python -m benchmarks.rest_catalog_stub --root /tmp/bench --port 8181 --latency 0.05 --failure-rate 0.2
+    python -m benchmarks.rest_catalog_stub --exercise 500 --threads 32 --failure-rate 0.3 --reset-rate 0.05
+    python -m benchmarks.rest_catalog_stub --exercise 200 --outage 5
+    python -m benchmarks.rest_catalog_stub --exercise 200 --stall-rate 0.1 --stall-seconds 5 --read-timeout 1
+"""
+
+from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+import argparse
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from pyiceberg.catalog import Catalog
+from pyiceberg.exceptions import NoSuchNamespaceError, NoSuchTableError
+
+from benchmarks.lakehouse import SyntheticTableSpec, benchmark_config, build_lakehouse
+from benchmarks.measure import percentile
+
+NAMESPACE_SEPARATOR = "\x1f"
+
+
+@dataclass
+class FaultSettings:
+    """What goes wrong with each request (changeable while the stub runs)"""
+    latency_seconds: float = 0.0
+    latency_jitter_seconds: float = 0.0
+    failure_rate: float = 0.0  # answer with failure_status
+    failure_status: int = 503
+    retry_after: Optional[float] = None  # Retry-After header sent with injected failures
+    reset_rate: float = 0.0  # close the connection without answering
+    stall_rate: float = 0.0  # wait stall_seconds before answering (beyond a client's read timeout)
+    stall_seconds: float = 60.0
+    outage: bool = False  # every request fails
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class StubRestCatalog:
+    """Threaded HTTP server answering Iceberg REST calls from a PyIceberg catalog"""
+
+    def __init__(self, catalog: Catalog, faults: Optional[FaultSettings] = None,
+                 host: str = "127.0.0.1", port: int = 0, seed: Optional[int] = None):
+        self.catalog = catalog
+        self.faults = faults or FaultSettings()
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._stats = {"requests": 0, "failures": 0, "resets": 0, "stalls": 0, "max_concurrent": 0}
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def uri(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats)
+
+    def __enter__(self) -> 'StubRestCatalog':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _fault(self) -> Optional[str]:
+        """Draw this request's fault, and count it"""
+        faults = self.faults
+        with self._lock:
+            self._stats["requests"] += 1
+            draw = self.random.random()
+            if faults.outage or draw < faults.failure_rate:
+                fault = "failure"
+            elif draw < faults.failure_rate + faults.reset_rate:
+                fault = "reset"
+            elif draw < faults.failure_rate + faults.reset_rate + faults.stall_rate:
+                fault = "stall"
+            else:
+                return None
+            self._stats[{"failure": "failures", "reset": "resets", "stall": "stalls"}[fault]] += 1
+            return fault
+
+    def _delay(self) -> float:
+        with self._lock:
+            return self.faults.latency_seconds + self.random.uniform(0, self.faults.latency_jitter_seconds)
+
+    def _route(self, method: str, path: str):
+        """(status, body) for a request path below /v1"""
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+        if parts[:1] != ["v1"]:
+            return 404, _error(f"Unknown path {path}", "NotFoundException", 404)
+        parts = parts[1:]
+
+        try:
+            if parts == ["config"]:
+                return 200, {"defaults": {}, "overrides": {}}
+            if parts == ["namespaces"]:
+                return 200, {"namespaces": [list(ns) for ns in self.catalog.list_namespaces()]}
+            if len(parts) >= 2 and parts[0] == "namespaces":
+                namespace = tuple(parts[1].split(NAMESPACE_SEPARATOR))
+                if len(parts) == 2:
+                    return 200, {"namespace": list(namespace),
+                                 "properties": self.catalog.load_namespace_properties(namespace)}
+                if parts[2:] == ["tables"]:
+                    identifiers = self.catalog.list_tables(namespace)
+                    return 200, {"identifiers": [{"namespace": list(identifier[:-1]), "name": identifier[-1]}
+                                                 for identifier in identifiers]}
+                if len(parts) == 4 and parts[2] == "tables":
+                    table = self.catalog.load_table((*namespace, parts[3]))
+                    if method == "HEAD":
+                        return 204, None
+                    return 200, {"metadata-location": table.metadata_location,
+                                 "metadata": json.loads(table.metadata.model_dump_json()),
+                                 "config": {}}
+        except NoSuchNamespaceError as e:
+            return 404, _error(str(e), "NoSuchNamespaceException", 404)
+        except NoSuchTableError as e:
+            return 404, _error(str(e), "NoSuchTableException", 404)
+        return 404, _error(f"Unsupported endpoint {method} {path}", "NotFoundException", 404)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like a real catalog server
+
+            def log_message(self, *args):
+                pass
+
+            def _serve(self, method: str):
+                with stub._lock:
+                    stub._active += 1
+                    stub._stats["max_concurrent"] = max(stub._stats["max_concurrent"], stub._active)
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                    if length:
+                        self.rfile.read(length)
+                    time.sleep(stub._delay())
+                    fault = stub._fault()
+                    if fault == "reset":
+                        self.close_connection = True
+                        self.connection.close()
+                        return
+                    if fault == "stall":
+                        time.sleep(stub.faults.stall_seconds)
+                    headers = {}
+                    if fault == "failure":
+                        status = stub.faults.failure_status
+                        body = _error("Injected failure", "ServiceUnavailableException", status)
+                        if stub.faults.retry_after is not None:
+                            headers["Retry-After"] = str(stub.faults.retry_after)
+                    else:
+                        status, body = stub._route(method, urlparse(self.path).path)
+                    self._respond(status, body, method, headers)
+                finally:
+                    with stub._lock:
+                        stub._active -= 1
+
+            def _respond(self, status: int, body: Optional[Dict[str, Any]], method: str,
+                         headers: Optional[Dict[str, str]] = None):
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                if method != "HEAD":
+                    self.wfile.write(payload)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_HEAD(self):
+                self._serve("HEAD")
+
+            def do_POST(self):
+                self._serve("POST")
+
+        return Handler
+
+
+def _error(message: str, kind: str, code: int) -> Dict[str, Any]:
+    return {"error": {"message": message, "type": kind, "code": code}}
+
+
+def stub_config(root: str, uri: str):
+    """Explorer configuration whose REST catalog is the stub (tables are read from the local warehouse)"""
+    config = benchmark_config(root)
+    config.nessie_uri = uri
+    return config
+
+
+def exercise(explorer, tables: List[str], calls: int, threads: int) -> Dict[str, Any]:
+    """Make ``calls`` catalog-bound explorer calls from ``threads`` threads and summarize the outcomes"""
+    operations = [lambda: explorer.get_all_tables()]
+    for name in tables:
+        operations.append(lambda name=name: explorer.get_table_identity(("bench",), name))
+
+    def call(index: int):
+        started = time.perf_counter()
+        try:
+            operations[index % len(operations)]()
+            outcome = "ok"
+        except Exception as e:
+            outcome = type(e).__name__
+        return outcome, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(call, range(calls)))
+    outcomes: Dict[str, int] = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    latencies = [elapsed for _, elapsed in results]
+    return {
+        "calls": calls,
+        "threads": threads,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "outcomes": outcomes,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stub Iceberg REST catalog with injected latency and failures")
+    parser.add_argument("--root", help="Lakehouse directory (default: a temporary directory)")
+    parser.add_argument("--reuse", action="store_true", help="Reuse the tables already built under --root")
+    parser.add_argument("--rows", type=int, default=2000, help="Rows per synthetic table")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8181)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra random seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with --failure-status")
+    parser.add_argument("--failure-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with injected failures")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="Share of connections closed without an answer")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Share of requests held for --stall-seconds")
+    parser.add_argument("--stall-seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--exercise", type=int, metavar="CALLS",
+                        help="Instead of serving, run CALLS explorer calls against the stub and report")
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent callers for --exercise")
+    parser.add_argument("--outage", type=float, metavar="SECONDS",
+                        help="With --exercise: fail every request for SECONDS from the start")
+    parser.add_argument("--read-timeout", type=float, help="With --exercise: the explorer's catalog read timeout")
+    parser.add_argument("--max-concurrency", type=int, help="With --exercise: the explorer's concurrent catalog calls")
+    args = parser.parse_args(argv)
+
+    root = args.root or tempfile.mkdtemp(prefix="lakehouse-stub-")
+    specs = [SyntheticTableSpec("narrow", rows=args.rows, columns=4, files=2),
+             SyntheticTableSpec("partitioned", rows=args.rows, columns=4, partitions=4, files=2)]
+    catalog = build_lakehouse(root, specs, rebuild=not args.reuse)
+    faults = FaultSettings(args.latency, args.jitter, args.failure_rate, args.failure_status, args.retry_after,
+                           args.reset_rate, args.stall_rate, args.stall_seconds)
+
+    if not args.exercise:
+        with StubRestCatalog(catalog, faults, args.host, args.port, args.seed) as stub:
+            print(f"Stub REST catalog at {stub.uri} over {root} ({json.dumps(faults.to_dict())}); Ctrl+C to stop")
+            try:
+                stub.thread.join()
+            except KeyboardInterrupt:
+                pass
+        return 0
+
+    from app.core.explorer import LakehouseExplorer
+
+    with StubRestCatalog(catalog, FaultSettings(), args.host, 0, args.seed) as stub:
+        config = stub_config(root, stub.uri)
+        if args.read_timeout is not None:
+            config.catalog_read_timeout = args.read_timeout
+        if args.max_concurrency is not None:
+            config.catalog_max_concurrency = args.max_concurrency
+        explorer = LakehouseExplorer(config)
+        if args.outage:
+            stub.faults = FaultSettings(**{**faults.to_dict(), "outage": True})
+            threading.Timer(args.outage, lambda: setattr(stub, "faults", faults)).start()
+        else:
+            stub.faults = faults
+        report = exercise(explorer, [spec.name for spec in specs], args.exercise, args.threads)
+        report["stub"] = stub.stats()
+        report["transport"] = explorer.catalogs.stats()["transport"]
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Run the benchmark suite and save the results as JSON
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --tables narrow,partitioned --filter "explorer.query*" --repeat 10
+    python -m benchmarks.run --rows 1000000 --output big.json --baseline results.json
+"""
+
+from typing import List, Dict, Any, Optional
+from datetime import datetime
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.compare import compare_results, print_comparison
+from benchmarks.lakehouse import DEFAULT_TABLES, SyntheticTableSpec, benchmark_config, build_lakehouse
+from benchmarks.suite import build_cases, run_cases
+
+
+def _package_version(name: str) -> Optional[str]:
+    try:
+        from importlib.metadata import version
+        return version(name)
+    except Exception:
+        return None
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """What the results depend on besides the code: versions and machine"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": {name: _package_version(name) for name in ("pyiceberg", "duckdb", "pyarrow", "pandas", "flask")}
+    }
+
+
+def table_specs(args) -> List[SyntheticTableSpec]:
+    specs = [SyntheticTableSpec(**spec.to_dict()) for spec in DEFAULT_TABLES]
+    if args.tables:
+        wanted = args.tables.split(",")
+        unknown = set(wanted) - {spec.name for spec in specs}
+        if unknown:
+            raise SystemExit(f"Unknown table(s): {', '.join(sorted(unknown))}")
+        specs = [spec for spec in specs if spec.name in wanted]
+    for spec in specs:
+        if args.rows:
+            spec.rows = args.rows
+        if args.columns:
+            spec.columns = args.columns
+        if args.files:
+            spec.files = args.files
+    return specs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Lakehouse Explorer on a local synthetic lakehouse")
+    parser.add_argument("--root", help="Lakehouse directory (default: a temporary directory)")
+    parser.add_argument("--reuse", action="store_true", help="Reuse the tables already built under --root")
+    parser.add_argument("--tables", help="Comma-separated subset of the synthetic tables")
+    parser.add_argument("--rows", type=int, help="Override the row count of every table")
+    parser.add_argument("--columns", type=int, help="Override the column count of every table")
+    parser.add_argument("--files", type=int, help="Override the number of appends of every table")
+    parser.add_argument("--repeat", type=int, default=5, help="Measured runs per case")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs per case")
+    parser.add_argument("--filter", action="append", help="Only run cases matching this pattern (repeatable)")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a previous results file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Relative slowdown counted as a regression when comparing (default 0.25)")
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    from app.core.explorer import LakehouseExplorer
+
+    root = args.root or os.path.join(tempfile.gettempdir(), "lakehouse-explorer-bench")
+    specs = table_specs(args)
+    print(f"Building synthetic lakehouse in {root} ...")
+    catalog = build_lakehouse(root, specs, rebuild=not args.reuse)
+
+    explorer = LakehouseExplorer(benchmark_config(root), catalog=catalog)
+    app = create_app(explorer=explorer)
+    if app is None:
+        return 1
+
+    cases = build_cases(explorer, app.test_client(), [spec.name for spec in specs])
+    results = run_cases(cases, repeat=args.repeat, warmup=args.warmup, patterns=args.filter)
+
+    report = {
+        "environment": environment(),
+        "settings": {"repeat": args.repeat, "warmup": args.warmup},
+        "tables": [spec.to_dict() for spec in specs],
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"Results written to {args.output}")
+
+    failed = [r["name"] for r in results if not r["success"]]
+    if failed:
+        print(f"{len(failed)} case(s) failed: {', '.join(failed)}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        comparison = compare_results(baseline, report, args.threshold)
+        print_comparison(comparison)
+        if comparison["regressions"]:
+            return 2
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
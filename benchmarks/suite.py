@@ -0,0 +1,165 @@
+"""
+Benchmark cases: each LakehouseExplorer operation (per engine) and each API endpoint
+"""
+
+from typing import Callable, List, Dict, Any, Optional
+from dataclasses import dataclass
+import fnmatch
+import traceback
+
+from app.core.catalog_pool import TableVersion
+from app.core.profiling import TableProfiler
+from benchmarks.lakehouse import NAMESPACE
+from benchmarks.measure import measure
+
+QUERY = "SELECT part, count(*) AS n, sum(id) AS total FROM {table} GROUP BY part ORDER BY part"
+
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    group: str  # "explorer" or "api"
+    operation: str
+    engine: Optional[str]
+    table: Optional[str]
+    fn: Callable[[], Any]
+
+
+def _succeeded(result: Any) -> bool:
+    """Explorer methods report failures as None or an error dict rather than raising"""
+    if result is None:
+        return False
+    status_code = getattr(result, "status_code", None)
+    if status_code is not None:
+        return status_code < 400
+    if isinstance(result, dict):
+        return "error" not in result and result.get("success", True) is not False
+    return True
+
+
+def _first_rows(messages):
+    """Consume a query stream up to its first batch of rows (time to first row)"""
+    try:
+        for message in messages:
+            if message["event"] in ("rows", "done", "error"):
+                return message
+    finally:
+        messages.close()
+
+
+def explorer_cases(explorer, table_name: str) -> List[BenchmarkCase]:
+    namespace = (NAMESPACE,)
+    table, snapshot = explorer._load_table(namespace, table_name)
+    snapshot_id = snapshot.snapshot_id if snapshot else None
+    query = QUERY.format(table=table_name)
+
+    def case(operation, engine, fn):
+        name = f"explorer.{operation}[{engine}].{table_name}" if engine else f"explorer.{operation}.{table_name}"
+        return BenchmarkCase(name, "explorer", operation, engine, table_name, fn)
+
+    cases = [
+        case("schema", None, lambda: explorer.get_table_schema(namespace, table_name)),
+        case("metadata", None, lambda: explorer.get_table_metadata(namespace, table_name)),
+        case("preview", "pyiceberg", lambda: explorer._preview_with_pyiceberg(table, 100, snapshot_id)),
+        case("query", "exact", lambda: explorer.execute_sql_query(namespace, table_name, query)),
+        case("query", "streaming-first-rows", lambda: _first_rows(explorer.stream_sql_query(
+            namespace, table_name, f"SELECT * FROM {table_name} WHERE id % 2 = 0", 100000))),
+        case("query", "approximate", lambda: explorer.execute_sql_query(namespace, table_name, query,
+                                                                        approximate=True, sample_fraction=0.1)),
+        # A fresh profiler reads every data file; the explorer's own one reuses file sketches
+        case("statistics", "sketch-cold", lambda: TableProfiler().profile(table, snapshot)),
+        case("statistics", "sketch-warm", lambda: explorer.profiler.profile(table, snapshot)),
+        case("statistics", "pyiceberg-sample", lambda: explorer._get_basic_statistics(namespace, table_name)),
+    ]
+    if explorer.duckdb_conn:
+        cases.insert(2, case("preview", "duckdb", lambda: explorer._preview_with_duckdb(table, 100, snapshot_id)))
+
+    snapshots = table.metadata.snapshots
+    if len(snapshots) > 1:
+        first = TableVersion.parse(snapshot_id=snapshots[0].snapshot_id)
+        cases.append(case("diff", None, lambda: explorer.diff_snapshots(namespace, table_name, first,
+                                                                        TableVersion(), limit=1000)))
+    return cases
+
+
+def api_cases(explorer, client, table_name: str) -> List[BenchmarkCase]:
+    base = f"/api/table/{NAMESPACE}/{table_name}"
+    query = QUERY.format(table=table_name)
+    table, snapshot = explorer._load_table((NAMESPACE,), table_name)
+    snapshots = table.metadata.snapshots
+    rows = int(snapshot.summary["total-records"]) if snapshot and snapshot.summary else 0
+    preview_etag = client.get(f"{base}/preview?limit=100").headers.get("ETag", "")
+
+    def case(operation, fn):
+        return BenchmarkCase(f"api.{operation}.{table_name}", "api", operation, None, table_name, fn)
+
+    cases = [
+        case("schema", lambda: client.get(f"{base}/schema")),
+        case("metadata", lambda: client.get(f"{base}/metadata")),
+        case("preview", lambda: client.get(f"{base}/preview?limit=100")),
+        case("rows_page", lambda: client.get(f"{base}/rows?offset={rows // 2}&limit=200")),
+        case("query", lambda: client.post(f"{base}/query", json={"query": query})),
+        case("statistics", lambda: client.get(f"{base}/statistics")),
+        case("details", lambda: client.get(f"{base}/details?parts=schema,metadata,preview,partitions")),
+        # A repeat view: the client already holds the preview for this snapshot
+        case("preview_revalidate", lambda: client.get(f"{base}/preview?limit=100",
+                                                      headers={"If-None-Match": preview_etag})),
+    ]
+    if len(snapshots) > 1:
+        first = snapshots[0].snapshot_id
+        cases.append(case("diff", lambda: client.get(f"{base}/diff?from={first}&limit=1000")))
+    return cases
+
+
+def catalog_cases(explorer, client, tables: List[str]) -> List[BenchmarkCase]:
+    return [
+        BenchmarkCase("explorer.list_namespaces", "explorer", "list_namespaces", None, None,
+                      explorer.list_namespaces),
+        BenchmarkCase("explorer.get_all_tables", "explorer", "get_all_tables", None, None, explorer.get_all_tables),
+        BenchmarkCase("api.namespaces", "api", "namespaces", None, None, lambda: client.get("/api/namespaces")),
+        BenchmarkCase("api.tables", "api", "tables", None, None, lambda: client.get("/api/tables")),
+        BenchmarkCase("api.tables_details", "api", "tables_details", None, None,
+                      lambda: client.post("/api/tables/details", json={
+                          "tables": [f"{NAMESPACE}.{t}" for t in tables], "parts": ["schema", "metadata", "partitions"]})),
+    ]
+
+
+def build_cases(explorer, client, tables: List[str]) -> List[BenchmarkCase]:
+    cases = catalog_cases(explorer, client, tables)
+    for table_name in tables:
+        cases.extend(explorer_cases(explorer, table_name))
+        cases.extend(api_cases(explorer, client, table_name))
+    return cases
+
+
+def run_cases(cases: List[BenchmarkCase], repeat: int = 5, warmup: int = 1,
+              patterns: Optional[List[str]] = None, verbose: bool = True) -> List[Dict[str, Any]]:
+    """Measure every case whose name matches one of ``patterns`` (shell-style, all by default)"""
+    results = []
+    for case in cases:
+        if patterns and not any(fnmatch.fnmatch(case.name, p) for p in patterns):
+            continue
+        entry = {
+            "name": case.name,
+            "group": case.group,
+            "operation": case.operation,
+            "engine": case.engine,
+            "table": case.table
+        }
+        try:
+            measured = measure(case.fn, repeat=repeat, warmup=warmup)
+            entry["success"] = _succeeded(measured.pop("result"))
+            entry.update(measured)
+        except Exception as e:
+            entry["success"] = False
+            entry["error"] = str(e)
+            traceback.print_exc()
+        results.append(entry)
+
+        if verbose:
+            if "latency_ms" in entry:
+                print(f"{case.name:<60} {entry['latency_ms']['median']:>10.1f} ms  "
+                      f"{entry['peak_rss_mb']:>8.1f} MB  {'ok' if entry['success'] else 'FAILED'}")
+            else:
+                print(f"{case.name:<60} error: {entry['error']}")
+    return results
@@ -0,0 +1,48 @@
+"""
+Shared fixtures: a throwaway local lakehouse (SQL catalog on SQLite plus a filesystem warehouse)
+"""
+
+import pytest
+
+from benchmarks.lakehouse import NAMESPACE, SyntheticTableSpec, benchmark_config, build_lakehouse, create_table
+
+
+class Lakehouse:
+    """A local catalog under a temporary directory, filled on demand"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.catalog = build_lakehouse(root, specs=[])
+
+    def table(self, name: str, **spec):
+        return create_table(self.catalog, SyntheticTableSpec(name, **spec))
+
+    def load(self, name: str):
+        return self.catalog.load_table((NAMESPACE, name))
+
+    def count_loads(self) -> list:
+        """Record the identifier of every table loaded from the catalog from now on"""
+        loads = []
+        load_table = self.catalog.load_table
+
+        def counting_load_table(identifier):
+            loads.append(identifier)
+            return load_table(identifier)
+
+        self.catalog.load_table = counting_load_table
+        return loads
+
+    def config(self, **overrides):
+        config = benchmark_config(self.root)
+        for key, value in overrides.items():
+            setattr(config, key, value)
+        return config
+
+    def explorer(self, **overrides):
+        from app.core.explorer import LakehouseExplorer
+        return LakehouseExplorer(self.config(**overrides), catalog=self.catalog)
+
+
+@pytest.fixture
+def lakehouse(tmp_path):
+    return Lakehouse(str(tmp_path / "lakehouse"))
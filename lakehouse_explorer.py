@@ -0,0 +1,154 @@
+"""
+Headless Lakehouse Explorer: inventory a whole catalog from the command line
+
+    python lakehouse_explorer.py inventory --config config/lakehouse.json --output ./inventory
+    python lakehouse_explorer.py inventory --namespace sales --include "sales.fact_*" --workers 8 --timeout 300
+    python lakehouse_explorer.py inventory --catalog-name local --catalog-property type=sql \\
+        --catalog-property uri=sqlite:///catalog.db --catalog-property warehouse=file:///data/warehouse
+    python lakehouse_explorer.py tables --exclude "*.tmp_*"
+
+Re-running with the same --run-id (by default, today's date) resumes an
+interrupted run: tables already inventoried are skipped and failed ones
+are retried.
+"""
+
+from typing import List, Optional
+from datetime import date
+import argparse
+import sys
+import time
+
+from app.core.catalog_pool import TableVersion
+from app.core.config import LakehouseConfig, get_config
+
+
+def _catalog_properties(values: Optional[List[str]]):
+    properties = {}
+    for value in values or []:
+        key, sep, item = value.partition("=")
+        if not sep or not key:
+            raise SystemExit(f"Invalid --catalog-property {value!r}: expected KEY=VALUE")
+        properties[key] = item
+    return properties
+
+
+def explorer_spec(args):
+    """Explorer settings from --config / environment, or just a PyIceberg catalog (name and properties)"""
+    from app.core.inventory import ExplorerSpec
+
+    properties = _catalog_properties(args.catalog_property)
+    if (args.catalog_name or properties) and not args.config:
+        config = LakehouseConfig(
+            nessie_uri=properties.get("uri", ""),
+            s3_endpoint=properties.get("s3.endpoint", ""),
+            s3_access_key=properties.get("s3.access-key-id", ""),
+            s3_secret_key=properties.get("s3.secret-access-key", ""),
+            warehouse_path=properties.get("warehouse", "")
+        )
+    else:
+        config = LakehouseConfig.from_file(args.config) if args.config else get_config()
+    if args.ref:
+        config.nessie_ref = args.ref
+    return ExplorerSpec(config, args.catalog_name, properties)
+
+
+def selected_tables(spec, args):
+    from app.core.inventory import select_tables
+
+    explorer = spec.build()
+    return select_tables(explorer.get_all_tables(), args.namespace, args.include, args.exclude)
+
+
+def cmd_tables(args) -> int:
+    for namespace, table_name in selected_tables(explorer_spec(args), args):
+        print(f"{namespace}.{table_name}")
+    return 0
+
+
+def cmd_inventory(args) -> int:
+    from app.core.inventory import InventoryWriter, run_inventory
+
+    spec = explorer_spec(args)
+    tables = selected_tables(spec, args)
+    run_id = args.run_id or date.today().isoformat()
+    writer = InventoryWriter(args.output, run_id)
+    if args.restart:
+        writer.reset()
+
+    done = {name for name, status in writer.completed().items() if status == "ok"}
+    todo = [(ns, t) for ns, t in tables if f"{ns}.{t}" not in done]
+    print(f"Run {run_id}: {len(tables)} table(s) selected, {len(tables) - len(todo)} already done, "
+          f"{len(todo)} to inventory with {args.workers} worker(s)")
+
+    finished = 0
+
+    def report(namespace, table_name, row):
+        nonlocal finished
+        finished += 1
+        detail = (f"{row.get('health')} ({row.get('issue_count')} issue(s))" if row["status"] == "ok"
+                  else row.get("error"))
+        print(f"[{finished}/{len(todo)}] {namespace}.{table_name}: {row['status']} "
+              f"in {row['elapsed_seconds']:.1f}s - {detail}", flush=True)
+
+    started = time.time()
+    counts = {}
+    if todo:
+        counts = run_inventory(spec, todo, writer, workers=args.workers, timeout=args.timeout,
+                               profile=not args.no_profile, version=TableVersion(ref=args.ref),
+                               on_result=report, startup_timeout=args.startup_timeout)
+    if not args.no_compact:
+        writer.compact()
+
+    failed = counts.get("error", 0) + counts.get("timeout", 0)
+    print(f"Inventoried {counts.get('ok', 0)} table(s) in {time.time() - started:.1f}s"
+          f"{f', {failed} failed (re-run to retry)' if failed else ''}; results in {args.output}")
+    return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Lakehouse Explorer command-line tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", help="Configuration file (default: config.json, environment or config/lakehouse.json)")
+    common.add_argument("--catalog-name",
+                        help="PyIceberg catalog name (e.g. from .pyiceberg.yaml), instead of the configured Nessie catalog")
+    common.add_argument("--catalog-property", action="append", metavar="KEY=VALUE",
+                        help="PyIceberg catalog property (repeatable)")
+    common.add_argument("--ref", help="Branch or tag to read (default: the configured ref)")
+    common.add_argument("--namespace", action="append", help="Only tables in this namespace (repeatable)")
+    common.add_argument("--include", action="append", metavar="PATTERN",
+                        help="Only tables whose namespace.table matches this pattern (repeatable)")
+    common.add_argument("--exclude", action="append", metavar="PATTERN",
+                        help="Skip tables whose namespace.table matches this pattern (repeatable)")
+
+    tables = subparsers.add_parser("tables", parents=[common], help="List the tables a run would cover")
+    tables.set_defaults(handler=cmd_tables)
+
+    inventory = subparsers.add_parser("inventory", parents=[common],
+                                      help="Summarize, health-check and profile tables into Parquet")
+    inventory.add_argument("--output", default="inventory", help="Output directory (default: ./inventory)")
+    inventory.add_argument("--workers", type=int, default=4, help="Worker processes (default 4)")
+    inventory.add_argument("--timeout", type=float, default=600, help="Seconds allowed per table (default 600)")
+    inventory.add_argument("--startup-timeout", type=float, default=120,
+                           help="Seconds allowed for a worker to connect to the catalog (default 120)")
+    inventory.add_argument("--run-id", help="Run identifier (default: today's date); reusing one resumes it")
+    inventory.add_argument("--restart", action="store_true", help="Inventory every table again, not just the rest")
+    inventory.add_argument("--no-profile", action="store_true",
+                           help="Skip column profiles (metadata and health checks only)")
+    inventory.add_argument("--no-compact", action="store_true",
+                           help="Keep one Parquet file per table instead of one per namespace")
+    inventory.set_defaults(handler=cmd_inventory)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "workers", 1) < 1:
+        parser.error("--workers must be at least 1")
+    try:
+        return args.handler(args)
+    except (ConnectionError, FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
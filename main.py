@@ -0,0 +1,12 @@
+"""
+Command-line entry point for Lakehouse Explorer (see lakehouse_explorer.py)
+
+    python main.py inventory --output ./inventory
+"""
+
+import sys
+
+from lakehouse_explorer import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Tests for approximate queries on a stratified row-group sample
+"""
+
+import duckdb
+import pytest
+
+from app.core.approximate import ApproximateQuery, analyze_select_list
+
+GROUP_BY_PART = "SELECT part, COUNT(*) AS n FROM sample GROUP BY part ORDER BY part"
+
+
+def run(table, sql, **kwargs):
+    query = ApproximateQuery(table, table.current_snapshot(), seed=7, **kwargs)
+    return query.run(duckdb.connect(), sql, "sample", 1000)
+
+
+def test_every_partition_is_sampled_when_the_budget_allows(lakehouse):
+    # 4 partitions x 4 appends: 16 single-row-group files of 2500 rows
+    table = lakehouse.table("parts", rows=40000, columns=2, partitions=4, files=4)
+    result, info = run(table, GROUP_BY_PART, sample_fraction=0.3)
+
+    assert info["partitions"] == info["partitions_sampled"] == 4
+    assert "unsampled_partitions" not in info
+    assert result["part"].tolist() == [0, 1, 2, 3]
+    for estimate, interval in zip(result["n"], info["confidence_intervals"]["n"]):
+        # Every file holds 2500 rows of one partition, so a partition's count is exact
+        # up to sampling of its files; the interval must not claim certainty it lacks
+        assert estimate == 10000
+        assert interval is None or interval[0] < interval[1]
+
+
+def test_identical_units_do_not_give_a_zero_width_interval(lakehouse):
+    table = lakehouse.table("flat", rows=8000, columns=2, files=8)
+    result, info = run(table, "SELECT COUNT(*) AS n FROM sample", sample_fraction=0.25)
+
+    assert result["n"].tolist() == [8000]
+    # Every sampled file has 1000 rows: no observed spread, so no interval rather than [8000, 8000]
+    assert info["confidence_intervals"]["n"] == [None]
+
+
+def test_fully_read_table_is_exact(lakehouse):
+    table = lakehouse.table("small", rows=2000, columns=2, files=2)
+    result, info = run(table, "SELECT COUNT(*) AS n FROM sample", sample_fraction=1.0)
+    assert info["confidence_intervals"]["n"] == [[2000.0, 2000.0]]
+
+
+def test_partitions_beyond_the_budget_are_reported(lakehouse):
+    table = lakehouse.table("many_parts", rows=8000, columns=2, partitions=8, files=1)
+    result, info = run(table, GROUP_BY_PART, sample_fraction=0.1, max_units=4)
+
+    assert info["partitions"] == 8 and info["units_sampled"] == 4
+    assert info["partitions_sampled"] == 4
+    missing = sorted(p["part"] for p in info["unsampled_partitions"])
+    assert len(missing) == 4
+    assert set(result["part"]).isdisjoint(missing)
+    assert "not sampled" in info["note"]
+
+
+def test_select_items_are_classified():
+    conn = duckdb.connect()
+    kinds, has_limit = analyze_select_list(
+        conn, "SELECT part, COUNT(*), SUM(x), AVG(x), MAX(x) - MIN(x), COUNT(DISTINCT x) FROM t GROUP BY part")
+    assert kinds == ["key", "scale", "scale", "aggregate", "aggregate", "aggregate"]
+    assert not has_limit
+    assert analyze_select_list(conn, "SELECT * FROM t") is None
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT part, COUNT(*) * 2 AS doubled FROM t GROUP BY part",
+    "SELECT SUM(x) / 10 FROM t",
+    "SELECT coalesce(SUM(x), 0) FROM t",
+    "SELECT part, SUM(x) OVER (PARTITION BY part) FROM t",
+])
+def test_count_and_sum_inside_expressions_are_rejected(sql):
+    with pytest.raises(ValueError, match="not approximable"):
+        analyze_select_list(duckdb.connect(), sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT part, COUNT(*) AS n FROM t GROUP BY part HAVING COUNT(*) > 10",
+    "SELECT part, AVG(x) FROM t GROUP BY part HAVING SUM(x) > 10",
+])
+def test_having_on_counts_and_sums_is_rejected(sql):
+    with pytest.raises(ValueError, match="HAVING is not approximable"):
+        analyze_select_list(duckdb.connect(), sql)
+
+
+def test_unapproximable_query_fails_before_reading_the_sample(lakehouse):
+    table = lakehouse.table("flat", rows=2000, columns=2, files=2)
+    query = ApproximateQuery(table, table.current_snapshot(), seed=7)
+    query._read_unit = lambda unit: pytest.fail("read a sample unit")
+    with pytest.raises(ValueError, match="not approximable"):
+        query.run(duckdb.connect(), "SELECT COUNT(*) * 2 FROM sample", "sample", 10)
@@ -0,0 +1,34 @@
+"""
+Tests for the synthetic benchmark lakehouse
+"""
+
+import pyarrow.compute as pc
+from pyiceberg.manifest import ManifestContent
+
+from app.core.manifests import is_position_delete_file, live_files
+
+
+def test_merge_on_read_deletes_commit_position_delete_files(lakehouse):
+    table = lakehouse.table("mor", rows=2000, columns=2, files=2, deletes=2)
+    snapshot = table.current_snapshot()
+
+    manifests = list(snapshot.manifests(table.io))
+    assert any(m.content == ManifestContent.DELETES for m in manifests)
+    delete_files = [f for f in live_files(table.io, snapshot).values() if is_position_delete_file(f)]
+    assert sum(f.record_count for f in delete_files) == 40
+    assert snapshot.summary["total-position-deletes"] == "40"
+
+    ids = table.scan().to_arrow().column("id")
+    assert len(ids) == 1960
+    # The deleted ranges are [646, 666) and [1313, 1333)
+    assert not pc.any(pc.and_(pc.greater_equal(ids, 646), pc.less(ids, 666))).as_py()
+    assert not pc.any(pc.and_(pc.greater_equal(ids, 1313), pc.less(ids, 1333))).as_py()
+
+
+def test_copy_on_write_deletes_rewrite_data_files(lakehouse):
+    table = lakehouse.table("cow", rows=2000, columns=2, files=2, deletes=2, delete_mode="copy-on-write")
+    snapshot = table.current_snapshot()
+
+    assert not any(is_position_delete_file(f) for f in live_files(table.io, snapshot).values())
+    assert snapshot.summary["total-records"] == "1960"
+    assert table.scan().to_arrow().num_rows == 1960
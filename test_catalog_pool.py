@@ -0,0 +1,127 @@
+"""
+Tests for ref, snapshot and point-in-time resolution in the catalog pool
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+from pyiceberg.exceptions import NoSuchTableError, UnauthorizedError
+
+from app.core import catalog_pool
+from app.core.catalog_pool import CatalogPool, TableVersion, UnknownRef
+from app.core.config import LakehouseConfig
+from benchmarks.lakehouse import NAMESPACE, SyntheticTableSpec, synthetic_batch
+
+IDENTIFIER = (NAMESPACE, "events")
+
+
+def nessie_config(uri="http://nessie:19120/iceberg/main"):
+    return LakehouseConfig(nessie_uri=uri, s3_endpoint="", s3_access_key="", s3_secret_key="", warehouse_path="")
+
+
+@pytest.fixture
+def branched(lakehouse):
+    """main: two appends then two more; dev: branched after the second, then one append of its own"""
+    table = lakehouse.table("events", rows=2000, columns=1, files=2)
+    spec = SyntheticTableSpec("events", rows=2000, columns=1)
+    base = table.current_snapshot()
+    table.manage_snapshots().create_branch(base.snapshot_id, "dev").commit()
+    time.sleep(0.01)
+    table.append(synthetic_batch(spec, 5000, 10, np.random.default_rng(1)), branch="dev")
+    time.sleep(0.01)
+    table.append(synthetic_batch(spec, 2000, 500, np.random.default_rng(2)))
+    time.sleep(0.01)
+    table.append(synthetic_batch(spec, 2500, 500, np.random.default_rng(3)))
+    return lakehouse, lakehouse.load("events"), base
+
+
+def test_as_of_on_a_branch_follows_the_branch_lineage(branched):
+    lakehouse, table, base = branched
+    pool = CatalogPool(lakehouse.config(), lakehouse.catalog)
+    dev_head = table.snapshot_by_name("dev")
+
+    _, snapshot = pool.load_table_version(IDENTIFIER, TableVersion(ref="dev", as_of=int(time.time() * 1000)))
+    assert snapshot.snapshot_id == dev_head.snapshot_id
+
+    _, snapshot = pool.load_table_version(IDENTIFIER, TableVersion(ref="dev", as_of=dev_head.timestamp_ms - 1))
+    assert snapshot.snapshot_id == base.snapshot_id
+
+    # Without a ref, as_of walks the main branch
+    _, snapshot = pool.load_table_version(IDENTIFIER, TableVersion(as_of=int(time.time() * 1000)))
+    assert snapshot.snapshot_id == table.current_snapshot().snapshot_id
+
+
+def test_unknown_table_ref_is_rejected(branched):
+    lakehouse, _, _ = branched
+    pool = CatalogPool(lakehouse.config(), lakehouse.catalog)
+    with pytest.raises(UnknownRef):
+        pool.load_table_version(IDENTIFIER, TableVersion(ref="nope"))
+
+
+def test_refs_need_a_nessie_iceberg_uri():
+    assert nessie_config().to_pyiceberg_catalog_config(ref="dev")["uri"] == "http://nessie:19120/iceberg/dev"
+    config = nessie_config("http://nessie:19120/api/v1")
+    assert config.to_pyiceberg_catalog_config()["uri"] == "http://nessie:19120/api/v1"
+    with pytest.raises(ValueError, match="cannot select another ref"):
+        config.to_pyiceberg_catalog_config(ref="dev")
+
+
+class FakeRestCatalog:
+    failures = {}
+    connecting = {}  # ref -> event the connect waits for
+
+    def __init__(self, name, transport, **properties):
+        self.ref = properties["ref"]
+        if self.ref in self.connecting:
+            self.connecting[self.ref].wait(5)
+
+    def load_table(self, identifier):
+        raise self.failures.get(self.ref, NoSuchTableError(f"{identifier} not on {self.ref}"))
+
+
+@pytest.fixture
+def fake_catalogs(monkeypatch):
+    monkeypatch.setattr(catalog_pool, "TransportRestCatalog", FakeRestCatalog)
+    FakeRestCatalog.failures = {}
+    FakeRestCatalog.connecting = {}
+    return FakeRestCatalog
+
+
+def test_ref_catalogs_are_bounded_and_keep_the_default(fake_catalogs):
+    pool = CatalogPool(nessie_config(), max_refs=2)
+    default = pool.get_catalog()
+    for ref in ("a", "b", "c"):
+        pool.get_catalog(ref)
+    assert pool.refs() == ["main", "b", "c"]
+    assert pool.get_catalog() is default
+    with pytest.raises(UnknownRef):
+        pool.get_catalog("../../v1/namespaces")
+
+
+def test_catalog_errors_at_a_ref_are_not_reported_as_unknown_refs(fake_catalogs):
+    fake_catalogs.failures = {"dev": UnauthorizedError("token expired")}
+    pool = CatalogPool(nessie_config())
+    with pytest.raises(UnauthorizedError):
+        pool.load_table_version(IDENTIFIER, TableVersion(ref="dev"))
+
+
+def test_slow_connect_to_a_new_ref_does_not_block_other_refs(fake_catalogs):
+    pool = CatalogPool(nessie_config())
+    default = pool.get_catalog()
+    connected = threading.Event()
+    fake_catalogs.connecting = {"dev": connected}
+    connecting = [threading.Thread(target=pool.get_catalog, args=("dev",)) for _ in range(2)]
+    for thread in connecting:
+        thread.start()
+
+    started = time.monotonic()
+    assert pool.get_catalog() is default
+    assert time.monotonic() - started < 1
+    connected.set()
+    for thread in connecting:
+        thread.join()
+    # Both connects finished, one client is kept
+    assert pool.refs() == ["main", "dev"]
+    assert pool.get_catalog("dev") is pool.get_catalog("dev")
@@ -0,0 +1,57 @@
+"""
+Tests for the table details endpoints
+"""
+
+import pytest
+
+from app import create_app
+from benchmarks.lakehouse import NAMESPACE
+
+
+@pytest.fixture
+def app_client(lakehouse):
+    lakehouse.table("events", rows=2000, columns=2, files=2)
+    lakehouse.table("users", rows=500, columns=2, files=1)
+    explorer = lakehouse.explorer()
+    loads = lakehouse.count_loads()
+    return create_app(explorer=explorer).test_client(), loads
+
+
+def test_details_load_the_table_once_for_every_part(app_client):
+    client, loads = app_client
+    response = client.get(f"/api/table/{NAMESPACE}/events/details?parts=schema,metadata,preview,partitions"
+                          f"&preview_limit=5")
+    assert response.status_code == 200
+    details = response.get_json()["details"]
+    assert set(details) == {"snapshot_id", "schema", "metadata", "preview", "partitions"}
+    assert len(details["preview"]["data"]) == 5
+    assert len(loads) == 1
+
+
+def test_unknown_part_is_rejected(app_client):
+    client, _ = app_client
+    response = client.get(f"/api/table/{NAMESPACE}/events/details?parts=schema,lineage")
+    assert response.status_code == 400
+    assert "lineage" in response.get_json()["error"]
+
+
+def test_batched_details_report_each_table(app_client):
+    client, loads = app_client
+    response = client.post("/api/tables/details", json={
+        "tables": [f"{NAMESPACE}.events", {"namespace": NAMESPACE, "table": "users"}, f"{NAMESPACE}.missing"],
+        "parts": ["schema"]
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["count"] == 3
+    tables = body["tables"]
+    assert [f["name"] for f in tables[f"{NAMESPACE}.events"]["schema"]["fields"]][:1] == ["id"]
+    assert "schema" in tables[f"{NAMESPACE}.users"]
+    assert "error" in tables[f"{NAMESPACE}.missing"]
+
+
+def test_batched_details_limits_the_request(app_client):
+    client, _ = app_client
+    assert client.post("/api/tables/details", json={}).status_code == 400
+    too_many = [f"{NAMESPACE}.t{i}" for i in range(51)]
+    assert client.post("/api/tables/details", json={"tables": too_many}).status_code == 400
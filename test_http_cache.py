@@ -0,0 +1,39 @@
+"""
+Tests for ETag validation of table routes
+"""
+
+import pytest
+
+from app import create_app
+from benchmarks.lakehouse import NAMESPACE
+
+
+@pytest.fixture
+def client(lakehouse):
+    lakehouse.table("events", rows=2000, columns=2, files=2)
+    explorer = lakehouse.explorer()
+    client = create_app(explorer=explorer).test_client()
+    client.loads = lakehouse.count_loads()
+    return client
+
+
+def test_schema_request_loads_the_table_once(client):
+    response = client.get(f"/api/table/{NAMESPACE}/events/schema")
+    assert response.status_code == 200 and response.headers["ETag"]
+    assert len(client.loads) == 1
+
+    client.loads.clear()
+    revalidated = client.get(f"/api/table/{NAMESPACE}/events/schema",
+                             headers={"If-None-Match": response.headers["ETag"]})
+    assert revalidated.status_code == 304
+    assert len(client.loads) == 1
+
+
+def test_tables_are_not_reused_across_requests(client, lakehouse):
+    first = client.get(f"/api/table/{NAMESPACE}/events/schema")
+    table = lakehouse.load("events")
+    table.append(table.scan(limit=10).to_arrow())
+
+    second = client.get(f"/api/table/{NAMESPACE}/events/schema")
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
@@ -0,0 +1,109 @@
+"""
+Tests for the headless catalog inventory
+"""
+
+import os
+import time
+
+import pyarrow.dataset as ds
+
+import lakehouse_explorer
+from app.core.inventory import (ExplorerSpec, InventoryWriter, health_issues, inventory_table, run_inventory,
+                                select_tables)
+from benchmarks.lakehouse import NAMESPACE
+
+
+def test_select_tables():
+    all_tables = {("sales",): ["orders", "tmp_orders"], ("hr",): ["people"], (): ["loose"]}
+    assert select_tables(all_tables) == [("default", "loose"), ("hr", "people"), ("sales", "orders"),
+                                         ("sales", "tmp_orders")]
+    assert select_tables(all_tables, namespaces=["sales"], exclude=["*.tmp_*"]) == [("sales", "orders")]
+    assert select_tables(all_tables, include=["hr.*", "default.*"]) == [("default", "loose"), ("hr", "people")]
+
+
+def test_health_issues():
+    summary = {"snapshot_id": 1, "data_files": 40, "avg_file_bytes": 1024, "position_delete_files": 10,
+               "equality_delete_files": 0, "snapshot_count": 3, "last_updated_ms": 1}
+    columns = [{"column": "a", "count": 10, "null_percentage": 100}, {"column": "b", "count": 10,
+                                                                      "null_percentage": 0}]
+    partitions = [{"bytes": 100}] * 5 + [{"bytes": 5000}]
+    codes = {issue["code"]: issue for issue in health_issues(summary, columns, partitions, now_ms=40 * 86400 * 1000)}
+    assert set(codes) == {"small_files", "delete_files", "stale", "partition_skew", "null_columns"}
+    assert "a" in codes["null_columns"]["message"] and "b" not in codes["null_columns"]["message"]
+
+    assert [i["code"] for i in health_issues({"snapshot_id": None}, [], [], 0)] == ["empty"]
+
+
+def test_inventory_table_and_writer(lakehouse, tmp_path):
+    lakehouse.table("events", rows=2000, columns=3, files=2, deletes=1)
+    result = inventory_table(lakehouse.explorer(), NAMESPACE, "events")
+    summary = result["tables"][0]
+    assert summary["status"] == "ok" and summary["records"] == 2000
+    assert summary["position_delete_files"] == 1
+    assert {c["column"] for c in result["columns"]} >= {"id", "part"}
+
+    writer = InventoryWriter(str(tmp_path / "out"), "run1")
+    writer.write(NAMESPACE, "events", result)
+    assert writer.completed() == {f"{NAMESPACE}.events": "ok"}
+    writer.write(NAMESPACE, "other", {"tables": [{"table": "other", "status": "error", "error": "boom"}],
+                                      "columns": [], "issues": []})
+    writer.compact()
+    partition = tmp_path / "out" / "tables" / "run_id=run1" / f"namespace={NAMESPACE}"
+    assert os.listdir(partition) == ["part-00000.parquet"]
+    tables = ds.dataset(str(tmp_path / "out" / "tables"), partitioning="hive").to_table()
+    assert sorted(tables.column("table").to_pylist()) == ["events", "other"]
+
+
+def test_rerun_without_issues_clears_compacted_issues(lakehouse, tmp_path):
+    writer = InventoryWriter(str(tmp_path / "out"), "run1")
+    issue = {"table": "events", "code": "small_files", "severity": "warning", "message": "many small files"}
+    writer.write(NAMESPACE, "events", {"tables": [{"table": "events", "status": "ok"}], "columns": [],
+                                       "issues": [issue]})
+    writer.write(NAMESPACE, "users", {"tables": [{"table": "users", "status": "ok"}], "columns": [],
+                                      "issues": [{**issue, "table": "users"}]})
+    writer.compact()
+
+    # Resumed after the compaction: events no longer has issues
+    writer.write(NAMESPACE, "events", {"tables": [{"table": "events", "status": "ok"}], "columns": [], "issues": []})
+    writer.compact()
+    partition = tmp_path / "out" / "issues" / "run_id=run1" / f"namespace={NAMESPACE}"
+    assert os.listdir(partition) == ["part-00000.parquet"]
+    issues = ds.dataset(str(tmp_path / "out" / "issues"), partitioning="hive").to_table()
+    assert issues.column("table").to_pylist() == ["users"]
+
+
+class HangingSpec(ExplorerSpec):
+    """An explorer that never finishes connecting"""
+
+    def build(self):
+        time.sleep(60)
+
+
+def test_worker_that_never_starts_times_out_its_table(lakehouse, tmp_path):
+    writer = InventoryWriter(str(tmp_path / "out"), "run1")
+    tables = [(NAMESPACE, "events"), (NAMESPACE, "users")]
+    started = time.time()
+    counts = run_inventory(HangingSpec(lakehouse.config()), tables, writer, workers=1, startup_timeout=1)
+    assert counts == {"ok": 0, "error": 0, "timeout": 2}
+    assert writer.completed() == {f"{NAMESPACE}.events": "timeout", f"{NAMESPACE}.users": "timeout"}
+    assert time.time() - started < 20
+
+
+def test_cli_runs_in_worker_processes_and_resumes(lakehouse, tmp_path, capsys):
+    lakehouse.table("events", rows=1000, columns=2, files=1)
+    lakehouse.table("users", rows=500, columns=2, files=1)
+    output = str(tmp_path / "inventory")
+    args = ["inventory", "--catalog-name", "bench",
+            "--catalog-property", "type=sql",
+            "--catalog-property", f"uri=sqlite:///{os.path.join(lakehouse.root, 'catalog.db')}",
+            "--catalog-property", f"warehouse=file://{os.path.join(lakehouse.root, 'warehouse')}",
+            "--output", output, "--run-id", "r1", "--workers", "2", "--no-profile"]
+
+    assert lakehouse_explorer.main(args) == 0
+    assert "Inventoried 2 table(s)" in capsys.readouterr().out
+    tables = ds.dataset(os.path.join(output, "tables"), partitioning="hive").to_table()
+    assert sorted(tables.column("table").to_pylist()) == ["events", "users"]
+
+    # The same run id resumes: nothing is left to do
+    assert lakehouse_explorer.main(args) == 0
+    assert "2 already done, 0 to inventory" in capsys.readouterr().out
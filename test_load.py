@@ -0,0 +1,55 @@
+"""
+Tests for the API load-testing harness
+"""
+
+import random
+
+import pytest
+
+from benchmarks.load import InProcessServer, LoadSettings, Workload, parse_sweep, recommend, run_load, summarize
+
+
+def test_workload_follows_the_mix():
+    workload = Workload([("bench", "events")], {"schema": 1, "query": 0})
+    rng = random.Random(1)
+    requests = [workload.next_request(rng) for _ in range(20)]
+    assert {operation for operation, _, _, _ in requests} == {"schema"}
+    assert all(path.startswith("/api/table/bench/events/") for _, _, path, _ in requests)
+
+    with pytest.raises(ValueError):
+        Workload([("bench", "events")], {"upload": 1})
+    with pytest.raises(ValueError):
+        Workload([], {"schema": 1})
+
+
+def test_summarize_and_recommend():
+    samples = [("schema", 10.0, 200, True)] * 9 + [("query", 100.0, 500, False)]
+    report = summarize(samples, elapsed=2.0)
+    assert report["requests"] == 10 and report["errors"] == 1
+    assert report["throughput_rps"] == 5.0
+    assert report["status_codes"] == {"200": 9, "500": 1}
+    assert report["operations"]["schema"]["latency_ms"]["p95"] == 10.0
+
+    assert parse_sweep("1x4, 2x4,4") == [(1, 4), (2, 4), (4, 1)]
+    runs = [
+        {"workers": 1, "threads": 4, "requests": 100, "throughput_rps": 50, "error_rate": 0,
+         "latency_ms": {"p95": 900}},
+        {"workers": 2, "threads": 4, "requests": 100, "throughput_rps": 95, "error_rate": 0,
+         "latency_ms": {"p95": 300}},
+        {"workers": 4, "threads": 4, "requests": 100, "throughput_rps": 100, "error_rate": 0,
+         "latency_ms": {"p95": 250}},
+    ]
+    # The smallest configuration within 10% of the best throughput under the SLO
+    assert recommend(runs, slo_p95_ms=500, max_error_rate=0.01)["workers"] == 2
+    assert recommend(runs, slo_p95_ms=100, max_error_rate=0.01) is None
+
+
+def test_in_process_run(lakehouse):
+    lakehouse.table("events", rows=2000, columns=2, files=2)
+    settings = LoadSettings(users=3, duration=1.0, ramp_up=0.2, think_time=0.02, timeout=30)
+    with InProcessServer(lakehouse.root) as server:
+        report = run_load(server.base_url, settings, server.pids)
+
+    assert report["requests"] > 0
+    assert report["error_rate"] == 0, report["status_codes"]
+    assert report["memory"]["processes"]
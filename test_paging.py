@@ -0,0 +1,79 @@
+"""
+Tests for random access to table rows by offset
+"""
+
+import uuid
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyiceberg.manifest import DataFile, DataFileContent, FileFormat
+from pyiceberg.table import DataScan, FileScanTask
+
+from app.core.manifests import PARQUET_FIELD_ID_KEY, equality_delete_positions
+from app.core.paging import PagedFile, TablePager
+
+
+def all_ids(pager, page_size):
+    pages = [pager.page(offset, page_size, ["id"]) for offset in range(0, pager.total_rows, page_size)]
+    return pa.concat_tables(pages).column("id").to_pylist()
+
+
+def test_positions_skip_deleted_rows():
+    rng = np.random.default_rng(3)
+    drop = np.sort(rng.choice(1000, size=300, replace=False))
+    paged_file = PagedFile("file.parquet", 1000, 700, drop)
+    live = np.setdiff1d(np.arange(1000), drop)
+
+    for start, count in [(0, 10), (0, 700), (123, 50), (690, 10)]:
+        assert paged_file.positions(start, count).tolist() == live[start:start + count].tolist()
+
+
+def test_pages_skip_position_deletes(lakehouse):
+    table = lakehouse.table("deletes", rows=4000, columns=2, files=4, deletes=3)
+    pager = TablePager(table, table.current_snapshot())
+
+    ids = all_ids(pager, 333)
+    assert pager.total_rows == len(ids) == 3880
+    assert sorted(ids) == sorted(table.scan(selected_fields=("id",)).to_arrow().column("id").to_pylist())
+
+
+def equality_delete_file(table, ids):
+    """An equality delete file on the id column"""
+    id_field = table.schema().find_field("id").field_id
+    schema = pa.schema([pa.field("id", pa.int64(), metadata={PARQUET_FIELD_ID_KEY: str(id_field)})])
+    location = table.location_provider().new_data_location(f"eq-delete-{uuid.uuid4()}.parquet")
+    with table.io.new_output(location).create(overwrite=True) as f:
+        pq.write_table(pa.table([pa.array(ids, pa.int64())], schema=schema), f)
+    return DataFile.from_args(
+        content=DataFileContent.EQUALITY_DELETES, file_path=location, file_format=FileFormat.PARQUET,
+        partition={}, record_count=len(ids), file_size_in_bytes=len(table.io.new_input(location)),
+        equality_ids=[id_field])
+
+
+def test_equality_deletes_are_resolved_once_when_the_pager_is_built(lakehouse, monkeypatch):
+    table = lakehouse.table("equality", rows=2000, columns=2, files=2)
+    deleted = [5, 6, 1500, 1999]
+    delete_file = equality_delete_file(table, deleted)
+
+    plan_files = DataScan.plan_files
+    monkeypatch.setattr(DataScan, "plan_files",
+                        lambda scan: [FileScanTask(task.file, {delete_file}) for task in plan_files(scan)])
+    pager = TablePager(table, table.current_snapshot())
+
+    scans = []
+    monkeypatch.setattr(DataScan, "to_arrow", lambda scan: scans.append(scan))
+    ids = all_ids(pager, 300)
+    assert not scans
+    assert pager.total_rows == len(ids) == 1996
+    assert sorted(ids) == [i for i in range(2000) if i not in deleted]
+
+
+def test_equality_delete_positions_of_one_file(lakehouse):
+    table = lakehouse.table("keys", rows=10, columns=2, files=1)
+    data_file = next(iter(table.scan().plan_files())).file
+    assert equality_delete_positions(table.io, data_file.file_path, table.schema(), []) is None
+
+    positions = equality_delete_positions(table.io, data_file.file_path, table.schema(),
+                                          [equality_delete_file(table, [3, 7, 42])])
+    assert positions.tolist() == [3, 7]
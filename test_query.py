@@ -0,0 +1,27 @@
+"""
+Tests for SQL queries planned across read strategies
+"""
+
+from benchmarks.lakehouse import NAMESPACE
+
+NS = (NAMESPACE,)
+
+
+def test_table_names_match_case_insensitively(lakehouse):
+    lakehouse.table("events", rows=1000, columns=2, files=1)
+    explorer = lakehouse.explorer()
+
+    assert explorer._prepare_query(NS, "events", f"SELECT * FROM {NAMESPACE.upper()}.Events JOIN EVENTS_saved",
+                                   "table_events") == "SELECT * FROM table_events JOIN EVENTS_saved"
+    result = explorer.execute_sql_query(NS, "events", "SELECT COUNT(*) AS n FROM Events")
+    assert result["success"] and result["result"]["data"] == [[1000]]
+
+
+def test_unknown_table_fails_without_trying_other_strategies(lakehouse, capsys):
+    lakehouse.table("events", rows=1000, columns=2, files=1)
+    explorer = lakehouse.explorer()
+
+    result = explorer.execute_sql_query(NS, "events", "SELECT * FROM events JOIN missing USING (id)")
+    assert result["success"] is False
+    assert "missing" in result["error"]
+    assert "trying the next strategy" not in capsys.readouterr().out
@@ -0,0 +1,162 @@
+"""
+Tests for the pooled, retrying, concurrency-limited catalog transport
+"""
+
+import threading
+import time
+
+import pytest
+import requests
+
+from app import create_app
+from app.core.explorer import LakehouseExplorer
+from app.core.rest_transport import CatalogTransport, CatalogUnavailable, CircuitBreaker, TransportSettings
+from benchmarks.lakehouse import NAMESPACE
+from benchmarks.rest_catalog_stub import FaultSettings, StubRestCatalog, stub_config
+
+
+@pytest.fixture
+def stub(lakehouse):
+    lakehouse.table("events", rows=1000, columns=2, files=2)
+    with StubRestCatalog(lakehouse.catalog) as stub:
+        stub.config_url = f"{stub.uri}/v1/config"
+        yield stub
+
+
+def session_for(**settings):
+    settings.setdefault("backoff_seconds", 0.0)
+    transport = CatalogTransport(TransportSettings(**settings))
+    session = requests.Session()
+    session.mount("http://", transport)
+    return session, transport
+
+
+def test_breaker_opens_after_consecutive_failures_and_closes_after_a_trial():
+    breaker = CircuitBreaker(failures=2, reset_seconds=0.05)
+    breaker.record(False)
+    breaker.before_call()
+    breaker.record(False)
+    assert breaker.status() == {"state": "open", "consecutive_failures": 2, "times_opened": 1}
+
+    with pytest.raises(CatalogUnavailable) as refused:
+        breaker.before_call()
+    assert 0 < refused.value.retry_after <= 0.05
+
+    time.sleep(0.06)
+    breaker.before_call()
+    assert breaker.state == "half-open"
+    # Only one trial call at a time
+    with pytest.raises(CatalogUnavailable):
+        breaker.before_call()
+    breaker.record(True)
+    assert breaker.status() == {"state": "closed", "consecutive_failures": 0, "times_opened": 1}
+
+
+def test_failed_trial_reopens_the_circuit():
+    breaker = CircuitBreaker(failures=1, reset_seconds=0.05)
+    breaker.record(False)
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record(False)
+    assert breaker.state == "open"
+    with pytest.raises(CatalogUnavailable):
+        breaker.before_call()
+
+
+def test_idempotent_call_is_retried_then_reported_unavailable(stub):
+    stub.faults = FaultSettings(failure_rate=1.0)
+    session, transport = session_for(retries=2)
+    with pytest.raises(CatalogUnavailable, match="503"):
+        session.get(stub.config_url)
+    assert stub.stats()["requests"] == 3
+
+    metrics = transport.metrics()
+    assert metrics["calls"] == 1 and metrics["failed"] == 1
+    assert metrics["retries"] == 2 and metrics["retried_calls"] == 1
+
+
+def test_non_idempotent_call_is_not_retried(stub):
+    stub.faults = FaultSettings(failure_rate=1.0)
+    session, _ = session_for(retries=3)
+    with pytest.raises(CatalogUnavailable):
+        session.post(stub.config_url, json={})
+    assert stub.stats()["requests"] == 1
+
+
+def test_connection_resets_are_reported_unavailable(stub):
+    stub.faults = FaultSettings(reset_rate=1.0)
+    session, transport = session_for(retries=1)
+    with pytest.raises(CatalogUnavailable) as refused:
+        session.get(stub.config_url)
+    assert isinstance(refused.value.__cause__, requests.exceptions.ConnectionError)
+    assert refused.value.retry_after is not None
+    assert transport.breaker.consecutive_failures == 1
+
+
+def test_retry_after_sets_the_backoff(stub):
+    stub.faults = FaultSettings(failure_rate=1.0, failure_status=429, retry_after=0.2)
+    session, transport = session_for(retries=1, max_backoff_seconds=1.0)
+    started = time.monotonic()
+    with pytest.raises(CatalogUnavailable) as refused:
+        session.get(stub.config_url)
+    assert time.monotonic() - started >= 0.2
+    assert refused.value.retry_after == 0.2
+    # 4xx answers mean the catalog is up
+    assert transport.breaker.consecutive_failures == 0
+
+
+def test_failing_catalog_opens_the_circuit_without_calling_it(stub):
+    stub.faults = FaultSettings(failure_rate=1.0, failure_status=500)
+    session, transport = session_for(retries=0, breaker_failures=2, breaker_reset_seconds=30)
+    for _ in range(2):
+        with pytest.raises(CatalogUnavailable, match="500"):
+            session.get(stub.config_url)
+
+    with pytest.raises(CatalogUnavailable, match="circuit open") as refused:
+        session.get(stub.config_url)
+    assert 29 < refused.value.retry_after <= 30
+    assert stub.stats()["requests"] == 2
+    metrics = transport.metrics()
+    assert metrics["rejected_open_circuit"] == 1
+    assert metrics["circuit"]["state"] == "open" and metrics["circuit"]["times_opened"] == 1
+
+
+def test_concurrency_limit_rejects_calls_that_cannot_get_a_slot(stub):
+    stub.faults = FaultSettings(latency_seconds=0.5)
+    session, transport = session_for(max_concurrency=1, acquire_timeout=0.05)
+    slow = threading.Thread(target=session.get, args=(stub.config_url,))
+    slow.start()
+    while not transport.metrics()["in_flight"]:
+        time.sleep(0.01)
+
+    with pytest.raises(CatalogUnavailable) as refused:
+        session.get(stub.config_url)
+    slow.join()
+    assert refused.value.retry_after == 1.0
+
+    metrics = transport.metrics()
+    assert metrics["rejected_concurrency"] == 1
+    assert metrics["max_in_flight"] == 1 and metrics["in_flight"] == 0
+    # Being busy is not a catalog failure
+    assert metrics["circuit"]["state"] == "closed"
+
+
+@pytest.mark.parametrize("faults", [FaultSettings(reset_rate=1.0),
+                                    FaultSettings(failure_rate=1.0, failure_status=500)],
+                         ids=["resets", "server-errors"])
+def test_table_routes_answer_503_while_the_catalog_fails(stub, lakehouse, faults):
+    config = stub_config(lakehouse.root, stub.uri)
+    config.catalog_retries = 1
+    config.catalog_backoff_seconds = 0.0
+    config.catalog_breaker_failures = 4
+    client = create_app(explorer=LakehouseExplorer(config)).test_client()
+    assert client.get(f"/api/table/{NAMESPACE}/events/schema").status_code == 200
+
+    stub.faults = faults
+    # Enough calls to fail both with the circuit closed and once it has opened
+    for path in ("schema", "preview", "statistics", "schema", "preview", "statistics"):
+        response = client.get(f"/api/table/{NAMESPACE}/events/{path}")
+        assert response.status_code == 503, (path, response.get_json())
+        assert int(response.headers["Retry-After"]) >= 1
+    pool = client.get("/api/connection").get_json()["connection"]["catalog_pool"]
+    assert pool["transport"]["circuit"]["state"] == "open"
@@ -0,0 +1,124 @@
+"""
+Tests for analyst sessions: saved results, quotas, expiry and the session routes
+"""
+
+import pytest
+
+from app import create_app
+from app.core.sessions import SessionManager, SessionNotFound
+from benchmarks.lakehouse import NAMESPACE
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = SessionManager(str(tmp_path / "sessions"), idle_seconds=3600, quota_mb=64)
+    yield manager
+    manager.close()
+
+
+def test_saved_results_can_be_queried_and_survive_a_restart(manager):
+    session_id = manager.create().session_id
+    with manager.use(session_id) as session:
+        head = session.execute("SELECT range AS id FROM range(1000)", limit=5, save_as="ids")
+        assert len(head) == 5
+        total = session.execute("SELECT sum(id) AS total FROM ids", limit=10)
+    assert int(total["total"][0]) == sum(range(1000))
+    manager.close()
+
+    reopened = SessionManager(manager.root, idle_seconds=3600, quota_mb=64)
+    try:
+        info = reopened.get(session_id).to_dict(reopened.idle_seconds)
+        assert [(table["name"], table["rows"]) for table in info["tables"]] == [("ids", 1000)]
+        with reopened.use(session_id) as session:
+            assert int(session.execute("SELECT count(*) AS n FROM ids", limit=1)["n"][0]) == 1000
+    finally:
+        reopened.close()
+
+
+def test_saved_table_names_are_validated(manager):
+    session_id = manager.create().session_id
+    with manager.use(session_id) as session:
+        for name in ("1st", "table_events", "sample_x", "bad-name"):
+            with pytest.raises(ValueError):
+                session.execute("SELECT 1 AS x", limit=1, save_as=name)
+        assert session.tables == {}
+
+
+def test_table_over_the_quota_is_dropped(tmp_path):
+    manager = SessionManager(str(tmp_path / "sessions"), quota_mb=1)
+    try:
+        session_id = manager.create().session_id
+        with manager.use(session_id) as session:
+            with pytest.raises(ValueError, match="quota"):
+                session.execute("SELECT range AS id, md5(range::VARCHAR) AS h FROM range(200000)",
+                                limit=1, save_as="big")
+            assert "big" not in session.tables
+            assert session.conn.execute(
+                "SELECT count(*) FROM duckdb_tables() WHERE table_name = 'big'").fetchone()[0] == 0
+    finally:
+        manager.close()
+
+
+def test_idle_sessions_expire(manager):
+    session = manager.create()
+    session.last_used -= 7200
+    session._write_metadata()
+
+    assert manager.sweep(force=True) == [session.session_id]
+    with pytest.raises(SessionNotFound):
+        manager.get(session.session_id)
+    assert manager.list() == []
+
+
+def test_unknown_sessions_and_the_session_limit(tmp_path):
+    manager = SessionManager(str(tmp_path / "sessions"), max_sessions=1)
+    try:
+        for session_id in ("missing-session", "../escape", ""):
+            with pytest.raises(SessionNotFound):
+                manager.get(session_id)
+        session_id = manager.create().session_id
+        with pytest.raises(ValueError, match="Too many"):
+            manager.create()
+        manager.delete(session_id)
+        manager.create()
+    finally:
+        manager.close()
+
+
+@pytest.fixture
+def client(lakehouse, tmp_path):
+    lakehouse.table("events", rows=1000, columns=2, files=2)
+    explorer = lakehouse.explorer(sessions_path=str(tmp_path / "sessions"))
+    return create_app(explorer=explorer).test_client()
+
+
+def test_session_routes(client):
+    created = client.post("/api/sessions")
+    assert created.status_code == 201
+    session_id = created.get_json()["session"]["session_id"]
+
+    saved = client.post(f"/api/table/{NAMESPACE}/events/query",
+                        json={"query": "SELECT * FROM events WHERE id < 100", "session_id": session_id,
+                              "save_as": "small", "limit": 10})
+    assert saved.status_code == 200, saved.get_json()
+    assert saved.get_json()["query_result"]["session_id"] == session_id
+
+    result = client.post(f"/api/sessions/{session_id}/query", json={"query": "SELECT count(*) AS n FROM small"})
+    assert result.status_code == 200
+    assert result.get_json()["query_result"]["result"]["data"] == [[100]]
+
+    info = client.get(f"/api/sessions/{session_id}").get_json()["session"]
+    assert [table["name"] for table in info["tables"]] == ["small"]
+    assert client.get("/api/sessions").get_json()["count"] == 1
+
+    dropped = client.delete(f"/api/sessions/{session_id}/tables/small")
+    assert dropped.get_json()["session"]["tables"] == []
+    assert client.delete(f"/api/sessions/{session_id}").status_code == 200
+    assert client.get(f"/api/sessions/{session_id}").status_code == 404
+    assert client.post(f"/api/sessions/{session_id}/query", json={"query": "SELECT 1"}).status_code == 404
+
+
+def test_save_as_needs_a_session(client):
+    response = client.post(f"/api/table/{NAMESPACE}/events/query",
+                           json={"query": "SELECT * FROM events", "save_as": "all_events"})
+    assert response.status_code == 400
@@ -0,0 +1,83 @@
+"""Tests for mergeable column sketches and the file sketch cache"""
+
+import pandas as pd
+import pyarrow as pa
+
+from app.core.profiling import FileProfile, SketchStore
+from app.core.sketches import ColumnSketch, TopK
+
+
+def _profile(values):
+    profile = FileProfile()
+    profile.add_batch(pa.RecordBatch.from_pydict({"value": values}))
+    return profile
+
+
+def test_topk_counts_are_exact_while_nothing_is_truncated():
+    left, right = TopK(k=3), TopK(k=3)
+    left.add(pd.Series(["a"] * 5 + ["b"] * 2))
+    right.add(pd.Series(["a"] * 3 + ["c"]))
+    merged = left.merge(right)
+
+    assert merged.exact
+    assert merged.top() == [{"value": "a", "count": 8}, {"value": "b", "count": 2}, {"value": "c", "count": 1}]
+
+
+def test_truncated_topk_reports_lower_bounds_with_their_upper_bound():
+    # "x" is frequent overall but never makes the per-file cut
+    left, right = TopK(k=2, capacity=2), TopK(k=2, capacity=2)
+    left.add(pd.Series(["a"] * 10 + ["b"] * 9 + ["x"] * 8))
+    right.add(pd.Series(["c"] * 10 + ["d"] * 9 + ["x"] * 8))
+    merged = left.merge(right)
+
+    assert not merged.exact
+    # Each file dropped "x" (8), then the merge dropped "b" or "d" (9)
+    assert merged.error == 8 + 8 + 9
+    top = merged.top()
+    assert [item["count"] for item in top] == [10, 10]
+    assert all(item["max_count"] == item["count"] + merged.error for item in top)
+    # The true count of the value missing from the sketch (16) is within the bound
+    assert "x" not in merged.counts and 16 <= merged.error
+
+    sketch = ColumnSketch("text")
+    sketch.topk = merged
+    sketch.count = 54
+    stats = sketch.to_statistics()
+    assert stats["top_values_approximate"] is True
+    assert "max_count" in stats["top_values"][0]
+
+
+def test_topk_error_survives_serialization_and_legacy_sketches_are_approximate():
+    topk = TopK(k=2, capacity=2)
+    topk.add(pd.Series(["a", "a", "b", "b", "c"]))
+    assert TopK.from_dict(topk.to_dict()).error == topk.error == 1
+
+    legacy = topk.to_dict()
+    del legacy["error"]
+    restored = TopK.from_dict(legacy)
+    assert restored.error is None and not restored.exact
+    assert restored.top()[0]["max_count"] is None
+
+
+def test_sketch_store_is_bounded_by_bytes():
+    profile = _profile(list(range(100)))
+    size = profile.nbytes()
+    store = SketchStore(max_bytes=size * 3)
+    for i in range(10):
+        store.put(f"file-{i}", profile)
+
+    assert len(store) == 3
+    assert store.nbytes <= store.max_bytes
+    assert store.get("file-0") is None
+    assert store.get("file-9") is profile
+
+    # Replacing an entry does not count it twice
+    store.put("file-9", profile)
+    assert len(store) == 3 and store.nbytes == size * 3
+
+
+def test_sketch_store_keeps_a_profile_larger_than_the_cap():
+    store = SketchStore(max_bytes=1)
+    store.put("big", _profile(["a", "b"]))
+    store.put("bigger", _profile(["c", "d"]))
+    assert len(store) == 1 and store.get("bigger") is not None
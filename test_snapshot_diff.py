@@ -0,0 +1,80 @@
+"""
+Tests for the incremental snapshot diff
+"""
+
+import numpy as np
+import pyarrow as pa
+from pyiceberg.expressions import LessThan
+
+from app.core.manifests import is_data_file, live_files
+from app.core.snapshot_diff import DELETED, INSERTED, SnapshotDiff
+from benchmarks.lakehouse import _position_delete_file
+
+
+def diff_of(table, from_index, to_index):
+    snapshots = table.snapshots()
+    return SnapshotDiff(table.io, snapshots[from_index], snapshots[to_index], table.schema())
+
+
+def changed_ids(diff, change):
+    batches = [batch for c, batch in diff.iter_rows(change)]
+    return sorted(pa.Table.from_batches(batches).column("id").to_pylist()) if batches else []
+
+
+def test_append_lists_the_new_rows(lakehouse):
+    table = lakehouse.table("appends", rows=4000, columns=2, files=4)
+    diff = diff_of(table, 1, 2)
+
+    summary = diff.summary()
+    assert (summary["inserted_rows"], summary["deleted_rows"]) == (1000, 0)
+    assert summary["manifests_skipped"] == 2
+    assert changed_ids(diff, INSERTED) == list(range(2000, 3000))
+
+
+def test_position_deletes_list_the_deleted_rows(lakehouse):
+    table = lakehouse.table("mor", rows=4000, columns=2, files=4, deletes=1)
+    diff = diff_of(table, 3, 4)
+
+    summary = diff.summary()
+    assert (summary["inserted_rows"], summary["deleted_rows"]) == (0, 40)
+    assert changed_ids(diff, DELETED) == list(range(1960, 2000))
+
+
+def test_copy_on_write_rewrite_lists_only_the_deleted_rows(lakehouse):
+    table = lakehouse.table("cow", rows=4000, columns=2, files=4, deletes=1, delete_mode="copy-on-write")
+    diff = diff_of(table, 3, 4)
+
+    summary = diff.summary()
+    assert summary["removed_files"]["data_files"] == 1 and summary["added_files"]["data_files"] == 1
+    assert (summary["inserted_rows"], summary["deleted_rows"]) == (0, 40)
+    assert summary["unchanged_rows"] == 960
+    assert changed_ids(diff, INSERTED) == []
+    assert changed_ids(diff, DELETED) == list(range(1960, 2000))
+
+
+def test_rows_deleted_before_the_base_snapshot_are_not_deleted_again(lakehouse):
+    # Rows 1960..1999 are hidden by a position delete file, then their data file is rewritten
+    table = lakehouse.table("mixed", rows=4000, columns=2, files=4, deletes=1)
+    table.delete(delete_filter=~LessThan("id", 1000) & LessThan("id", 1010))
+    table = lakehouse.load("mixed")
+    diff = diff_of(table, 4, 5)
+
+    summary = diff.summary()
+    assert (summary["inserted_rows"], summary["deleted_rows"]) == (0, 10)
+    assert changed_ids(diff, DELETED) == list(range(1000, 1010))
+
+
+def test_rewritten_delete_file_only_lists_new_deletes(lakehouse):
+    # Replacing a delete file by one that also holds its positions restores nothing
+    table = lakehouse.table("compacted", rows=1000, columns=2, files=1)
+    data_file = next(f for f in live_files(table.io, table.current_snapshot()).values() if is_data_file(f))
+    old = _position_delete_file(table, data_file, np.array([1, 2, 3]))
+    new = _position_delete_file(table, data_file, np.array([1, 2, 3, 7]))
+
+    diff = SnapshotDiff(table.io, None, None, table.schema())
+    diff.removed_files = {old.file_path: old}
+    diff.added_files = {new.file_path: new}
+
+    summary = diff.summary()
+    assert (summary["inserted_rows"], summary["deleted_rows"]) == (0, 1)
+    assert changed_ids(diff, DELETED) == [7]
@@ -0,0 +1,90 @@
+"""
+Tests for table statistics served from stored profiles and the background profiler
+"""
+
+import time
+
+import pytest
+
+from app.core.catalog_pool import TableVersion
+from app.core.profiling_worker import ProfilingWorker
+from benchmarks.lakehouse import NAMESPACE
+
+NS = (NAMESPACE,)
+
+
+@pytest.fixture
+def explorer(lakehouse, tmp_path):
+    lakehouse.table("events", rows=2000, columns=2, files=2)
+    explorer = lakehouse.explorer(stats_store_path=str(tmp_path / "stats.db"))
+    # The watcher runs, but no worker thread takes jobs, so queued jobs can be inspected
+    explorer.profiling_worker.max_concurrency = 0
+    explorer.profiling_worker.poll_interval = 3600
+    explorer.profiling_worker.start()
+    yield explorer
+    explorer.profiling_worker.stop()
+
+
+def snapshot_ids(lakehouse):
+    return [s.snapshot_id for s in lakehouse.load("events").snapshots()]
+
+
+def test_old_snapshot_is_not_answered_with_the_current_profile(explorer, lakehouse):
+    old, current = snapshot_ids(lakehouse)
+    fresh = explorer.get_table_statistics(NS, "events")
+    assert fresh["snapshot_id"] == current and fresh["total_rows"] == 2000
+
+    # Too expensive to profile now: manifest metrics of the requested snapshot, profile queued
+    explorer.planner.statistics_budget_seconds = 0
+    version = TableVersion(snapshot_id=old)
+    stats = explorer.get_table_statistics(NS, "events", version)
+
+    assert stats["snapshot_id"] == old and stats["total_rows"] == 1000
+    assert stats["plan"]["strategy"] == "metadata"
+    assert stats["freshness"]["status"] == "computed"
+    assert stats["freshness"]["refresh_pending"] is True
+    assert ProfilingWorker.job_key(NS, "events", version) in explorer.profiling_worker._queued
+
+
+def test_worker_profiles_the_requested_snapshot(explorer, lakehouse):
+    old, current = snapshot_ids(lakehouse)
+    explorer.profiling_worker.profile_table(NS, "events", TableVersion(snapshot_id=old))
+
+    assert explorer.stats_store.has_profile("bench.events", old)
+    assert not explorer.stats_store.has_profile("bench.events", current)
+    stats = explorer.get_table_statistics(NS, "events", TableVersion(snapshot_id=old))
+    assert stats["freshness"]["status"] == "fresh" and stats["total_rows"] == 1000
+
+
+def test_current_snapshot_falls_back_to_an_ancestors_profile(explorer, lakehouse):
+    old, current = snapshot_ids(lakehouse)
+    explorer.profiling_worker.profile_table(NS, "events", TableVersion(snapshot_id=old))
+
+    stats = explorer.get_table_statistics(NS, "events")
+    assert stats["snapshot_id"] == old
+    assert stats["freshness"]["status"] == "stale"
+    assert stats["freshness"]["current_snapshot_id"] == current
+    assert stats["freshness"]["refresh_pending"] is True
+
+
+def test_worker_threads_count_every_job(lakehouse, tmp_path):
+    explorer = lakehouse.explorer(stats_store_path=str(tmp_path / "counted.db"))
+    worker = ProfilingWorker(explorer, explorer.stats_store, max_concurrency=8, poll_interval=3600)
+    worker.poll = lambda: None
+
+    def profile_table(namespace, table_name, version=None):
+        if version.snapshot_id % 2:
+            raise RuntimeError("unreadable")
+
+    worker.profile_table = profile_table
+    for snapshot_id in range(1, 201):
+        worker.request(NS, "events", TableVersion(snapshot_id=snapshot_id))
+    worker.start()
+    try:
+        deadline = time.time() + 10
+        while (worker.status()["queued"] or worker.status()["in_progress"]) and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        worker.stop()
+    status = worker.status()
+    assert status["profiled"] == 100 and status["failed"] == 100
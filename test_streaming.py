@@ -0,0 +1,72 @@
+"""
+Tests for streaming query execution and its Server-Sent Events endpoint
+"""
+
+import json
+
+import duckdb
+import pyarrow as pa
+
+from app import create_app
+from app.core.streaming import StreamingQuery
+from benchmarks.lakehouse import NAMESPACE
+
+
+def test_run_streams_batches_then_done(lakehouse):
+    table = lakehouse.table("events", rows=4000, columns=2, files=4, deletes=1)
+    streaming = StreamingQuery(table, table.current_snapshot(), batch_size=500)
+    messages = list(streaming.run(duckdb.connect(), "SELECT id FROM t ORDER BY id", "t"))
+
+    events = [m["event"] for m in messages]
+    assert events[-1] == "done" and "batch" in events
+    batches = [m["batch"] for m in messages if m["event"] == "batch"]
+    ids = pa.Table.from_batches(batches).column("id").to_pylist()
+    # One position delete removed 40 rows
+    assert len(ids) == 3960 and ids == sorted(ids)
+    done = messages[-1]
+    assert done["files_scanned"] == done["files_total"] == 4
+    assert done["rows_emitted"] == 3960 and done["first_batch_seconds"] is not None
+
+
+def test_limit_stops_the_scan_early(lakehouse):
+    table = lakehouse.table("events", rows=8000, columns=2, files=8)
+    streaming = StreamingQuery(table, table.current_snapshot(), batch_size=100)
+    result = streaming.collect(duckdb.connect(), "SELECT * FROM t LIMIT 10", "t")
+    assert result.num_rows == 10
+    assert streaming.files_scanned < streaming.files_total
+
+
+def test_closing_the_stream_cancels_the_query(lakehouse):
+    table = lakehouse.table("events", rows=200000, columns=2, files=20)
+    streaming = StreamingQuery(table, table.current_snapshot(), batch_size=100)
+    messages = streaming.run(duckdb.connect(), "SELECT * FROM t", "t")
+    for message in messages:
+        if message["event"] == "batch":
+            break
+    messages.close()
+    assert streaming.files_scanned < streaming.files_total
+
+
+def sse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_endpoint(lakehouse):
+    lakehouse.table("events", rows=2000, columns=2, files=2)
+    client = create_app(explorer=lakehouse.explorer()).test_client()
+
+    response = client.post(f"/api/table/{NAMESPACE}/events/query/stream",
+                           json={"query": "SELECT id FROM events WHERE id < 1200", "batch_size": 500})
+    assert response.status_code == 200 and response.mimetype == "text/event-stream"
+    events = sse_events(response.get_data(as_text=True))
+    assert events[0][0] == "start"
+    assert events[-1][0] == "done"
+    assert sum(len(data["data"]) for event, data in events if event == "rows") == 1200
+
+    assert client.get(f"/api/table/{NAMESPACE}/events/query/stream").status_code == 400
+    failed = client.get(f"/api/table/{NAMESPACE}/events/query/stream?query=SELECT+nope+FROM+events")
+    assert sse_events(failed.get_data(as_text=True))[-1][0] == "error"